@@ -6,6 +6,7 @@ import requests
 
 from aircraft_data_cache import AircraftDataCache
 import configuration
+import lib.change_signal as change_signal
 import lib.recurring_task as recurring_task
 from lib.simulated_values import SimulatedValue
 from logging_object import LoggingObject
@@ -15,6 +16,18 @@ MAX_AVIONICS_AGE = 0.3
 MAX_STRATUX_AHRS_AGE = 2.0
 
 
+def __round_if_number__(value, digits):
+    """
+    Rounds the value if it is a number. Anything else,
+    such as the text for a value that is not available, is kept.
+    """
+
+    if isinstance(value, (int, long, float)):
+        return round(value, digits)
+
+    return value
+
+
 class AhrsData(object):
     """
     Class to hold the AHRS data
@@ -72,6 +85,33 @@ class AhrsData(object):
 
         return NOT_AVAILABLE
 
+    def get_display_fingerprint(
+        self
+    ):
+        """
+        Returns the values that are shown on the HUD, rounded to
+        about what can be seen. Two packages with the same fingerprint
+        would draw the same frame.
+
+        Returns:
+            tuple -- The rounded values.
+        """
+
+        return (__round_if_number__(self.roll, 1),
+                __round_if_number__(self.pitch, 1),
+                __round_if_number__(self.compass_heading, 0),
+                __round_if_number__(self.gps_heading, 0),
+                __round_if_number__(self.alt, 0),
+                tuple([__round_if_number__(coordinate, 5)
+                       for coordinate in self.position]),
+                __round_if_number__(self.groundspeed, 0),
+                __round_if_number__(self.airspeed, 0),
+                __round_if_number__(self.vertical_speed, 0),
+                __round_if_number__(self.g_load, 2),
+                str(self.utc_time).split('.')[0],
+                self.gps_online,
+                self.is_avionics_source)
+
     def __init__(
         self
     ):
@@ -356,6 +396,7 @@ class AhrsStratux(LoggingObject):
 
         if new_ahrs_data is not None:
             self.__stratux_ahrs_cache__.update(new_ahrs_data)
+            self.__signal_if_changed__()
 
     def update_avionics(
         self
@@ -368,6 +409,27 @@ class AhrsStratux(LoggingObject):
 
         if new_ahrs_data is not None:
             self.__avionics_cache__.update(new_ahrs_data)
+            self.__signal_if_changed__()
+
+    def __signal_if_changed__(
+        self
+    ):
+        """
+        Tells the render loop that there is something new to draw,
+        but only when the change would show on the HUD.
+        Packages often arrive with nothing new but their timestamps.
+
+        Called from both the Stratux and the avionics threads. The lock
+        keeps one thread from comparing against a fingerprint the other
+        is part way through replacing.
+        """
+
+        with self.__fingerprint_lock__:
+            fingerprint = self.get_ahrs().get_display_fingerprint()
+
+            if fingerprint != self.__last_fingerprint__:
+                self.__last_fingerprint__ = fingerprint
+                change_signal.CHANGE_SIGNAL.changed()
 
     def is_data_source_available(
         self
@@ -422,6 +484,9 @@ class AhrsStratux(LoggingObject):
 
         self.__stratux_ahrs_cache__ = AircraftDataCache(MAX_STRATUX_AHRS_AGE, "StratuxAhrs", logger)
         self.__avionics_cache__ = AircraftDataCache(MAX_AVIONICS_AGE, "AvionicsAhrs", logger)
+        # What was on the HUD the last time the render loop was told about a change.
+        self.__last_fingerprint__ = None
+        self.__fingerprint_lock__ = threading.Lock()
 
 
 class Aircraft(LoggingObject):
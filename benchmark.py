@@ -0,0 +1,427 @@
+"""
+Headless render benchmark for the Stratux HUD.
+
+Builds every view from views.json and elements.json the same way
+the HUD does, renders each one for a number of frames against
+synthetic or recorded AHRS and traffic data, and then reports the
+per-element and per-frame timing percentiles as JSON. The time the
+HUD spends warming the views next to the one on the screen is
+reported on its own, apart from the frame and element timings.
+
+Uses the SDL "dummy" video driver so no display is required.
+
+Example:
+    python benchmark.py --frames 300 --output benchmark.json
+    python benchmark.py --ahrs media/example_adsb.json --flip-horizontal
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import sys
+import timeit
+
+# Must be set before the display is initialized.
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+
+def __get_arguments__():
+    parser = argparse.ArgumentParser(
+        description='Renders every HUD view headless and reports timing percentiles as JSON.')
+    parser.add_argument('--frames', type=int, default=300,
+                        help='Number of frames to time for each view.')
+    parser.add_argument('--warmup', type=int, default=30,
+                        help='Number of frames to render for each view before timing starts.')
+    parser.add_argument('--targets', type=int, default=8,
+                        help='Number of simulated traffic targets.')
+    parser.add_argument('--ahrs', default=None,
+                        help='Recorded getSituation JSON (a single package or a list) to play back.')
+    parser.add_argument('--traffic', default=None,
+                        help='Recorded /Traffic/Reliable JSON (a single package or a list) to play back.')
+    parser.add_argument('--flip-horizontal', action='store_true',
+                        help='Mirror the output left to right.')
+    parser.add_argument('--flip-vertical', action='store_true',
+                        help='Mirror the output top to bottom.')
+    parser.add_argument('--output', default=None,
+                        help='File to write the JSON results to. Written to stdout if not given.')
+
+    return parser.parse_args()
+
+
+# Parsed before the HUD is imported. Importing the configuration starts
+# tasks that would keep --help, or a bad argument, from exiting.
+ARGUMENTS = __get_arguments__() if __name__ == '__main__' else None
+
+import pygame
+
+import configuration
+import heads_up_display
+import hud_elements
+from aircraft import AhrsSimulation, AhrsStratux
+from lib.logger import Logger
+from lib.recurring_task import RecurringTask
+from traffic import AdsbTrafficClient, SimulatedTraffic
+
+PERCENTILES = [50, 95, 99]
+
+
+def get_percentile(sorted_samples, percentile):
+    """
+    Returns the nearest-rank percentile of already sorted samples.
+
+    Arguments:
+        sorted_samples {list} -- The samples, sorted from smallest to largest.
+        percentile {number} -- The percentile (0 to 100) to find.
+
+    Returns:
+        float -- The value at the percentile, or None if there are no samples.
+
+    >>> get_percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 50)
+    5
+    >>> get_percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 95)
+    10
+    >>> get_percentile([], 50) is None
+    True
+    """
+
+    if len(sorted_samples) < 1:
+        return None
+
+    rank = int(-(-len(sorted_samples) * percentile // 100))
+
+    return sorted_samples[max(rank, 1) - 1]
+
+
+def get_timing_summary(samples):
+    """
+    Summarizes a list of timings.
+
+    Arguments:
+        samples {list} -- The timings, in milliseconds.
+
+    Returns:
+        dict -- The count, mean, max, and percentiles of the timings.
+    """
+
+    sorted_samples = sorted(samples)
+    count = len(sorted_samples)
+    summary = {'count': count,
+               'mean': (sum(sorted_samples) / count) if count > 0 else None,
+               'max': sorted_samples[-1] if count > 0 else None}
+
+    for percentile in PERCENTILES:
+        summary['p{}'.format(percentile)] = get_percentile(
+            sorted_samples, percentile)
+
+    return summary
+
+
+def load_json_frames(json_file):
+    """
+    Loads recorded data. The file may hold a single
+    recorded package, or a list of them to play back in order.
+
+    Arguments:
+        json_file {string} -- The path to the recording.
+
+    Returns:
+        list -- The recorded packages.
+    """
+
+    with open(json_file) as recording:
+        recorded = json.load(recording)
+
+    if isinstance(recorded, list):
+        return recorded
+
+    return [recorded]
+
+
+class BenchmarkAircraft(object):
+    """
+    Provides the orientation to the HUD one frame at a time
+    from either the AHRS simulation or a recording of getSituation.
+    """
+
+    def __init__(self, logger, recorded_situations=None):
+        self.__simulation__ = AhrsSimulation()
+        self.__recorded_situations__ = recorded_situations
+        self.__decoder__ = AhrsStratux(logger) \
+            if recorded_situations is not None else None
+        self.__frame__ = 0
+        self.__orientation__ = None
+        self.advance()
+
+    def advance(self):
+        """
+        Moves the aircraft to the next frame of data.
+        """
+
+        if self.__decoder__ is None:
+            self.__simulation__.simulate()
+            self.__orientation__ = self.__simulation__.get_ahrs()
+            self.__orientation__.utc_time = str(datetime.datetime.utcnow())
+        else:
+            situation = self.__recorded_situations__[
+                self.__frame__ % len(self.__recorded_situations__)]
+            self.__orientation__ = self.__decoder__.__decode_situation__(
+                situation)
+
+        self.__frame__ += 1
+
+    def is_ahrs_available(self):
+        return True
+
+    def get_orientation(self):
+        return self.__orientation__
+
+
+class BenchmarkTraffic(object):
+    """
+    Feeds traffic reports to the traffic manager one frame at a time
+    from either simulated traffic or a recording of /Traffic/Reliable.
+    """
+
+    def __init__(self, target_count, recorded_traffic=None):
+        self.__simulated_traffic__ = [SimulatedTraffic()
+                                      for target in range(target_count)]
+        self.__recorded_traffic__ = recorded_traffic
+        self.__frame__ = 0
+
+    def __get_reports__(self):
+        """
+        Returns the reports for the current frame, keyed by ICAO address.
+        """
+
+        if self.__recorded_traffic__ is not None:
+            return self.__recorded_traffic__[
+                self.__frame__ % len(self.__recorded_traffic__)]
+
+        [simulated.simulate() for simulated in self.__simulated_traffic__]
+
+        return {str(simulated.icao_address): simulated.to_json()
+                for simulated in self.__simulated_traffic__}
+
+    def advance(self):
+        """
+        Reports the next frame of traffic and refreshes what the HUD sees.
+        """
+
+        reports = self.__get_reports__()
+
+        [AdsbTrafficClient.TRAFFIC_MANAGER.handle_traffic_report(icao_address, reports[icao_address])
+         for icao_address in reports]
+        AdsbTrafficClient.TRAFFIC_MANAGER.heartbeat()
+        hud_elements.HudDataCache.update_traffic_reports()
+
+        self.__frame__ += 1
+
+
+class UnthrottledClock(object):
+    """
+    A frame clock that never sleeps, so the benchmark
+    measures the rendering and not the frame rate cap.
+    """
+
+    def __init__(self):
+        self.__clock__ = pygame.time.Clock()
+
+    def get_fps(self):
+        return self.__clock__.get_fps()
+
+    def tick(self, framerate=0):
+        return self.__clock__.tick()
+
+
+def __get_element_timers__(hud, view_elements):
+    """
+    Returns the timers the HUD keeps for the elements of a view,
+    with how many times each had finished, keyed by element.
+
+    Arguments:
+        hud {HeadsUpDisplay} -- The HUD that renders the elements.
+        view_elements {list} -- The elements of the view.
+
+    Returns:
+        dict -- The timer and the count of finished renders of each element that has a timer.
+    """
+
+    element_timers = {}
+
+    for hud_element in view_elements:
+        timer = hud.get_view_element_timer(hud_element) \
+            if hud_element is not None else None
+
+        if timer is not None:
+            element_timers[hud_element] = (timer, timer.get_sample_count())
+
+    return element_timers
+
+
+def __take_element_samples__(hud, view_elements, element_timers, view_element_samples):
+    """
+    Adds how long each element took on the last frame, for the elements
+    the HUD rendered on the screen during that frame.
+
+    The timings come from the HUD, so they cover the same work the HUD
+    does for the element: rendering, or replaying its last draw.
+    The view warmer renders elements around those timers, so renders
+    of the views next to the one on the screen are not counted.
+
+    Arguments:
+        hud {HeadsUpDisplay} -- The HUD that renders the elements.
+        view_elements {list} -- The elements of the view.
+        element_timers {dict} -- The timers, and their counts, from before the frame. Updated in place.
+        view_element_samples {dict} -- The timings by element name. Updated in place.
+    """
+
+    for hud_element, (timer, sample_count) in __get_element_timers__(hud, view_elements).items():
+        last_sample_count = element_timers.get(hud_element, (None, 0))[1]
+
+        if sample_count > last_sample_count:
+            element_name = hud_element.__class__.__name__
+
+            if element_name not in view_element_samples:
+                view_element_samples[element_name] = []
+
+            view_element_samples[element_name].append(timer.get_last_ms())
+
+        element_timers[hud_element] = (timer, sample_count)
+
+
+def run_benchmark(hud, aircraft, traffic, frames, warmup_frames):
+    """
+    Renders every view and collects the timings.
+
+    Arguments:
+        hud {HeadsUpDisplay} -- The HUD to render.
+        aircraft {BenchmarkAircraft} -- The source of the orientation.
+        traffic {BenchmarkTraffic} -- The source of the traffic.
+        frames {int} -- How many frames to time for each view.
+        warmup_frames {int} -- How many frames to render for each view before timing.
+
+    Returns:
+        dict -- The timing results.
+    """
+
+    clock = UnthrottledClock()
+    element_samples = {}
+    results = {'views': []}
+
+    for view_index in range(len(hud.__hud_views__)):
+        view_name, view_elements, is_ahrs_view = hud.__hud_views__.show(
+            view_index)
+
+        while configuration.CONFIGURATION.get_view_index() != view_index:
+            configuration.CONFIGURATION.next_view()
+
+        hud_elements.HudDataCache.purge_old_textures()
+        hud.__view_switch_latency__.last = None
+
+        for frame in range(warmup_frames):
+            aircraft.advance()
+            traffic.advance()
+            hud.tick(clock)
+
+        # How long the first frame of the view took to reach the screen,
+        # as the HUD measured it. The first view is not a switch.
+        first_frame_ms = hud.__view_switch_latency__.last
+
+        view_element_samples = {}
+        element_timers = __get_element_timers__(hud, view_elements)
+        frame_samples = []
+        warm_samples = []
+        warm_renders = hud.__view_warmer__.warms
+
+        for frame in range(frames):
+            aircraft.advance()
+            traffic.advance()
+            warm_seconds = hud.__view_warmer__.warm_seconds
+            start_time = timeit.default_timer()
+            hud.tick(clock)
+            frame_ms = (timeit.default_timer() - start_time) * 1000.0
+            # Warming the views next to this one is timed on its own,
+            # so the frame times only cover the view on the screen.
+            warm_ms = (hud.__view_warmer__.warm_seconds - warm_seconds) * 1000.0
+            frame_samples.append(frame_ms - warm_ms)
+            warm_samples.append(warm_ms)
+            __take_element_samples__(
+                hud, view_elements, element_timers, view_element_samples)
+
+        for element_name in view_element_samples:
+            element_samples.setdefault(element_name, []).extend(
+                view_element_samples[element_name])
+
+        results['views'].append({'name': view_name,
+                                 'first_frame_ms': first_frame_ms,
+                                 'frame': get_timing_summary(frame_samples),
+                                 'warm': dict(get_timing_summary(warm_samples),
+                                              renders=hud.__view_warmer__.warms - warm_renders),
+                                 'elements': {element_name: get_timing_summary(view_element_samples[element_name])
+                                              for element_name in view_element_samples}})
+
+    results['elements'] = {element_name: get_timing_summary(element_samples[element_name])
+                           for element_name in element_samples
+                           if len(element_samples[element_name]) > 0}
+
+    return results
+
+
+if __name__ == '__main__':
+    arguments = ARGUMENTS
+
+    recorded_situations = load_json_frames(arguments.ahrs) \
+        if arguments.ahrs is not None else None
+    recorded_traffic = load_json_frames(arguments.traffic) \
+        if arguments.traffic is not None else None
+
+    configuration.CONFIGURATION.flip_horizontal = arguments.flip_horizontal
+    configuration.CONFIGURATION.flip_vertical = arguments.flip_vertical
+
+    python_logger = logging.getLogger("benchmark")
+    python_logger.addHandler(logging.NullHandler())
+    logger = Logger(python_logger)
+
+    try:
+        benchmark_aircraft = BenchmarkAircraft(logger, recorded_situations)
+        benchmark_traffic = BenchmarkTraffic(
+            arguments.targets, recorded_traffic)
+        hud = heads_up_display.HeadsUpDisplay(
+            logger, aircraft=benchmark_aircraft, start_services=False)
+
+        # Stop anything polling the network so the
+        # timings only measure the rendering.
+        RecurringTask.kill_all()
+
+        results = run_benchmark(hud,
+                                benchmark_aircraft,
+                                benchmark_traffic,
+                                arguments.frames,
+                                arguments.warmup)
+        results['frames'] = arguments.frames
+        results['screen_size'] = pygame.display.get_surface().get_size()
+        results['flip_horizontal'] = arguments.flip_horizontal
+        results['flip_vertical'] = arguments.flip_vertical
+
+        texture_cache_bytes, texture_count, hits, misses, evictions = \
+            hud_elements.HudDataCache.get_texture_cache_stats()
+        results['texture_cache'] = {'bytes': texture_cache_bytes,
+                                    'textures': texture_count,
+                                    'hits': hits,
+                                    'misses': misses,
+                                    'evictions': evictions}
+
+        results_text = json.dumps(results, indent=2, sort_keys=True)
+
+        if arguments.output is not None:
+            with open(arguments.output, 'w') as output_file:
+                output_file.write(results_text)
+        else:
+            print(results_text)
+    finally:
+        RecurringTask.kill_all()
+        pygame.display.quit()
+
+    sys.exit(0)
@@ -3,6 +3,7 @@ import os
 from os.path import expanduser
 import units
 import requests
+import lib.boot_timeline as boot_timeline
 import lib.recurring_task as recurring_task
 from receiver_capabilities import StratuxCapabilities
 from receiver_status import StratuxStatus
@@ -100,9 +101,23 @@ class Configuration(object):
     AITHRE_KEY = 'aithre'
     TRAFFIC_MANAGER_KEY = 'traffic_manager'
     AITHRE_MANAGER_KEY = 'aithre_manager'
+    TEXTURE_CACHE_MAX_BYTES_KEY = 'texture_cache_max_bytes'
+    ROTATED_TEXT_ROLL_QUANTUM_KEY = 'rotated_text_roll_quantum'
+    ROTATED_TEXT_MAX_TEXTURES_KEY = 'rotated_text_max_textures'
+    IDLE_VIEW_RELEASE_MINUTES_KEY = 'idle_view_release_minutes'
+    IDLE_FRAME_SKIP_KEY = 'idle_frame_skip'
+    FRAME_BUDGET_MS_KEY = 'frame_budget_ms'
+    DETAIL_LADDER_KEY = 'detail_ladder'
 
     DEFAULT_DEGREES_OF_PITCH = 90
     DEFAULT_PITCH_DEGREES_DISPLAY_SCALER = 2.0
+    DEFAULT_TEXTURE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+    DEFAULT_ROTATED_TEXT_ROLL_QUANTUM = 1
+    DEFAULT_ROTATED_TEXT_MAX_TEXTURES = 512
+    DEFAULT_IDLE_VIEW_RELEASE_MINUTES = 10.0
+    DEFAULT_IDLE_FRAME_SKIP = True
+    DEFAULT_FRAME_BUDGET_MS = 1000.0 / MAX_FRAMERATE
+    DEFAULT_DETAIL_LADDER = None
 
     def get_elements_list(
         self
@@ -208,7 +223,14 @@ class Configuration(object):
             Configuration.DEGREES_OF_PITCH_KEY: self.get_degrees_of_pitch(),
             Configuration.PITCH_DEGREES_DISPLAY_SCALER_KEY: self.get_pitch_degrees_display_scaler(),
             Configuration.AITHRE_KEY: self.aithre_enabled,
-            Configuration.TRAFFIC_MANAGER_KEY: self.get_traffic_manager_address()
+            Configuration.TRAFFIC_MANAGER_KEY: self.get_traffic_manager_address(),
+            Configuration.TEXTURE_CACHE_MAX_BYTES_KEY: self.get_texture_cache_max_bytes(),
+            Configuration.ROTATED_TEXT_ROLL_QUANTUM_KEY: self.get_rotated_text_roll_quantum(),
+            Configuration.ROTATED_TEXT_MAX_TEXTURES_KEY: self.get_rotated_text_max_textures(),
+            Configuration.IDLE_VIEW_RELEASE_MINUTES_KEY: self.get_idle_view_release_minutes(),
+            Configuration.IDLE_FRAME_SKIP_KEY: self.is_idle_frame_skip_enabled(),
+            Configuration.FRAME_BUDGET_MS_KEY: self.get_frame_budget_ms(),
+            Configuration.DETAIL_LADDER_KEY: self.get_detail_ladder()
         }
 
         return json.dumps(config_dictionary, indent=4, sort_keys=True)
@@ -298,6 +320,47 @@ class Configuration(object):
             self.__configuration__[
                 Configuration.TRAFFIC_MANAGER_KEY] = self.traffic_manager_address
 
+        if Configuration.TEXTURE_CACHE_MAX_BYTES_KEY in json_config:
+            self.texture_cache_max_bytes = int(
+                json_config[Configuration.TEXTURE_CACHE_MAX_BYTES_KEY])
+            self.__configuration__[
+                Configuration.TEXTURE_CACHE_MAX_BYTES_KEY] = self.texture_cache_max_bytes
+
+        if Configuration.ROTATED_TEXT_ROLL_QUANTUM_KEY in json_config:
+            self.rotated_text_roll_quantum = max(1, int(
+                json_config[Configuration.ROTATED_TEXT_ROLL_QUANTUM_KEY]))
+            self.__configuration__[
+                Configuration.ROTATED_TEXT_ROLL_QUANTUM_KEY] = self.rotated_text_roll_quantum
+
+        if Configuration.ROTATED_TEXT_MAX_TEXTURES_KEY in json_config:
+            self.rotated_text_max_textures = int(
+                json_config[Configuration.ROTATED_TEXT_MAX_TEXTURES_KEY])
+            self.__configuration__[
+                Configuration.ROTATED_TEXT_MAX_TEXTURES_KEY] = self.rotated_text_max_textures
+
+        if Configuration.IDLE_VIEW_RELEASE_MINUTES_KEY in json_config:
+            self.idle_view_release_minutes = float(
+                json_config[Configuration.IDLE_VIEW_RELEASE_MINUTES_KEY])
+            self.__configuration__[
+                Configuration.IDLE_VIEW_RELEASE_MINUTES_KEY] = self.idle_view_release_minutes
+
+        if Configuration.IDLE_FRAME_SKIP_KEY in json_config:
+            self.idle_frame_skip = bool(
+                json_config[Configuration.IDLE_FRAME_SKIP_KEY])
+            self.__configuration__[
+                Configuration.IDLE_FRAME_SKIP_KEY] = self.idle_frame_skip
+
+        if Configuration.FRAME_BUDGET_MS_KEY in json_config:
+            self.frame_budget_ms = max(1.0, float(
+                json_config[Configuration.FRAME_BUDGET_MS_KEY]))
+            self.__configuration__[
+                Configuration.FRAME_BUDGET_MS_KEY] = self.frame_budget_ms
+
+        if Configuration.DETAIL_LADDER_KEY in json_config:
+            self.detail_ladder = json_config[Configuration.DETAIL_LADDER_KEY]
+            self.__configuration__[
+                Configuration.DETAIL_LADDER_KEY] = self.detail_ladder
+
     def __get_config_value__(
         self,
         key,
@@ -357,6 +420,98 @@ class Configuration(object):
 
         return self.traffic_manager_address
 
+    def get_texture_cache_max_bytes(
+        self
+    ):
+        """
+        Returns how much memory the cached text textures may use.
+
+        Returns:
+            int -- The size of the texture cache, in bytes.
+        """
+
+        return self.texture_cache_max_bytes
+
+    def get_rotated_text_roll_quantum(
+        self
+    ):
+        """
+        Returns how many degrees of roll apart the cached rotations
+        of text (such as the AH ladder) are.
+
+        Returns:
+            int -- The number of degrees between each cached roll.
+        """
+
+        return self.rotated_text_roll_quantum
+
+    def get_rotated_text_max_textures(
+        self
+    ):
+        """
+        Returns how many rotated textures may be cached.
+
+        Returns:
+            int -- The most rotated textures to keep.
+        """
+
+        return self.rotated_text_max_textures
+
+    def get_idle_view_release_minutes(
+        self
+    ):
+        """
+        Returns how long a view may go without being shown
+        before its elements, and their textures, are released.
+
+        Returns:
+            float -- The number of minutes a view may be idle.
+        """
+
+        return self.idle_view_release_minutes
+
+    def is_idle_frame_skip_enabled(
+        self
+    ):
+        """
+        Returns True if the HUD only draws a new frame when the
+        AHRS or traffic has changed, or a slow heartbeat is due.
+
+        Returns:
+            bool -- True if frames are skipped while nothing is changing.
+        """
+
+        return self.idle_frame_skip
+
+    def get_frame_budget_ms(
+        self
+    ):
+        """
+        Returns how long a frame may take before the HUD starts
+        to give up detail. Read when the HUD starts.
+
+        Returns:
+            float -- The frame budget, in milliseconds.
+        """
+
+        return self.frame_budget_ms
+
+    def get_detail_ladder(
+        self
+    ):
+        """
+        Returns the rungs of detail the HUD gives up, in order, when
+        the frames run over budget. Each rung is a dictionary with a
+        "name", and any of "max_target_bugs", "pitch_label_interval",
+        "min_roll_quantum", and "refresh_rate_scale".
+        Read when the HUD starts.
+
+        Returns:
+            list -- The rungs, starting with full detail. None for the built in ladder.
+        """
+
+        return self.detail_ladder
+
     def get_aithre_manager_address(
         self
     ):
@@ -468,8 +623,22 @@ class Configuration(object):
 
         self.__configuration__.update(json_config)
         self.set_from_json(self.__configuration__)
+        self.__revision__ += 1
         self.write_config()
 
+    def get_revision(
+        self
+    ):
+        """
+        Returns a number that changes every time the
+        configuration is updated.
+
+        Returns:
+            int -- The revision of the configuration.
+        """
+
+        return self.__revision__
+
     def unescape_json_config_contents(
         self,
         unescaped_contents
@@ -542,21 +711,38 @@ class Configuration(object):
         affect what we should show and what is actually
         available.
         """
+        is_discovering = not self.__is_receiver_discovered__
+
+        if is_discovering:
+            boot_timeline.BOOT_TIMELINE.start_phase('receiver discovery')
+
         self.capabilities = StratuxCapabilities(
             self.stratux_address(), self.__stratux_session__, None)
         self.stratux_status = StratuxStatus(
             self.stratux_address(), self.__stratux_session__, None)
 
+        if is_discovering:
+            self.__is_receiver_discovered__ = True
+            boot_timeline.BOOT_TIMELINE.end_phase('receiver discovery')
+
     def __init__(
         self,
         default_config_file,
         user_config_file
     ):
         self.__view_index__ = 0
+        self.__revision__ = 0
         self.__hud_views__ = None
         self.get_views_list()
         self.degrees_of_pitch = Configuration.DEFAULT_DEGREES_OF_PITCH
         self.pitch_degrees_display_scaler = Configuration.DEFAULT_PITCH_DEGREES_DISPLAY_SCALER
+        self.texture_cache_max_bytes = Configuration.DEFAULT_TEXTURE_CACHE_MAX_BYTES
+        self.rotated_text_roll_quantum = Configuration.DEFAULT_ROTATED_TEXT_ROLL_QUANTUM
+        self.rotated_text_max_textures = Configuration.DEFAULT_ROTATED_TEXT_MAX_TEXTURES
+        self.idle_view_release_minutes = Configuration.DEFAULT_IDLE_VIEW_RELEASE_MINUTES
+        self.idle_frame_skip = Configuration.DEFAULT_IDLE_FRAME_SKIP
+        self.frame_budget_ms = Configuration.DEFAULT_FRAME_BUDGET_MS
+        self.detail_ladder = Configuration.DEFAULT_DETAIL_LADDER
         self.__configuration__ = self.__load_configuration__(
             default_config_file, user_config_file)
         self.max_minutes_before_removal = self.__get_config_value__(
@@ -575,12 +761,14 @@ class Configuration(object):
         )
         self.__stratux_session__ = requests.Session()
 
-        self.stratux_status = StratuxStatus(
-            self.stratux_address(), self.__stratux_session__, None)
-        self.capabilities = StratuxCapabilities(
-            self.stratux_address(), self.__stratux_session__, None)
+        # Asking the receiver what it has can take seconds when it
+        # is not there yet. Start with a receiver that has nothing,
+        # and ask in the background so the HUD can keep booting.
+        self.__is_receiver_discovered__ = False
+        self.stratux_status = StratuxStatus(None, None, None)
+        self.capabilities = StratuxCapabilities(None, None, None)
         recurring_task.RecurringTask(
-            'UpdateCapabilities', 15, self.__update_capabilities__)
+            'UpdateCapabilities', 15, self.__update_capabilities__, start_immediate=True)
 
         self.set_from_json(self.__configuration__)
 
@@ -6,13 +6,21 @@ import json
 import math
 import os
 import sys
+import timeit
+import weakref
 from time import sleep
 
 import pygame
 import requests
 
+import lib.boot_timeline as boot_timeline
 import lib.display as display
+import lib.change_signal as change_signal
+import lib.display_list as display_list
+import lib.frame_governor as frame_governor
 import lib.local_debug as local_debug
+import lib.thermal_governor as thermal_governor
+import lib.texture_disk_cache as texture_disk_cache
 import lib.utilities as utilities
 import traffic
 from aircraft import Aircraft
@@ -21,6 +29,7 @@ from traffic import AdsbTrafficClient
 from lib.recurring_task import RecurringTask
 from lib.task_timer import TaskTimer, RollingStats
 import hud_elements
+import hud_views
 import targets
 import traffic
 import restful_host
@@ -49,6 +58,34 @@ from views import (adsb_on_screen_reticles,
 # pip install ws4py
 # pip install requests
 
+# How many rotated textures to build after each frame is on the screen.
+ROTATED_TEXT_WARMS_PER_FRAME = 2
+
+# How many elements of the views next to the one
+# on the screen to build after each frame is on the screen.
+VIEW_ELEMENT_WARMS_PER_FRAME = 1
+
+# The share of each frame's time that rendering the frame, and then
+# warming the views next to it, may use together.
+VIEW_WARM_FRAME_FRACTION = 0.5
+
+# How often to look for views that have been idle long enough to release.
+IDLE_VIEW_CHECK_SECONDS = 30
+
+# How long the disclaimer is on the screen while the HUD boots.
+DISCLAIMER_SECONDS = 5.0
+
+# The longest the HUD goes without drawing a frame, even when nothing
+# is changing. Catches what is not signaled, such as data going stale.
+IDLE_HEARTBEAT_SECONDS = 0.25
+
+# How often a render loop that is waiting for a change
+# wakes up to look for key presses and the heartbeat.
+IDLE_WAKE_SECONDS = 0.05
+
+# How often the temperature of the SoC is sampled.
+THERMAL_SAMPLE_SECONDS = 2.0
+
 
 def __send_stratux_post__(
     ending_url
@@ -114,19 +151,115 @@ class HeadsUpDisplay(object):
         self.log('Initialized screen size to {}x{}'.format(
             self.__width__, self.__height__))
 
-        # Make sure that the disclaimer is visible for long enough.
-        sleep(5)
+        # The disclaimer has been up since before the views were built.
+        # Spend whatever time it has left warming the views,
+        # then make sure that it is visible for long enough.
+        self.__warm_views__()
+
+        boot_timeline.BOOT_TIMELINE.start_phase('disclaimer')
+        remaining_seconds = self.__disclaimer_end_seconds__ - \
+            boot_timeline.BOOT_TIMELINE.get_elapsed_seconds()
+
+        if remaining_seconds > 0:
+            sleep(remaining_seconds)
+        boot_timeline.BOOT_TIMELINE.end_phase('disclaimer')
+
+        self.log('Boot timeline:\n{}'.format(
+            boot_timeline.BOOT_TIMELINE.to_string()))
 
         clock = pygame.time.Clock()
 
         try:
             while self.tick(clock):
-                pass
+                self.__wait_for_change__()
         finally:
             pygame.display.quit()
 
         return 0
 
+    def __wait_for_change__(self):
+        """
+        Sleeps until there is something new to draw, instead of drawing
+        the same frame again. Something is new when the AHRS or traffic
+        has changed, a key was pressed, the view or configuration changed,
+        or the heartbeat is due.
+        """
+
+        self.__update_idle_wake_task__()
+
+        if not CONFIGURATION.is_idle_frame_skip_enabled():
+            return
+
+        signal = change_signal.CHANGE_SIGNAL
+        drawn_version = self.__drawn_version__
+        drawn_state = (CONFIGURATION.get_view_index(),
+                       CONFIGURATION.get_revision())
+        heartbeat_time = self.__last_frame_start__ + IDLE_HEARTBEAT_SECONDS
+        wait_start = timeit.default_timer()
+
+        while signal.get_version() == drawn_version \
+                and timeit.default_timer() < heartbeat_time \
+                and not pygame.event.peek() \
+                and drawn_state == (CONFIGURATION.get_view_index(), CONFIGURATION.get_revision()):
+            signal.wait_for_change(drawn_version)
+
+        self.__idle_seconds__ += timeit.default_timer() - wait_start
+
+        # Anything that changes while this frame is drawn
+        # is drawn on the next frame.
+        self.__drawn_version__ = signal.get_version()
+
+    def __update_idle_wake_task__(self):
+        """
+        Runs the task that stops the wait for a change, so that key
+        presses, and the heartbeat, are not missed. Only while frames
+        are skipped. The setting may change while the HUD is running.
+        """
+
+        is_idle_frame_skip_enabled = CONFIGURATION.is_idle_frame_skip_enabled()
+
+        if is_idle_frame_skip_enabled and self.__idle_wake_task__ is None:
+            self.__idle_wake_task__ = RecurringTask(
+                "idle_wake",
+                IDLE_WAKE_SECONDS,
+                change_signal.CHANGE_SIGNAL.wake,
+                self.__logger__.logger if self.__logger__ is not None else None,
+                start_immediate=True)
+        elif not is_idle_frame_skip_enabled and self.__idle_wake_task__ is not None:
+            self.__idle_wake_task__.stop()
+            self.__idle_wake_task__ = None
+
+    def __warm_views__(self):
+        """
+        Builds the view that will be shown first, and the views next to it,
+        then renders them once to a surface that is never shown.
+        That way the text, rotated text, and cards each view needs are
+        already cached when the view is first on the screen.
+        Stops early if the disclaimer is out of time.
+        """
+
+        boot_timeline.BOOT_TIMELINE.start_phase('warm views')
+
+        warm_surface = pygame.display.get_surface().copy()
+        frame_context = hud_elements.FrameContext(
+            self.__aircraft__.get_orientation())
+        view_index = CONFIGURATION.get_view_index()
+
+        for index in [view_index] + self.__hud_views__.get_adjacent_indices(view_index):
+            if boot_timeline.BOOT_TIMELINE.get_elapsed_seconds() > self.__disclaimer_end_seconds__:
+                break
+
+            view_name = self.__hud_views__[index].name
+
+            for hud_element in self.__hud_views__[index].get_elements():
+                try:
+                    hud_element.render(warm_surface, frame_context)
+                except Exception as ex:
+                    self.warn('While warming view={} element={} EX:{}'.format(
+                        view_name, hud_element, ex))
+
+        boot_timeline.BOOT_TIMELINE.end_phase('warm views')
+
     def __render_view_title__(self, text, surface):
         try:
             texture, size = hud_elements.HudDataCache.get_cached_text_texture(
@@ -140,30 +273,159 @@ class HeadsUpDisplay(object):
             top_border = 0
             position = (left_border, top_border)
 
-            surface.blit(texture, position)
+            return [surface.blit(texture, position)]
         except:
-            pass
+            return []
 
-    def __is_ahrs_view__(self, view):
+    def __get_frame_state__(self, view_index, show_unavailable, surface, flip_horizontal, flip_vertical):
         """
-        Does any element in this view use AHRS?
+        Returns the state that decides if the previous frame's
+        dirty rectangles and the static layer can be trusted for this frame.
 
         Arguments:
-            view {AhrsElement[] or AdsbElement[]} -- The collection of view elements.
+            view_index {int} -- The index of the view being rendered.
+            show_unavailable {bool} -- Is the AHRS not available screen being shown?
+            surface {Surface} -- The surface that the frame is rendered to.
+            flip_horizontal {bool} -- Is the output mirrored left to right?
+            flip_vertical {bool} -- Is the output mirrored top to bottom?
 
         Returns:
-            bool -- True is any element uses ADSB.
+            tuple -- The state of what is on the screen.
         """
 
-        if view is None or len(view) < 1:
-            return False
+        return (view_index,
+                show_unavailable,
+                surface.get_size(),
+                CONFIGURATION.get_revision(),
+                flip_horizontal,
+                flip_vertical)
 
-        is_ahrs_view = False
+    def __get_render_surface__(self, display_surface, is_mirrored):
+        """
+        Returns the surface that the elements should draw to.
+        When the output is mirrored, the elements draw to a back buffer
+        that is reused from frame to frame, and only the dirty
+        rectangles are mirrored onto the display.
 
-        for hud_element in view:
-            is_ahrs_view = is_ahrs_view or hud_element.uses_ahrs()
+        Arguments:
+            display_surface {Surface} -- The surface of the display.
+            is_mirrored {bool} -- Is the output flipped in either direction?
+
+        Returns:
+            Surface -- The surface to render the frame to.
+        """
+
+        if not is_mirrored:
+            return display_surface
+
+        if self.__back_buffer__ is None \
+                or self.__back_buffer__.get_size() != display_surface.get_size():
+            self.__back_buffer__ = pygame.Surface(
+                display_surface.get_size()).convert(display_surface)
+
+        return self.__back_buffer__
+
+    def __build_static_layer__(self, surface, view_name, elements_to_render):
+        """
+        Pre-composites the parts of the view that never change
+        (the title, reference marks, outlines) into a single surface.
+
+        Arguments:
+            surface {Surface} -- The surface the layer will be blitted to.
+            view_name {string} -- The title of the view.
+            elements_to_render {list} -- The elements that will be rendered in the view.
+
+        Returns:
+            Surface -- The static layer for the view.
+        """
 
-        return is_ahrs_view
+        static_layer = pygame.Surface(surface.get_size()).convert(surface)
+        static_layer.fill(display.BLACK)
+
+        self.__render_view_title__(view_name, static_layer)
+
+        for hud_element in elements_to_render:
+            try:
+                hud_element.render_static(static_layer)
+            except Exception as e:
+                self.warn('ELEMENT {} STATIC EX:{}'.format(hud_element, e))
+
+        return static_layer
+
+    def __clear_frame__(self, surface, frame_state, view_name, elements_to_render):
+        """
+        Clears what was drawn last frame by restoring the static layer.
+        Only the dirty rectangles are restored unless a full frame is required.
+
+        Arguments:
+            surface {Surface} -- The surface to clear.
+            frame_state {tuple} -- The state of the frame about to be rendered.
+            view_name {string} -- The title of the view.
+            elements_to_render {list} -- The elements that will be rendered in the view.
+
+        Returns:
+            bool -- True if the entire surface was cleared.
+        """
+
+        is_new_state = frame_state != self.__last_frame_state__
+
+        if is_new_state or self.__static_layer__ is None:
+            # The configuration may have changed how the caches behave.
+            hud_elements.HudDataCache.update_rotated_text_cache_settings(
+                self.__frame_governor__.detail.min_roll_quantum)
+            self.__static_layer__ = self.__build_static_layer__(
+                surface, view_name, elements_to_render)
+
+        is_full_frame = self.__last_dirty_rects__ is None \
+            or is_new_state
+
+        if is_full_frame:
+            surface.blit(self.__static_layer__, (0, 0))
+        else:
+            [surface.blit(self.__static_layer__, dirty_rect, dirty_rect)
+             for dirty_rect in self.__last_dirty_rects__]
+
+        self.__last_frame_state__ = frame_state
+
+        return is_full_frame
+
+    def __present_frame__(self, dirty_rects, is_full_frame, render_surface, flip_horizontal, flip_vertical):
+        """
+        Pushes the frame to the display. If the rectangles that changed are known,
+        then only the union of this frame's and the last frame's rectangles are updated.
+
+        If the output is mirrored, then the same rectangles are mirrored
+        from the back buffer onto the display first.
+
+        Arguments:
+            dirty_rects {list} -- The rectangles drawn this frame, or None if unknown.
+            is_full_frame {bool} -- Was the whole surface cleared this frame?
+            render_surface {Surface} -- The surface the frame was rendered to.
+            flip_horizontal {bool} -- Is the output mirrored left to right?
+            flip_vertical {bool} -- Is the output mirrored top to bottom?
+        """
+
+        is_whole_surface = is_full_frame or dirty_rects is None
+        display_surface = pygame.display.get_surface()
+
+        if flip_horizontal or flip_vertical:
+            update_rects = [render_surface.get_rect()] if is_whole_surface \
+                else self.__last_dirty_rects__ + dirty_rects
+            update_rects = display.mirror_rects(render_surface,
+                                                display_surface,
+                                                update_rects,
+                                                flip_horizontal,
+                                                flip_vertical)
+        else:
+            update_rects = None if is_whole_surface \
+                else self.__last_dirty_rects__ + dirty_rects
+
+        if update_rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(update_rects)
+
+        self.__last_dirty_rects__ = dirty_rects
 
     def tick(self, clock):
         """
@@ -177,28 +439,52 @@ class HeadsUpDisplay(object):
         """
 
         current_fps = 0  # initialize up front avoids exception
+        dirty_rects = None
+        is_full_frame = True
+        view_index = None
+        frame_context = None
+        frame_start = timeit.default_timer()
+        self.__last_frame_start__ = frame_start
+        flip_horizontal = CONFIGURATION.flip_horizontal
+        flip_vertical = CONFIGURATION.flip_vertical
+        surface = self.__get_render_surface__(
+            pygame.display.get_surface(),
+            flip_horizontal or flip_vertical)
 
         try:
             self.frame_setup.start()
             if not self.__handle_input__():
                 return False
 
-            render_times = []
+            render_timers = []
 
-            orientation = self.__aircraft__.get_orientation()
+            # Worked out once here, instead of by every element.
+            frame_context = hud_elements.FrameContext(
+                self.__aircraft__.get_orientation(),
+                detail=self.__frame_governor__.detail)
 
-            view_name, view, view_uses_ahrs = self.__hud_views__[
-                CONFIGURATION.get_view_index()]
+            view_index = CONFIGURATION.get_view_index()
+            view_name, view, view_uses_ahrs = self.__hud_views__.show(
+                view_index)
             show_unavailable = view_uses_ahrs and not self.__aircraft__.is_ahrs_available()
 
+            elements_to_render = [self.__ahrs_not_available_element__] if show_unavailable \
+                else view
+
             current_fps = int(clock.get_fps())
-            surface = pygame.display.get_surface()
-            surface.fill(display.BLACK)
+            is_full_frame = self.__clear_frame__(
+                surface,
+                self.__get_frame_state__(
+                    view_index, show_unavailable, surface, flip_horizontal, flip_vertical),
+                view_name,
+                elements_to_render)
 
             self.frame_setup.stop()
             self.render_perf.start()
 
-            self.__render_view_title__(view_name, surface)
+            dirty_rects = []
+            self.__display_list__.reset_counts()
+            self.__refresh_scheduler__.begin_frame()
 
             # Order of drawing is important
             # The pitch lines are drawn before the other
@@ -209,12 +495,25 @@ class HeadsUpDisplay(object):
             # to overdraw the pitch lines
             # and improve readability
             try:
-                render_times = [self.__ahrs_not_available_element__.render(surface, orientation)] if show_unavailable \
-                    else [self.__render_view_element__(hud_element, orientation) for hud_element in view]
+                render_results = [self.__render_view_element__(hud_element, frame_context, surface)
+                                  for hud_element in elements_to_render]
+                render_timers = [element_timer for element_timer,
+                                 element_rects in render_results]
+
+                for element_timer, element_rects in render_results:
+                    if element_rects is None:
+                        dirty_rects = None
+                        break
+
+                    dirty_rects.extend(element_rects)
             except Exception as e:
+                dirty_rects = None
                 self.warn("LOOP:" + str(e))
             finally:
                 self.render_perf.stop()
+                self.__draw_commands__.push(
+                    self.__display_list__.command_count)
+                self.__draw_calls__.push(self.__display_list__.draw_call_count)
 
             self.frame_cleanup.start()
             now = datetime.datetime.utcnow()
@@ -222,8 +521,9 @@ class HeadsUpDisplay(object):
             if (self.__last_perf_render__ is None) or (now - self.__last_perf_render__).total_seconds() > 60:
                 self.__last_perf_render__ = now
 
-                [self.log('RENDER, {}, {}'.format(now, element_times))
-                    for element_times in render_times]
+                [self.log('RENDER, {}, {}'.format(now, element_timer.to_string()))
+                    for element_timer in render_timers
+                    if element_timer is not None]
 
                 [self.log('FRAME, {}, {}'.format(now, self.__frame_timers__[aspect].to_string()))
                     for aspect in self.__frame_timers__.keys()]
@@ -231,6 +531,42 @@ class HeadsUpDisplay(object):
                 self.log('OVERALL, {}, {}'.format(now,
                                                   self.__fps__.to_string()))
 
+                self.log('OVERALL, {}, {}'.format(now,
+                                                  self.__view_switch_latency__.to_string()))
+
+                [self.log('CACHE, {}, {}'.format(now, cache_stats.to_string()))
+                    for cache_stats in [self.__texture_cache_size__,
+                                        self.__texture_cache_misses__,
+                                        self.__texture_cache_purges__]]
+
+                self.log('CACHE, {}, RotatedText, {}'.format(
+                    now, hud_elements.HudDataCache.ROTATED_TEXT_CACHE.get_stats_string()))
+
+                [self.log('DRAW, {}, {}'.format(now, draw_stats.to_string()))
+                    for draw_stats in [self.__draw_commands__, self.__draw_calls__]]
+
+                [self.log('MEMO, {}, {}, skipped {} of {} ({:.0f}%)'.format(
+                    now, element_name, skips, frames, 100.0 * skips / frames))
+                    for element_name, (frames, skips) in sorted(self.__element_memo_counts__.items())
+                    if frames > 0]
+                self.__element_memo_counts__ = {}
+
+                self.log('GOVERNOR, {}, detail {} ({}), {:.1f}ms per frame'.format(
+                    now,
+                    self.__frame_governor__.level,
+                    self.__frame_governor__.detail.name,
+                    self.__frame_governor__.frame_ms or 0.0))
+
+                self.log('THERMAL, {}, {}'.format(
+                    now, thermal_governor.THERMAL_GOVERNOR.to_string()))
+
+                self.log('IDLE, {}, {:.1f}s waiting for a change'.format(
+                    now, self.__idle_seconds__))
+                self.__idle_seconds__ = 0.0
+
+                self.log('VIEWS, {}, {} elements built'.format(
+                    now, self.__hud_views__.get_built_element_count()))
+
                 self.log("-----------------------------------")
 
             if self.__should_render_perf__:
@@ -239,61 +575,298 @@ class HeadsUpDisplay(object):
                 render_perf_text = '{} / {}fps'.format(
                     self.render_perf.to_string(), current_fps)
 
-                self.__render_text__(render_perf_text, display.BLACK,
-                                     debug_status_left, debug_status_top, display.YELLOW)
+                perf_rect = self.__render_text__(surface, render_perf_text, display.BLACK,
+                                                 debug_status_left, debug_status_top, display.YELLOW)
+
+                if dirty_rects is not None:
+                    dirty_rects.append(perf_rect)
         finally:
             # Change the frame buffer
-            if CONFIGURATION.flip_horizontal or CONFIGURATION.flip_vertical:
-                flipped = pygame.transform.flip(
-                    surface, CONFIGURATION.flip_horizontal, CONFIGURATION.flip_vertical)
-                surface.blit(flipped, [0, 0])
-            pygame.display.update()
+            self.__present_frame__(dirty_rects,
+                                   is_full_frame,
+                                   surface,
+                                   flip_horizontal,
+                                   flip_vertical)
             self.__fps__.push(current_fps)
+            frame_seconds = timeit.default_timer() - frame_start
+            self.__track_view_switch__(view_index, frame_seconds)
+            self.__update_frame_governor__(frame_seconds)
+
+            # The frame is already on the screen, so use a little of
+            # the time left to rotate text that will likely be needed next.
+            hud_elements.HudDataCache.ROTATED_TEXT_CACHE.warm_pending(
+                ROTATED_TEXT_WARMS_PER_FRAME)
+            self.__update_views__()
+
+            if frame_context is not None:
+                self.__view_warmer__.warm(
+                    view_index,
+                    frame_context,
+                    surface,
+                    (VIEW_WARM_FRAME_FRACTION / self.__get_max_framerate__()) - frame_seconds)
             self.frame_cleanup.stop()
-            clock.tick(MAX_FRAMERATE)
+            clock.tick(self.__get_max_framerate__())
 
         return True
 
-    def __render_view_element__(self, hud_element, orientation):
+    def __get_max_framerate__(self):
+        """
+        Returns the most frames a second to draw, with
+        the cap from the thermal state, if there is one.
+        """
+
+        thermal_max_fps = self.__thermal_state__.max_fps
+
+        if thermal_max_fps is None:
+            return MAX_FRAMERATE
+
+        return min(MAX_FRAMERATE, thermal_max_fps)
+
+    def __get_frame_budget_ms__(self):
+        """
+        Returns how long a frame may take. The configured budget, or
+        longer when the thermal state lowers the frame rate.
+        """
+
+        return max(CONFIGURATION.get_frame_budget_ms(),
+                   1000.0 / self.__get_max_framerate__())
+
+    def __load_detail_ladder__(self):
+        """
+        Returns the detail ladder from the configuration.
+        Falls back to the built in ladder if the configured one can not be used.
+        """
+
+        try:
+            return frame_governor.get_detail_ladder(CONFIGURATION.get_detail_ladder())
+        except Exception as ex:
+            self.warn("Using the built in detail ladder. The configured one failed:{}".format(ex))
+
+            return frame_governor.DETAIL_LADDER
+
+    def __update_frame_governor__(self, frame_seconds):
+        """
+        Tells the governor how long the frame took, and hands out
+        the new detail when it changes. Only the traffic, the labels,
+        the rotated text, and the slow elements give up detail.
+        The instruments themselves are always drawn.
+
+        The thermal state, sampled in the background, sets the
+        budget, and the least detail that has to be given up.
+
+        Arguments:
+            frame_seconds {float} -- How long the frame took, up to being on the screen.
+        """
+
+        is_detail_changed = False
+        thermal_state = thermal_governor.THERMAL_GOVERNOR.state
+
+        if thermal_state is not self.__thermal_state__:
+            self.__thermal_state__ = thermal_state
+            is_detail_changed = self.__frame_governor__.set_limits(
+                self.__get_frame_budget_ms__(),
+                thermal_state.min_detail_level)
+
+        is_detail_changed = self.__frame_governor__.push_frame_ms(
+            frame_seconds * 1000.0) or is_detail_changed
+
+        if not is_detail_changed:
+            return
+
+        detail = self.__frame_governor__.detail
+        hud_elements.HudDataCache.update_rotated_text_cache_settings(
+            detail.min_roll_quantum)
+        self.__refresh_scheduler__.set_rate_scale(detail.refresh_rate_scale)
+
+        slowest_timers = sorted(self.__view_element_timers.values(),
+                                key=lambda timer: timer.get_last_ms(),
+                                reverse=True)[:3]
+
+        self.log('GOVERNOR, {}, detail {} ({}), {:.1f}ms per frame, slowest: {}'.format(
+            datetime.datetime.utcnow(),
+            self.__frame_governor__.level,
+            detail.name,
+            self.__frame_governor__.frame_ms,
+            ', '.join(['{} {:.1f}ms'.format(timer.task_name, timer.get_last_ms() or 0.0)
+                       for timer in slowest_timers])))
+
+    def __track_view_switch__(self, view_index, frame_seconds):
+        """
+        Records how long the first frame of a view took to reach
+        the screen, each time the pilot changes views.
+
+        Arguments:
+            view_index {int} -- The index of the view that was rendered. None if the frame failed.
+            frame_seconds {float} -- How long the frame took, up to being on the screen.
+        """
+
+        if view_index is None or view_index == self.__last_view_index__:
+            return
+
+        is_first_view = self.__last_view_index__ is None
+        self.__last_view_index__ = view_index
+
+        if is_first_view:
+            return
+
+        first_frame_ms = frame_seconds * 1000.0
+        self.__view_switch_latency__.push(first_frame_ms)
+        self.log('VIEW SWITCH, {}, first frame {:.1f}ms'.format(
+            self.__hud_views__[view_index].name, first_frame_ms))
+
+    def __update_views__(self):
+        """
+        Builds the views next to the one on the screen a little at a time,
+        and every so often releases the views that have not been shown for a while.
+        """
+
+        view_index = CONFIGURATION.get_view_index()
+
+        self.__hud_views__.warm_adjacent(
+            view_index, VIEW_ELEMENT_WARMS_PER_FRAME)
+
+        now = datetime.datetime.utcnow()
+
+        if (now - self.__last_idle_view_check__).total_seconds() < IDLE_VIEW_CHECK_SECONDS:
+            return
+
+        self.__last_idle_view_check__ = now
+        released_count = self.__hud_views__.release_idle(
+            view_index,
+            CONFIGURATION.get_idle_view_release_minutes() * 60.0)
+
+        if released_count > 0:
+            self.log("Released {} elements of idle views.".format(
+                released_count))
+
+    def __render_view_element__(self, hud_element, frame_context, surface):
+        """
+        Renders a single element of the view and times how long it took.
+
+        Arguments:
+            hud_element {object} -- The view element to render.
+            frame_context {FrameContext} -- The values worked out for the frame.
+            surface {Surface} -- The surface to render the element to.
+
+        Returns:
+            tuple -- The timer of the element (None on an error), and the rectangles the element drew to (None if unknown).
+        """
+
         element_name = str(hud_element)
 
         try:
-            surface = pygame.display.get_surface()
             if element_name not in self.__view_element_timers:
                 self.__view_element_timers[element_name] = TaskTimer(
                     element_name)
 
             timer = self.__view_element_timers[element_name]
             timer.start()
+            dirty_rects = None
             try:
-                hud_element.render(surface, orientation)
+                if hasattr(hud_element, 'render_display_list'):
+                    dirty_rects = self.__render_display_list_element__(
+                        element_name, hud_element, frame_context, surface)
+                else:
+                    dirty_rects = hud_element.render(surface, frame_context)
             except Exception as e:
                 self.warn('ELEMENT {} EX:{}'.format(element_name, e))
             timer.stop()
-            timer_string = timer.to_string()
 
-            return timer_string
+            return timer, dirty_rects
         except Exception as ex:
             self.warn('__render_view_element__ EX:{}'.format(ex))
 
-            return 'Element View Timer Error:{}'.format(ex)
+            return None, None
 
-    def __render_text__(self, text, color, position_x, position_y, background_color=None):
+    def get_view_element_timer(self, hud_element):
+        """
+        Returns the timer of an element that has been rendered on the screen.
+        The timer covers every render, including frames where the last
+        draw of the element was replayed, or its refresh was not due.
+
+        Arguments:
+            hud_element {object} -- The view element.
+
+        Returns:
+            TaskTimer -- The timer of the element, or None if it has not been rendered.
+        """
+
+        return self.__view_element_timers.get(str(hud_element))
+
+    def __render_display_list_element__(self, element_name, hud_element, frame_context, surface):
+        """
+        Renders an element that draws through the display list.
+
+        Elements with a refresh rate from the elements file are only
+        rendered when their refresh is due. On the other frames the draw
+        commands of their last render are run again.
+
+        Elements that have get_render_fingerprint return the values
+        they show, rounded the way they are shown. When the fingerprint
+        matches the last render, the draw commands of the last render
+        are run again, and the element is not asked to render.
+        A fingerprint of None means the element is always rendered.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
+        """
+
+        draw_list = self.__display_list__
+        draw_list.clear()
+
+        scheduler = self.__refresh_scheduler__
+        is_scheduled = scheduler.get_refresh_hz(hud_element) is not None
+        has_fingerprint = hasattr(hud_element, 'get_render_fingerprint')
+
+        if not is_scheduled and not has_fingerprint:
+            hud_element.render_display_list(draw_list, frame_context)
+
+            return draw_list.execute(surface)
+
+        if element_name not in self.__element_memo_counts__:
+            self.__element_memo_counts__[element_name] = [0, 0]
+
+        memo_counts = self.__element_memo_counts__[element_name]
+        memo_counts[0] += 1
+        memo = self.__element_memos__.get(hud_element)
+
+        if memo is not None and not scheduler.is_refresh_due(hud_element):
+            memo_counts[1] += 1
+            draw_list.replay(memo[1])
+
+            return draw_list.execute(surface)
+
+        fingerprint = hud_element.get_render_fingerprint(frame_context) \
+            if has_fingerprint else None
+
+        if memo is not None and fingerprint is not None and fingerprint == memo[0]:
+            memo_counts[1] += 1
+            draw_list.replay(memo[1])
+        else:
+            hud_element.render_display_list(draw_list, frame_context)
+
+            if fingerprint is not None or is_scheduled:
+                self.__element_memos__[hud_element] = (
+                    fingerprint, draw_list.get_commands())
+
+        return draw_list.execute(surface)
+
+    def __render_text__(self, surface, text, color, position_x, position_y, background_color=None):
         """
         Renders the text with the results centered on the given
         position.
+
+        Returns:
+            Rect -- The screen rectangle the text was drawn to.
         """
 
         rendered_text = self.__detail_font__.render(
             text, True, color, background_color)
         (text_width, text_height) = rendered_text.get_size()
-        surface = pygame.display.get_surface()
-
-        surface.blit(rendered_text,
-                     (position_x - (text_width >> 1),
-                         position_y - (text_height >> 1)))
 
-        return text_width, text_height
+        return surface.blit(rendered_text,
+                            (position_x - (text_width >> 1),
+                             position_y - (text_height >> 1)))
 
     def log(self, text):
         """
@@ -355,11 +928,13 @@ class HeadsUpDisplay(object):
         """
         Loads the list of available view elements from thee ifconfiguration
         file. Returns it as a map of the element name (Human/kind) to
-        the Python object that instantiates it, and if it uses the
-        "detail" (aka Large) font or not.
+        the Python object that instantiates it, if it uses the
+        "detail" (aka Large) font or not, and how many times a second
+        it is rendered. Elements without a "refresh_hz" are rendered
+        every frame.
 
         Returns:
-            map -- Keyed by element name, elements are tuples of object name / boolean
+            map -- Keyed by element name, elements are tuples of object name / boolean / refresh rate (None if every frame)
         """
 
         view_elements = {}
@@ -372,23 +947,30 @@ class HeadsUpDisplay(object):
                 file_module = getattr(sys.modules['views'], namespace[0])
                 class_name = getattr(file_module, namespace[1])
                 view_elements[view_element_name] = (
-                    class_name, json_config[view_element_name]['detail_font'])
+                    class_name,
+                    json_config[view_element_name]['detail_font'],
+                    json_config[view_element_name].get('refresh_hz'))
 
         return view_elements
 
     def __load_views(self, view_elements):
         """
-        Returns a list of views that can be used by the HUD
+        Returns the views that can be used by the HUD.
+        No elements are built until their view is needed.
 
         Arguments:
             view_elements {map} -- Dictionary keyed by element name containing the info to instantiate the element.
 
         Returns:
-            array -- Array of tuples. Each element is a tuple of the name of the view and an array of the elements that make the view. 
+            HudViews -- The views, in the order they are cycled through.
         """
 
-        hud_views = []
-        existing_elements = {}
+        loaded_views = []
+        # Instantiating multiple elements of the same type/font
+        # REALLY chews up memory.. and there is no
+        # good reason to use new instances anyway.
+        element_pool = hud_views.ElementPool(
+            view_elements, self.__build_ahrs_hud_element, self.__refresh_scheduler__)
         elements_requested = 0
 
         with open(VIEWS_FILE) as json_config_file:
@@ -399,43 +981,30 @@ class HeadsUpDisplay(object):
                 try:
                     view_name = view['name']
                     element_names = view['elements']
-                    new_view_elements = []
-
-                    for element_name in element_names:
-                        elements_requested += 1
-                        element_config = view_elements[element_name]
-                        element_hash_name = "{}{}".format(
-                            element_config[0], element_config[1])
-
-                        # Instantiating multiple elements of the same type/font
-                        # REALLY chews up memory.. and there is no
-                        # good reason to use new instances anyway.
-                        if element_hash_name not in existing_elements:
-                            new_element = self.__build_ahrs_hud_element(
-                                element_config[0], element_config[1])
-                            existing_elements[element_hash_name] = new_element
-
-                        new_view_elements.append(
-                            existing_elements[element_hash_name])
-
-                    is_ahrs_view = self.__is_ahrs_view__(new_view_elements)
-                    hud_views.append(
-                        (view_name, new_view_elements, is_ahrs_view))
+
+                    # Unknown elements fail the view now, rather
+                    # than when the view is first shown.
+                    [view_elements[element_name]
+                     for element_name in element_names]
+                    elements_requested += len(element_names)
+
+                    loaded_views.append(hud_views.HudView(
+                        view_name, element_names, element_pool))
                 except Exception as ex:
                     self.log(
                         "While attempting to load view={}, EX:{}".format(view, ex))
 
-        self.log("While loading, {} elements were requested, with {} unique being created.".format(
-            elements_requested, len(existing_elements.keys())))
+        self.log("While loading, {} elements were requested in {} views.".format(
+            elements_requested, len(loaded_views)))
 
-        return hud_views
+        return hud_views.HudViews(loaded_views, element_pool)
 
     def __build_hud_views(self):
         """
-        Returns the built object of the views.
+        Returns the views, ready to build their elements when needed.
 
         Returns:
-            array -- Array of tuples. Each element is a tuple of the name of the view and an array of the elements that make the view. 
+            HudViews -- The views, in the order they are cycled through. 
         """
 
         view_elements = self.__load_view_elements()
@@ -446,9 +1015,32 @@ class HeadsUpDisplay(object):
         hud_elements.HudDataCache.purge_old_textures()
         self.cache_perf.stop()
 
+        self.__update_texture_cache_stats__()
+
+    def __update_texture_cache_stats__(self):
+        """
+        Tracks the size of the text texture cache, and how many
+        misses and evictions it had since the last update.
+        """
+
+        size_in_bytes, texture_count, hits, misses, evictions = \
+            hud_elements.HudDataCache.get_texture_cache_stats()
+        last_misses, last_evictions = self.__last_texture_cache_totals__
+
+        self.__texture_cache_size__.push(size_in_bytes / 1024.0)
+        self.__texture_cache_misses__.push(misses - last_misses)
+        self.__texture_cache_purges__.push(evictions - last_evictions)
+        self.__last_texture_cache_totals__ = (misses, evictions)
+
     def __update_traffic_reports__(self):
         hud_elements.HudDataCache.update_traffic_reports()
 
+    def __update_thermal_governor__(self):
+        if thermal_governor.THERMAL_GOVERNOR.sample():
+            self.log('THERMAL, {}, {}'.format(
+                datetime.datetime.utcnow(),
+                thermal_governor.THERMAL_GOVERNOR.to_string()))
+
     def __update_aithre__(self):
         if not CONFIGURATION.aithre_enabled:
             return
@@ -461,18 +1053,55 @@ class HeadsUpDisplay(object):
             except:
                 self.warn("Error attempting to update Aithre sensor values")
 
-    def __init__(self, logger):
+    def __init__(self, logger, aircraft=None, start_services=True):
         """
         Initialize and create a new HUD.
+
+        Arguments:
+            logger {Logger} -- The logger to write to. May be None.
+
+        Keyword Arguments:
+            aircraft {Aircraft} -- The source of the orientation. A Stratux backed aircraft is created if None. (default: {None})
+            start_services {bool} -- Start the web server and the background update tasks. (default: {True})
         """
 
         self.__last_perf_render__ = None
+        # The change that was last drawn, and when the last frame started.
+        self.__drawn_version__ = None
+        self.__last_frame_start__ = timeit.default_timer()
+        # Time spent waiting for a change, since the last perf log.
+        self.__idle_seconds__ = 0.0
+        # Wakes the wait for a change. Only runs while frames are skipped.
+        self.__idle_wake_task__ = None
+        self.__last_dirty_rects__ = None
+        self.__last_frame_state__ = None
+        self.__static_layer__ = None
+        self.__back_buffer__ = None
         self.__logger__ = logger
         self.__view_element_timers = {}
         self.__fps__ = RollingStats('FPS')
         self.__texture_cache_size__ = RollingStats('TextureCacheSize')
         self.__texture_cache_misses__ = RollingStats('TextureCacheMisses')
         self.__texture_cache_purges__ = RollingStats('TextureCachePurges')
+        self.__last_texture_cache_totals__ = (0, 0)
+        self.__last_idle_view_check__ = datetime.datetime.utcnow()
+        self.__last_view_index__ = None
+        self.__view_switch_latency__ = RollingStats('ViewSwitchFirstFrame')
+        # Shared by the elements that draw through a display list.
+        self.__display_list__ = display_list.DisplayList()
+        self.__draw_commands__ = RollingStats('DrawCommands')
+        self.__draw_calls__ = RollingStats('DrawCalls')
+        # The thermal state the frame governor was last given.
+        self.__thermal_state__ = thermal_governor.THERMAL_GOVERNOR.state
+        self.__frame_governor__ = frame_governor.FrameGovernor(
+            self.__get_frame_budget_ms__(),
+            ladder=self.__load_detail_ladder__())
+        # The fingerprint and draw commands of the last frame of each
+        # element that can be memoized. Let go when the element is released.
+        self.__element_memos__ = weakref.WeakKeyDictionary()
+        # Keyed by element name. The frames, and the frames that were replayed,
+        # since the last perf log.
+        self.__element_memo_counts__ = {}
 
         self.render_perf = TaskTimer('Render')
         self.frame_setup = TaskTimer('Setup')
@@ -485,11 +1114,14 @@ class HeadsUpDisplay(object):
 
         self.__fps__.push(0)
 
+        boot_timeline.BOOT_TIMELINE.start_phase('display')
         self.__backpage_framebuffer__, screen_size = display.display_init()  # args.debug)
         self.__width__, self.__height__ = screen_size
 
         pygame.mouse.set_visible(False)
+        boot_timeline.BOOT_TIMELINE.end_phase('display')
 
+        boot_timeline.BOOT_TIMELINE.start_phase('fonts')
         pygame.font.init()
         self.__should_render_perf__ = False
 
@@ -497,23 +1129,50 @@ class HeadsUpDisplay(object):
         font_size_detail = int(self.__height__ / 12.0)
         font_size_loading = int(self.__height__ / 4.0)
 
-        self.__font__ = pygame.font.Font(
+        # Loaded through the texture cache so the textures
+        # rendered with them at boot can be kept on disk.
+        self.__font__ = texture_disk_cache.load_font(
             get_absolute_file_path("./assets/fonts/LiberationMono-Bold.ttf"), font_size_std)
-        self.__detail_font__ = pygame.font.Font(
+        self.__detail_font__ = texture_disk_cache.load_font(
             get_absolute_file_path("./assets/fonts/LiberationMono-Bold.ttf"), font_size_detail)
         self.__loading_font__ = pygame.font.Font(
             get_absolute_file_path("./assets/fonts/LiberationMono-Regular.ttf"), font_size_loading)
+        boot_timeline.BOOT_TIMELINE.end_phase('fonts')
+
+        # Everything after this overlaps the disclaimer.
+        boot_timeline.BOOT_TIMELINE.start_phase('boot screen')
         self.__show_boot_screen__()
+        self.__disclaimer_end_seconds__ = boot_timeline.BOOT_TIMELINE.get_elapsed_seconds() + \
+            DISCLAIMER_SECONDS
+        boot_timeline.BOOT_TIMELINE.end_phase('boot screen')
 
-        self.__aircraft__ = Aircraft(self.__logger__)
+        boot_timeline.BOOT_TIMELINE.start_phase('aircraft')
+        self.__aircraft__ = aircraft if aircraft is not None else Aircraft(
+            self.__logger__)
+        boot_timeline.BOOT_TIMELINE.end_phase('aircraft')
 
         self.__pixels_per_degree_y__ = int((self.__height__ / CONFIGURATION.get_degrees_of_pitch()) *
                                            CONFIGURATION.get_pitch_degrees_display_scaler())
 
+        boot_timeline.BOOT_TIMELINE.start_phase('views')
         self.__ahrs_not_available_element__ = self.__build_ahrs_hud_element(
             ahrs_not_available.AhrsNotAvailable)
 
+        self.__refresh_scheduler__ = hud_views.RefreshScheduler()
         self.__hud_views__ = self.__build_hud_views()
+        self.__view_warmer__ = hud_views.ViewWarmer(self.__hud_views__)
+        boot_timeline.BOOT_TIMELINE.end_phase('views')
+
+        if start_services:
+            boot_timeline.BOOT_TIMELINE.start_phase('services')
+            self.__start_services__()
+            boot_timeline.BOOT_TIMELINE.end_phase('services')
+
+    def __start_services__(self):
+        """
+        Starts the web server and the tasks that keep
+        the traffic, textures, and sensors up to date.
+        """
 
         logger = None
 
@@ -549,6 +1208,13 @@ class HeadsUpDisplay(object):
             logger,
             start_immediate=True)
 
+        RecurringTask(
+            "update_thermal_governor",
+            THERMAL_SAMPLE_SECONDS,
+            self.__update_thermal_governor__,
+            logger,
+            start_immediate=True)
+
     def __show_boot_screen__(self):
         """
         Renders a BOOTING screen.
@@ -14,10 +14,23 @@ import configuration
 import traffic
 import views.utils as utils
 
+import lib.change_signal as change_signal
+import lib.frame_governor as frame_governor
 from lib.display import WHITE, BLACK, YELLOW, display_init
+from lib.lru_cache import LruCache, get_surface_size_in_bytes
+from lib.projection import get_body_rotation, get_view_angles, get_view_angles_batch
+from lib.rotated_text_cache import RotatedTextCache
 from lib.task_timer import TaskTimer
 from traffic import AdsbTrafficClient, Traffic
 
+# The traffic is projected in batches with NumPy when it is installed.
+# Without it, each target is projected on its own.
+try:
+    import numpy
+    IS_NUMPY_AVAILABLE = True
+except ImportError:
+    IS_NUMPY_AVAILABLE = False
+
 SIN_RADIANS_BY_DEGREES = {}
 COS_RADIANS_BY_DEGREES = {}
 
@@ -26,6 +39,13 @@ imperial_occlude = units.yards_to_sm * 10
 imperial_faraway = units.yards_to_sm * 5
 imperial_superclose = units.yards_to_sm / 8.0
 
+MIN_RETICLE_SIZE = 0.05
+MAX_RETICLE_SIZE = 0.20
+
+# The widest line a reticle is drawn with. Reticles are only
+# culled once they are further off the screen than this.
+RETICLE_CULL_MARGIN = 20
+
 # Fill the quick trig look up tables.
 for degrees in range(-360, 361):
     radians = math.radians(degrees)
@@ -35,8 +55,8 @@ for degrees in range(-360, 361):
 
 def get_reticle_size(
     distance,
-    min_reticle_size=0.05,
-    max_reticle_size=0.20
+    min_reticle_size=MIN_RETICLE_SIZE,
+    max_reticle_size=MAX_RETICLE_SIZE
 ):
     """
     The the size of the reticle based on the distance of the target.
@@ -68,103 +88,146 @@ def get_reticle_size(
     return on_screen_reticle_scale
 
 
+class TrafficSnapshot(object):
+    """
+    The traffic known at one point in time.
+    Never changed once published, so it may be read without a lock.
+    """
+
+    def __init__(self, version, traffic, is_available):
+        """
+        Creates a new snapshot.
+
+        Arguments:
+            version {int} -- Increases every time the traffic changes.
+            traffic {tuple} -- The reliable traffic, closest first.
+            is_available {bool} -- Is the traffic manager responding?
+        """
+
+        self.version = version
+        self.traffic = traffic
+        self.is_available = is_available
+
+
 class HudDataCache(object):
-    TEXT_TEXTURE_CACHE = {}
-    __CACHE_ENTRY_LAST_USED__ = {}
+    TEXT_TEXTURE_CACHE = LruCache(
+        configuration.CONFIGURATION.get_texture_cache_max_bytes())
     __CACHE_INVALIDATION_TIME__ = 60 * 5
 
-    RELIABLE_TRAFFIC = []
-    IS_TRAFFIC_AVAILABLE = False
+    # Only used from the render thread, so it is not locked.
+    ROTATED_TEXT_CACHE = RotatedTextCache(
+        roll_quantum=configuration.CONFIGURATION.get_rotated_text_roll_quantum(),
+        max_entries=configuration.CONFIGURATION.get_rotated_text_max_textures())
+
+    # Replaced, never modified, so readers take it with a single
+    # attribute read and always see a complete snapshot.
+    TRAFFIC_SNAPSHOT = TrafficSnapshot(0, (), False)
 
     __LOCK__ = threading.Lock()
+    __TRAFFIC_LOCK__ = threading.Lock()
+    __TRAFFIC_FINGERPRINT__ = None
 
     __TRAFFIC_CLIENT__ = AdsbTrafficClient(
         configuration.CONFIGURATION.get_traffic_manager_address())
 
     @staticmethod
     def update_traffic_reports():
-        HudDataCache.__LOCK__.acquire()
+        """
+        Publishes a new traffic snapshot if the traffic has changed.
+        """
+
+        HudDataCache.__TRAFFIC_LOCK__.acquire()
 
         try:
-            HudDataCache.RELIABLE_TRAFFIC = traffic.AdsbTrafficClient.TRAFFIC_MANAGER.get_traffic_with_position()
-            HudDataCache.IS_TRAFFIC_AVAILABLE = traffic.AdsbTrafficClient.TRAFFIC_MANAGER.is_traffic_available()
+            reliable_traffic = traffic.AdsbTrafficClient.TRAFFIC_MANAGER.get_traffic_with_position()
+            is_available = traffic.AdsbTrafficClient.TRAFFIC_MANAGER.is_traffic_available()
+            fingerprint = (is_available,
+                           tuple([(report.icao_address, report.time_decoded) for report in reliable_traffic]))
+
+            if fingerprint != HudDataCache.__TRAFFIC_FINGERPRINT__:
+                HudDataCache.__TRAFFIC_FINGERPRINT__ = fingerprint
+                HudDataCache.TRAFFIC_SNAPSHOT = TrafficSnapshot(
+                    HudDataCache.TRAFFIC_SNAPSHOT.version + 1,
+                    tuple([report.clone() for report in reliable_traffic]),
+                    is_available)
+                change_signal.CHANGE_SIGNAL.changed()
         finally:
-            HudDataCache.__LOCK__.release()
+            HudDataCache.__TRAFFIC_LOCK__.release()
+
+    @staticmethod
+    def get_traffic_snapshot():
+        """
+        Returns the most recently published traffic.
+
+        Returns:
+            TrafficSnapshot -- The traffic, and the version of it.
+        """
+
+        return HudDataCache.TRAFFIC_SNAPSHOT
 
     @staticmethod
     def get_reliable_traffic():
         """
-        Returns a thread safe copy of the currently known reliable traffic.
+        Returns a copy of the currently known reliable traffic.
 
         Returns:
             list -- A list of the reliable traffic.
         """
-        traffic_clone = None
-        HudDataCache.__LOCK__.acquire()
-        try:
-            traffic_clone = HudDataCache.RELIABLE_TRAFFIC[:]
-        finally:
-            HudDataCache.__LOCK__.release()
 
-        return traffic_clone
+        return list(HudDataCache.TRAFFIC_SNAPSHOT.traffic)
 
     @staticmethod
-    def __purge_texture__(
-        texture_to_purge
-    ):
+    def purge_old_textures():
         """
-        Attempts to remove a texture from the cache.
+        Removes the textures that have not been used for a while.
+        Only the stale textures are visited, so this is cheap to call.
 
-        Arguments:
-            texture_to_purge {string} -- The identifier of the texture to remove from the system.
+        Also picks up any change to the size the cache is allowed to be.
+
+        Returns:
+            int -- The number of textures removed.
         """
 
+        HudDataCache.__LOCK__.acquire()
         try:
-            del HudDataCache.TEXT_TEXTURE_CACHE[texture_to_purge]
-            del HudDataCache.__CACHE_ENTRY_LAST_USED__[texture_to_purge]
+            HudDataCache.TEXT_TEXTURE_CACHE.set_max_size_in_bytes(
+                configuration.CONFIGURATION.get_texture_cache_max_bytes())
+
+            return HudDataCache.TEXT_TEXTURE_CACHE.purge_unused(
+                HudDataCache.__CACHE_INVALIDATION_TIME__)
         finally:
-            return True
+            HudDataCache.__LOCK__.release()
 
     @staticmethod
-    def __get_purge_key__(
-        now,
-        texture_key
-    ):
+    def update_rotated_text_cache_settings(min_roll_quantum=1):
         """
-        Returns the key of the traffic to purge if it should be, otherwise returns None.
+        Applies the configured roll quantum and size to the rotated text cache.
+        Must be called from the render thread.
 
-        Arguments:
-            now {datetime} -- The current time.
-            texture_key {string} -- The identifier of the texture we are interesting in.
-
-        Returns:
-            string -- The identifier to purge, or None
+        Keyword Arguments:
+            min_roll_quantum {int} -- The fewest degrees between each roll, when detail has been given up. (default: {1})
         """
 
-        lsu = HudDataCache.__CACHE_ENTRY_LAST_USED__[texture_key]
-        time_since_last_use = (
-            datetime.datetime.utcnow() - lsu).total_seconds()
-
-        return texture_key if time_since_last_use > HudDataCache.__CACHE_INVALIDATION_TIME__ else None
+        HudDataCache.ROTATED_TEXT_CACHE.set_roll_quantum(
+            max(min_roll_quantum,
+                configuration.CONFIGURATION.get_rotated_text_roll_quantum()))
+        HudDataCache.ROTATED_TEXT_CACHE.set_max_entries(
+            configuration.CONFIGURATION.get_rotated_text_max_textures())
 
     @staticmethod
-    def purge_old_textures():
+    def get_texture_cache_stats():
         """
-        Works through the traffic reports and removes any traffic that is
-        old, or the cache has timed out on.
+        Returns a thread safe snapshot of how the text texture cache is doing.
+
+        Returns:
+            tuple -- The size in bytes, the number of textures, and the total hits, misses, and evictions.
         """
 
-        # The second hardest problem in comp-sci...
-        textures_to_purge = []
         HudDataCache.__LOCK__.acquire()
         try:
-            now = datetime.datetime.utcnow()
-            textures_to_purge = [HudDataCache.__get_purge_key__(now, texture_key)
-                                 for texture_key in HudDataCache.__CACHE_ENTRY_LAST_USED__]
-            textures_to_purge = filter(lambda x: x is not None,
-                                       textures_to_purge)
-            [HudDataCache.__purge_texture__(texture_to_purge)
-             for texture_to_purge in textures_to_purge]
+            cache = HudDataCache.TEXT_TEXTURE_CACHE
+
+            return cache.get_size_in_bytes(), len(cache), cache.hits, cache.misses, cache.evictions
         finally:
             HudDataCache.__LOCK__.release()
 
@@ -179,8 +242,7 @@ class HudDataCache(object):
     ):
         """
         Retrieves a cached texture.
-        If the texture with the given text does not already exists, creates it.
-        Uses only the text has the key. If the colors change, the cache is not invalidated or changed.
+        If the texture with the given text, font, and colors does not already exists, creates it.
 
         Arguments:
             text {string} -- The text to generate a texture for.
@@ -190,32 +252,415 @@ class HudDataCache(object):
             text_color {tuple} -- The RGB color for the text. (default: {BLACK})
             background_color {tuple} -- The RGB color for the BACKGROUND. (default: {YELLOW})
             use_alpha {bool} -- Should alpha be used? (default: {False})
+            force_regen {bool} -- Render the texture again, even if it is cached. (default: {False})
 
         Returns:
             [tuple] -- The texture and the size of the texture
         """
 
-        result = None
+        texture_key = (text,
+                       id(font),
+                       tuple(text_color),
+                       tuple(background_color) if background_color is not None else None,
+                       use_alpha)
+
         HudDataCache.__LOCK__.acquire()
         try:
-            if text not in HudDataCache.TEXT_TEXTURE_CACHE or force_regen:
+            result = None if force_regen \
+                else HudDataCache.TEXT_TEXTURE_CACHE.get(texture_key)
+
+            if result is None:
                 texture = font.render(text, True, text_color, background_color)
                 size = texture.get_size()
 
                 if use_alpha:
                     texture = texture.convert()
 
-                HudDataCache.TEXT_TEXTURE_CACHE[text] = texture, size
-
-            HudDataCache.__CACHE_ENTRY_LAST_USED__[
-                text] = datetime.datetime.utcnow()
-            result = HudDataCache.TEXT_TEXTURE_CACHE[text]
+                result = texture, size
+                HudDataCache.TEXT_TEXTURE_CACHE.put(
+                    texture_key, result, get_surface_size_in_bytes(texture))
         finally:
             HudDataCache.__LOCK__.release()
 
         return result
 
 
+class ProjectionGeometry(object):
+    """
+    The screen that targets are projected onto.
+    Elements with the same geometry share their projections.
+    """
+
+    def __init__(self, pixels_per_degree_x, pixels_per_degree_y, framebuffer_size):
+        """
+        Describes the screen.
+
+        Arguments:
+            pixels_per_degree_x {float} -- The horizontal scale of the heading bugs.
+            pixels_per_degree_y {float} -- The scale of the on screen projection.
+            framebuffer_size {tuple} -- The width and height of the screen.
+        """
+
+        self.pixels_per_degree_x = pixels_per_degree_x
+        self.pixels_per_degree_y = pixels_per_degree_y
+        self.width, self.height = framebuffer_size
+        self.center = (self.width >> 1, self.height >> 1)
+        self.key = (pixels_per_degree_x, pixels_per_degree_y, tuple(framebuffer_size))
+
+
+class TrafficProjection(object):
+    """
+    Where a single target is drawn on the screen, and the text that
+    describes it, worked out once per frame and shared by every
+    element that shows the target.
+    """
+
+    def __init__(self, traffic_report, frame_context, magnetic_bearing, bug_x, reticle_scale,
+                 screen_position, is_on_screen):
+        """
+        Holds the projection of the target.
+
+        Arguments:
+            traffic_report {Traffic} -- The target.
+            frame_context {FrameContext} -- The frame the target is projected for.
+            magnetic_bearing {int} -- The bearing to the target, with the declination applied.
+            bug_x {int} -- Where the heading bug is drawn.
+            reticle_scale {float} -- The size of the reticle, in proportion to the screen.
+            screen_position {tuple} -- Where the on screen reticle is drawn, for the full attitude of the aircraft.
+            is_on_screen {bool} -- Would any of the on screen reticle be visible?
+        """
+
+        self.traffic = traffic_report
+        self.__frame_context__ = frame_context
+        self.identifier = traffic_report.get_display_name()
+        self.magnetic_bearing = magnetic_bearing
+        self.bug_x = bug_x
+        self.reticle_scale = reticle_scale
+        self.is_below = (frame_context.alt - 100) > traffic_report.altitude
+        self.screen_x, self.screen_y = screen_position
+        self.is_on_screen = is_on_screen
+        self.__additional_text__ = None
+
+    def get_additional_text(self):
+        """
+        Returns the text shown on the target's card.
+        Only formatted for targets that have a card.
+
+        Returns:
+            list -- The bearing, distance, and altitude text.
+        """
+
+        if self.__additional_text__ is None:
+            altitude_delta = int(
+                (self.traffic.altitude - self.__frame_context__.alt) / 100.0)
+            distance_text = units.get_converted_units_string(
+                self.__frame_context__.distance_units, self.traffic.distance)
+            delta_sign = '+' if altitude_delta > 0 else ''
+
+            self.__additional_text__ = ["{0}".format(int(self.magnetic_bearing)),
+                                        distance_text,
+                                        "{0}{1}".format(delta_sign, altitude_delta)]
+
+        return self.__additional_text__
+
+
+def is_reticle_on_screen(screen_x, screen_y, reticle_scale, geometry):
+    """
+    Would any part of an on screen reticle be visible?
+
+    Arguments:
+        screen_x {float} -- The center of the reticle.
+        screen_y {float} -- The center of the reticle.
+        reticle_scale {float} -- The size of the reticle, in proportion to the screen.
+        geometry {ProjectionGeometry} -- The screen.
+
+    Returns:
+        bool -- False if the reticle is entirely off the screen.
+    """
+
+    reach = int(geometry.height * reticle_scale) + RETICLE_CULL_MARGIN
+
+    return -reach <= screen_x <= geometry.width + reach \
+        and -reach <= screen_y <= geometry.height + reach
+
+
+def project_traffic(frame_context, traffic_report, geometry):
+    """
+    Projects a single target, one value at a time.
+
+    Arguments:
+        frame_context {FrameContext} -- The frame to project for.
+        traffic_report {Traffic} -- The target.
+        geometry {ProjectionGeometry} -- The screen to project onto.
+
+    Returns:
+        TrafficProjection -- The target, projected for the frame.
+    """
+
+    magnetic_bearing = frame_context.apply_declination(traffic_report.bearing)
+    reticle_scale = get_reticle_size(traffic_report.distance)
+
+    altitude_delta = int(traffic_report.altitude - frame_context.alt)
+    horizontal_degrees_to_target, vertical_degrees_to_target = get_view_angles(
+        frame_context.get_body_rotation(),
+        magnetic_bearing,
+        traffic_report.distance,
+        altitude_delta)
+
+    origin_x, origin_y = geometry.center
+    screen_x = origin_x + \
+        (horizontal_degrees_to_target * geometry.pixels_per_degree_y)
+    screen_y = origin_y - \
+        (vertical_degrees_to_target * geometry.pixels_per_degree_y)
+
+    return TrafficProjection(traffic_report,
+                             frame_context,
+                             magnetic_bearing,
+                             get_heading_bug_x(frame_context.heading,
+                                               magnetic_bearing,
+                                               geometry.pixels_per_degree_x),
+                             reticle_scale,
+                             (screen_x, screen_y),
+                             is_reticle_on_screen(screen_x, screen_y, reticle_scale, geometry))
+
+
+def project_traffic_batch(frame_context, traffic_reports, geometry):
+    """
+    Projects all of the targets at once with NumPy. Does the same
+    math as project_traffic, but as a handful of array operations
+    and a single matrix multiply, rather than a pass through
+    Python for every target.
+
+    Arguments:
+        frame_context {FrameContext} -- The frame to project for.
+        traffic_reports {list} -- The targets.
+        geometry {ProjectionGeometry} -- The screen to project onto.
+
+    Returns:
+        list -- For each target, in the same order, the values to build its TrafficProjection with.
+    """
+
+    count = len(traffic_reports)
+    bearings = numpy.fromiter((traffic_report.bearing for traffic_report in traffic_reports),
+                              numpy.float64, count)
+    distances = numpy.fromiter((traffic_report.distance for traffic_report in traffic_reports),
+                               numpy.float64, count)
+    altitudes = numpy.fromiter((traffic_report.altitude for traffic_report in traffic_reports),
+                               numpy.float64, count)
+    heading = frame_context.heading
+
+    # Same as utils.get_magnetic_heading
+    magnetic_bearings = (bearings - frame_context.declination).astype(numpy.int64)
+    magnetic_bearings[magnetic_bearings < 0] += 360
+    magnetic_bearings[magnetic_bearings > 360] -= 360
+
+    # Same as get_heading_bug_x
+    bug_deltas = magnetic_bearings - heading + 180
+    bug_deltas[bug_deltas < 0] += 360
+    bug_deltas[bug_deltas > 360] -= 360
+    bug_xs = (bug_deltas * geometry.pixels_per_degree_x).astype(numpy.int64)
+
+    # Same as get_reticle_size
+    reticle_ratios = (distances - imperial_superclose) / \
+        (imperial_faraway - imperial_superclose)
+    reticle_scales = numpy.where(
+        distances <= imperial_superclose,
+        MAX_RETICLE_SIZE,
+        numpy.where(distances >= imperial_faraway,
+                    MIN_RETICLE_SIZE,
+                    MIN_RETICLE_SIZE + ((MAX_RETICLE_SIZE - MIN_RETICLE_SIZE) * (1.0 - reticle_ratios))))
+
+    altitude_deltas = (altitudes - frame_context.alt).astype(numpy.int64)
+    horizontal_degrees, vertical_degrees = get_view_angles_batch(
+        frame_context.get_body_rotation(),
+        magnetic_bearings,
+        distances,
+        altitude_deltas)
+
+    origin_x, origin_y = geometry.center
+    screen_xs = origin_x + (horizontal_degrees * geometry.pixels_per_degree_y)
+    screen_ys = origin_y - (vertical_degrees * geometry.pixels_per_degree_y)
+
+    # Cull the reticles that would be drawn entirely off the screen.
+    reaches = (geometry.height * reticle_scales).astype(numpy.int64) + \
+        RETICLE_CULL_MARGIN
+    is_on_screen = (screen_xs >= -reaches) & (screen_xs <= geometry.width + reaches) \
+        & (screen_ys >= -reaches) & (screen_ys <= geometry.height + reaches)
+
+    # Building the projections costs more than the math, so only
+    # the values are kept. The projections are built as the elements
+    # ask for them, and most elements only show the closest targets.
+    return zip(magnetic_bearings.tolist(),
+               bug_xs.tolist(),
+               reticle_scales.tolist(),
+               zip(screen_xs.tolist(), screen_ys.tolist()),
+               is_on_screen.tolist())
+
+
+class FrameContext(object):
+    """
+    The values that every element needs to render a frame,
+    worked out once per frame by the HUD rather than by each element.
+    Never changed once built.
+
+    Stands in for the orientation. Anything that the context does not
+    hold is read from the orientation, so elements that were written
+    against the orientation keep working when given a context.
+    """
+
+    def __init__(self, orientation, traffic_snapshot=None, frame_time=None, detail=None):
+        """
+        Works out the values for a frame.
+
+        Arguments:
+            orientation {AhrsData} -- The orientation of the aircraft.
+
+        Keyword Arguments:
+            traffic_snapshot {TrafficSnapshot} -- The traffic to render. The latest if None. (default: {None})
+            frame_time {datetime} -- When the frame is being rendered. Now if None. (default: {None})
+            detail {DetailLevel} -- How much detail to draw. Full detail if None. (default: {None})
+        """
+
+        declination = configuration.CONFIGURATION.get_declination()
+        heading = orientation.get_onscreen_projection_heading()
+        detail = detail if detail is not None else frame_governor.FULL_DETAIL
+
+        # Set through the dictionary, since setting attributes is not allowed.
+        self.__dict__.update({
+            'orientation': orientation,
+            'declination': declination,
+            'heading': heading,
+            'magnetic_heading': utils.get_magnetic_heading(heading, declination),
+            'distance_units': configuration.CONFIGURATION.get_units(),
+            'traffic_snapshot': traffic_snapshot if traffic_snapshot is not None
+            else HudDataCache.get_traffic_snapshot(),
+            'frame_time': frame_time if frame_time is not None
+            else datetime.datetime.utcnow(),
+            'detail': detail,
+            'max_target_bugs': max_target_bugs if detail.max_target_bugs is None
+            else min(max_target_bugs, detail.max_target_bugs),
+            # Keyed by the screen geometry and the ICAO address.
+            # Filled in as the elements ask for targets.
+            '__traffic_projections__': {},
+            # Keyed by the screen geometry. Holds what the batch worked out.
+            '__batched_projections__': {},
+            # Built the first time a target is projected.
+            '__body_rotation__': None})
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "The FrameContext can not be changed. Tried to set {}".format(name))
+
+    def __getattr__(self, name):
+        # Only called for what the context does not hold.
+        orientation = self.__dict__.get('orientation')
+
+        if orientation is None:
+            raise AttributeError(name)
+
+        return getattr(orientation, name)
+
+    def get_onscreen_projection_heading(self):
+        """
+        Returns the heading the screen is projected along.
+        Same as the heading, for elements written against the orientation.
+        """
+
+        return self.heading
+
+    def apply_declination(self, heading):
+        """
+        Converts a heading from true to magnetic using the declination of the frame.
+
+        Arguments:
+            heading {float} -- The TRUE heading.
+
+        Returns:
+            float -- The MAGNETIC heading.
+        """
+
+        return utils.get_magnetic_heading(heading, self.declination)
+
+    def get_body_rotation(self):
+        """
+        Returns the rotation from the world into the body of the aircraft
+        for the frame. Worked out once, then shared by every target.
+
+        Returns:
+            tuple -- The rows of the rotation matrix.
+        """
+
+        if self.__body_rotation__ is None:
+            # The context can not be changed, but filling in
+            # a value that never changes once it is known is fine.
+            self.__dict__['__body_rotation__'] = get_body_rotation(
+                self.heading, self.pitch, self.roll)
+
+        return self.__body_rotation__
+
+    def get_traffic_projection(self, traffic_report, geometry):
+        """
+        Returns where the target is drawn this frame. The traffic is
+        projected the first time any element asks for it, then every
+        other element with the same screen geometry shares the result.
+
+        With NumPy, all of the traffic in the snapshot is projected
+        in one batch. Without it, each target is projected as it is asked for.
+
+        Arguments:
+            traffic_report {Traffic} -- The target.
+            geometry {ProjectionGeometry} -- The screen to project onto.
+
+        Returns:
+            TrafficProjection -- The target, projected for the frame.
+        """
+
+        if IS_NUMPY_AVAILABLE and geometry.key not in self.__batched_projections__:
+            self.__batched_projections__[geometry.key] = self.__project_snapshot__(
+                geometry)
+
+        projection_key = (geometry.key, traffic_report.icao_address)
+        projection = self.__traffic_projections__.get(projection_key)
+
+        if projection is None:
+            batched_values = self.__batched_projections__.get(
+                geometry.key, {}).get(traffic_report.icao_address)
+
+            if batched_values is not None:
+                projection = TrafficProjection(
+                    traffic_report, self, *batched_values)
+            else:
+                projection = project_traffic(self, traffic_report, geometry)
+
+            self.__traffic_projections__[projection_key] = projection
+
+        return projection
+
+    def __project_snapshot__(self, geometry):
+        """
+        Projects all of the traffic in the snapshot at once.
+        Traffic the batch can not handle, such as a frame without
+        a heading, is left to be projected one target at a time.
+
+        Returns:
+            dict -- Keyed by the ICAO address, the values for each projection.
+        """
+
+        traffic_reports = self.traffic_snapshot.traffic
+
+        if len(traffic_reports) == 0:
+            return {}
+
+        try:
+            batched_values = project_traffic_batch(
+                self, traffic_reports, geometry)
+        except (TypeError, ValueError):
+            return {}
+
+        return {traffic_report.icao_address: values
+                for traffic_report, values in zip(traffic_reports, batched_values)}
+
+
 def get_heading_bug_x(
     heading,
     bearing,
@@ -258,13 +703,8 @@ def get_onscreen_traffic_projection__(
     """
 
     # Assumes traffic.position_valid
-    # TODO - Account for aircraft roll...
-    slope = altitude_delta / distance
-    vertical_degrees_to_target = math.degrees(math.atan(slope))
-    vertical_degrees_to_target -= pitch
-
-    # TODO - Double check ALL of this math...
-    horizontal_degrees_to_target = bearing - heading
+    horizontal_degrees_to_target, vertical_degrees_to_target = get_view_angles(
+        get_body_rotation(heading, pitch, roll), bearing, distance, altitude_delta)
 
     screen_y = -vertical_degrees_to_target * pixels_per_degree
     screen_x = horizontal_degrees_to_target * pixels_per_degree
@@ -323,7 +763,8 @@ def run_ahrs_hud_element(
         orientation.utc_time = str(datetime.utcnow())
         __aircraft__.simulate()
         __backpage_framebuffer__.fill(BLACK)
-        hud_element.render(__backpage_framebuffer__, orientation)
+        hud_element.render_static(__backpage_framebuffer__)
+        hud_element.render(__backpage_framebuffer__, FrameContext(orientation))
         pygame.display.flip()
         clock.tick(60)
 
@@ -388,11 +829,13 @@ def run_adsb_hud_element(
                 test_data.icao_address,
                 test_data.to_json())
 
+        HudDataCache.update_traffic_reports()
         HudDataCache.purge_old_textures()
         orientation = __aircraft__.get_ahrs()
         __aircraft__.simulate()
         __backpage_framebuffer__.fill(BLACK)
-        hud_element.render(__backpage_framebuffer__, orientation)
+        hud_element.render_static(__backpage_framebuffer__)
+        hud_element.render(__backpage_framebuffer__, FrameContext(orientation))
         pygame.display.flip()
         clock.tick(60)
 
@@ -0,0 +1,649 @@
+"""
+The views of the HUD, with elements that are only built
+when they are about to be shown.
+
+Building an element renders its tables of textures, which takes
+time at boot and memory for the whole flight. Views that are
+rarely visited only pay for that once they are visited, and give
+the memory back after they have not been shown for a while.
+"""
+
+import time
+import timeit
+import weakref
+
+# How often the views next to the one on the screen are rendered again,
+# so their caches follow the orientation.
+WARM_REFRESH_SECONDS = 2.0
+
+# The soonest the views are rendered again after the traffic changes.
+# Traffic cards and distances need the newest traffic to be any use.
+WARM_TRAFFIC_REFRESH_SECONDS = 0.25
+
+# The most elements with a refresh rate that are rendered in a single frame.
+# The rest wait for the next frame, so their refreshes never pile up.
+MAX_SCHEDULED_REFRESHES_PER_FRAME = 1
+
+# Spreads the first refresh of each element across its period.
+# Each new element lands in the biggest gap left by the ones before it.
+GOLDEN_RATIO_FRACTION = 0.6180339887
+
+
+class ElementPool(object):
+    """
+    Builds the elements of the views on demand. Views that use the
+    same element with the same font share a single instance.
+    """
+
+    def __init__(self, view_elements, build_element, refresh_scheduler=None):
+        """
+        Creates a new pool, with nothing built.
+
+        Arguments:
+            view_elements {map} -- Keyed by element name, elements are tuples of class / uses the detail font / refresh rate.
+            build_element {function} -- Takes the class and the detail font flag, returns the built element.
+
+        Keyword Arguments:
+            refresh_scheduler {RefreshScheduler} -- Told the refresh rate of each element that is built. (default: {None})
+        """
+
+        self.__view_elements__ = view_elements
+        self.__build_element__ = build_element
+        self.__refresh_scheduler__ = refresh_scheduler
+        # Keyed by the class and font of the element. Holds the built element.
+        self.__elements__ = {}
+
+    def __get_element_key__(self, element_name):
+        element_class, use_detail_font, refresh_hz = self.__view_elements__[
+            element_name]
+
+        return "{}{}".format(element_class, use_detail_font)
+
+    def get_element(self, element_name):
+        """
+        Returns the element, building it if it has not been built.
+
+        Arguments:
+            element_name {string} -- The name of the element from the elements file.
+
+        Returns:
+            object -- The element. None if it could not be built.
+        """
+
+        element_key = self.__get_element_key__(element_name)
+
+        if element_key not in self.__elements__:
+            element_class, use_detail_font, refresh_hz = self.__view_elements__[
+                element_name]
+            hud_element = self.__build_element__(
+                element_class, use_detail_font)
+            self.__elements__[element_key] = hud_element
+
+            if hud_element is not None and refresh_hz is not None \
+                    and self.__refresh_scheduler__ is not None:
+                self.__refresh_scheduler__.set_refresh_hz(
+                    hud_element, refresh_hz)
+
+        return self.__elements__[element_key]
+
+    def is_element_built(self, element_name):
+        """
+        Returns True if the element has already been built.
+        """
+
+        return self.__get_element_key__(element_name) in self.__elements__
+
+    def release_unused(self, element_names_in_use):
+        """
+        Drops every element that is not one of the given elements,
+        so that the element and its textures can be freed.
+
+        Arguments:
+            element_names_in_use {iterable} -- The names of the elements that must be kept.
+
+        Returns:
+            int -- The number of elements dropped.
+        """
+
+        keys_in_use = set([self.__get_element_key__(element_name)
+                           for element_name in element_names_in_use])
+        keys_to_release = [element_key for element_key in self.__elements__
+                           if element_key not in keys_in_use]
+
+        [self.__elements__.pop(element_key)
+         for element_key in keys_to_release]
+
+        return len(keys_to_release)
+
+    def get_built_count(self):
+        """
+        Returns the number of elements that are built.
+        """
+
+        return len(self.__elements__)
+
+
+class RefreshScheduler(object):
+    """
+    Decides which of the elements with a refresh rate are rendered
+    on a frame. Elements without a rate are rendered every frame.
+
+    The first refresh of each element is offset into its period,
+    from when the element was scheduled, and only a few refreshes
+    are allowed per frame, so that slow elements do not all render
+    on the same frame.
+
+    >>> class Element(object):
+    ...     pass
+    >>> scheduler = RefreshScheduler(start_time=0.0)
+    >>> elements = [Element(), Element()]
+    >>> [scheduler.set_refresh_hz(hud_element, 2) for hud_element in elements]
+    [None, None]
+    >>> frames = []
+    >>> for frame in range(60):
+    ...     scheduler.begin_frame(frame / 60.0)
+    ...     frames.append([scheduler.is_refresh_due(hud_element) for hud_element in elements])
+    >>> [sum(due) for due in zip(*frames)]
+    [2, 2]
+    >>> max([sum(due) for due in frames])
+    1
+    >>> scheduler.is_refresh_due(Element())
+    True
+
+    Elements are built as their views are first shown, well after the
+    scheduler starts. They are still spread across their periods.
+
+    >>> late_elements = [Element(), Element(), Element()]
+    >>> [scheduler.set_refresh_hz(hud_element, 2) for hud_element in late_elements]
+    [None, None, None]
+    >>> first_refreshes = [None, None, None]
+    >>> for frame in range(60, 90):
+    ...     scheduler.begin_frame(frame / 60.0)
+    ...     for index, hud_element in enumerate(late_elements):
+    ...         if scheduler.is_refresh_due(hud_element) and first_refreshes[index] is None:
+    ...             first_refreshes[index] = frame
+    >>> first_refreshes
+    [67, 85, 74]
+    """
+
+    def __init__(self, start_time=None):
+        """
+        Creates a scheduler with no elements.
+
+        Keyword Arguments:
+            start_time {float} -- When the periods start, from timeit.default_timer. Now if None. (default: {None})
+        """
+
+        self.__start_time__ = timeit.default_timer() if start_time is None else start_time
+        # Keyed by element. Holds the period and when the next refresh is due.
+        # Let go when the element is released.
+        self.__schedules__ = weakref.WeakKeyDictionary()
+        self.__scheduled_count__ = 0
+        self.__now__ = self.__start_time__
+        self.__refreshes_this_frame__ = 0
+        self.__rate_scale__ = 1.0
+
+    def set_rate_scale(self, rate_scale):
+        """
+        Scales the refresh rate of every element that has one.
+        Used to give up detail when the frames run long.
+
+        Arguments:
+            rate_scale {float} -- 1.0 for the rates from the elements file, 0.5 for half as often.
+        """
+
+        self.__rate_scale__ = rate_scale
+
+    def set_refresh_hz(self, hud_element, refresh_hz):
+        """
+        Sets how many times a second the element is rendered.
+
+        Arguments:
+            hud_element {object} -- The element.
+            refresh_hz {float} -- The refresh rate. The element is rendered every frame if not above zero.
+        """
+
+        if refresh_hz <= 0:
+            self.__schedules__.pop(hud_element, None)
+
+            return
+
+        period = 1.0 / refresh_hz
+        phase = ((self.__scheduled_count__ * GOLDEN_RATIO_FRACTION) % 1.0) * period
+        self.__scheduled_count__ += 1
+        self.__schedules__[hud_element] = [period, self.__now__ + phase]
+
+    def begin_frame(self, now=None):
+        """
+        Starts a new frame.
+
+        Keyword Arguments:
+            now {float} -- The time of the frame, from timeit.default_timer. Now if None. (default: {None})
+        """
+
+        self.__now__ = timeit.default_timer() if now is None else now
+        self.__refreshes_this_frame__ = 0
+
+    def is_refresh_due(self, hud_element):
+        """
+        Returns True if the element should be rendered on this frame.
+        An element that is due is counted as refreshed.
+
+        Arguments:
+            hud_element {object} -- The element.
+
+        Returns:
+            bool -- False if the element may show what it drew last time.
+        """
+
+        schedule = self.__schedules__.get(hud_element)
+
+        if schedule is None:
+            return True
+
+        period, next_refresh = schedule
+
+        if self.__now__ < next_refresh \
+                or self.__refreshes_this_frame__ >= MAX_SCHEDULED_REFRESHES_PER_FRAME:
+            return False
+
+        self.__refreshes_this_frame__ += 1
+        period /= self.__rate_scale__
+        next_refresh += period
+
+        # After a stall, start again from now instead of catching up.
+        schedule[1] = next_refresh if next_refresh > self.__now__ else self.__now__ + period
+
+        return True
+
+    def get_refresh_hz(self, hud_element):
+        """
+        Returns the refresh rate of the element from the elements file,
+        or None if it is rendered every frame.
+        """
+
+        schedule = self.__schedules__.get(hud_element)
+
+        return None if schedule is None else 1.0 / schedule[0]
+
+
+class HudView(object):
+    """
+    A named view, and the names of the elements that make it up.
+    The elements are built the first time they are asked for.
+    """
+
+    def __init__(self, name, element_names, element_pool):
+        """
+        Creates a view that has not been built.
+
+        Arguments:
+            name {string} -- The name of the view.
+            element_names {list} -- The names of the elements, in the order they are drawn.
+            element_pool {ElementPool} -- Where the elements come from.
+        """
+
+        self.name = name
+        self.element_names = element_names
+        self.__element_pool__ = element_pool
+        self.__elements__ = None
+        self.__uses_ahrs__ = False
+        self.__last_used__ = None
+
+    def is_built(self):
+        """
+        Returns True if every element of the view is built.
+        """
+
+        return self.__elements__ is not None
+
+    def get_elements(self):
+        """
+        Returns the elements of the view, building any that are missing.
+
+        Returns:
+            list -- The elements, in the order they are drawn.
+        """
+
+        if self.__elements__ is None:
+            self.__elements__ = [self.__element_pool__.get_element(element_name)
+                                 for element_name in self.element_names]
+            self.__uses_ahrs__ = any([hud_element.uses_ahrs()
+                                      for hud_element in self.__elements__
+                                      if hud_element is not None])
+            # A view that was just built counts as used,
+            # even if it was only warmed.
+            self.__last_used__ = time.time()
+
+        return self.__elements__
+
+    def uses_ahrs(self):
+        """
+        Does any element in this view use AHRS?
+
+        Returns:
+            bool -- True if any element uses AHRS.
+        """
+
+        self.get_elements()
+
+        return self.__uses_ahrs__
+
+    def build_next_element(self):
+        """
+        Builds one element of the view that has not been built yet.
+        The view is complete once every element has been built.
+
+        Returns:
+            bool -- True if an element was built.
+        """
+
+        if self.__elements__ is not None:
+            return False
+
+        for element_name in self.element_names:
+            if not self.__element_pool__.is_element_built(element_name):
+                self.__element_pool__.get_element(element_name)
+
+                return True
+
+        self.get_elements()
+
+        return False
+
+    def mark_shown(self):
+        """
+        Notes that the view is on the screen.
+        """
+
+        self.__last_used__ = time.time()
+
+    def get_idle_seconds(self):
+        """
+        Returns how long it has been since the view was on the screen,
+        or was built.
+
+        Returns:
+            float -- The number of seconds, or None if the view is not built.
+        """
+
+        if self.__last_used__ is None:
+            return None
+
+        return time.time() - self.__last_used__
+
+    def release(self):
+        """
+        Lets go of the elements of the view.
+        The elements are rebuilt the next time they are asked for.
+        """
+
+        self.__elements__ = None
+        self.__last_used__ = None
+
+
+class HudViews(object):
+    """
+    The views of the HUD, in the order they are cycled through.
+    Only the views that are shown, or are next to the view that
+    is shown, have their elements built.
+    """
+
+    def __init__(self, views, element_pool):
+        """
+        Creates the collection of views.
+
+        Arguments:
+            views {list} -- The HudView for each view, in order.
+            element_pool {ElementPool} -- Where the elements of the views come from.
+        """
+
+        self.__views__ = views
+        self.__element_pool__ = element_pool
+
+    def __len__(self):
+        return len(self.__views__)
+
+    def __getitem__(self, view_index):
+        return self.__views__[view_index]
+
+    def __iter__(self):
+        return iter(self.__views__)
+
+    def show(self, view_index):
+        """
+        Returns the view that is about to be shown, building it if needed.
+
+        Arguments:
+            view_index {int} -- The index of the view.
+
+        Returns:
+            tuple -- The name of the view, the elements of the view, and if the view uses AHRS.
+        """
+
+        view = self.__views__[view_index]
+        elements = view.get_elements()
+        view.mark_shown()
+
+        return view.name, elements, view.uses_ahrs()
+
+    def get_adjacent_indices(self, view_index):
+        """
+        Returns the indices of the views that are one
+        press of next or previous away from the view.
+        """
+
+        view_count = len(self.__views__)
+
+        if view_count < 2:
+            return []
+
+        next_index = (view_index + 1) % view_count
+        previous_index = (view_index - 1) % view_count
+
+        if next_index == previous_index:
+            return [next_index]
+
+        return [next_index, previous_index]
+
+    def warm_adjacent(self, view_index, max_count):
+        """
+        Builds elements of the views next to the view that is shown,
+        so that changing views does not stall while they are built.
+
+        Arguments:
+            view_index {int} -- The index of the view that is shown.
+            max_count {int} -- The most elements to build.
+
+        Returns:
+            int -- The number of elements built.
+        """
+
+        built = 0
+
+        for adjacent_index in self.get_adjacent_indices(view_index):
+            view = self.__views__[adjacent_index]
+
+            while built < max_count and view.build_next_element():
+                built += 1
+
+        return built
+
+    def release_idle(self, view_index, max_idle_seconds):
+        """
+        Releases the views that have not been shown for a while.
+        The view that is shown, and the views next to it, are kept.
+
+        Arguments:
+            view_index {int} -- The index of the view that is shown.
+            max_idle_seconds {float} -- How long a view may go without being shown.
+
+        Returns:
+            int -- The number of elements that were released.
+        """
+
+        kept_indices = [view_index] + self.get_adjacent_indices(view_index)
+
+        for index, view in enumerate(self.__views__):
+            idle_seconds = view.get_idle_seconds()
+
+            if index not in kept_indices \
+                    and idle_seconds is not None \
+                    and idle_seconds > max_idle_seconds:
+                view.release()
+
+        element_names_in_use = []
+        [element_names_in_use.extend(view.element_names)
+         for view in self.__views__
+         if view.is_built()]
+
+        # Elements that were warmed for views that are no longer
+        # next to the view that is shown are also let go.
+        [element_names_in_use.extend(self.__views__[index].element_names)
+         for index in kept_indices]
+
+        return self.__element_pool__.release_unused(element_names_in_use)
+
+    def get_built_element_count(self):
+        """
+        Returns the number of elements that are built.
+        """
+
+        return self.__element_pool__.get_built_count()
+
+
+class ViewWarmer(object):
+    """
+    Renders the views next to the one on the screen to a surface
+    that is never shown. The text, cards, and rotated labels those
+    views need are then already in the caches when the pilot
+    changes views, so the first frame of the new view is not slow.
+
+    The work is done an element at a time, in whatever time
+    is left over after a frame is on the screen. The views are
+    rendered again whenever the traffic changes, and every so often
+    for the orientation.
+    """
+
+    def __init__(self, hud_views, refresh_seconds=WARM_REFRESH_SECONDS):
+        """
+        Creates a warmer that has nothing to do yet.
+
+        Arguments:
+            hud_views {HudViews} -- The views to warm.
+
+        Keyword Arguments:
+            refresh_seconds {float} -- How often to render the views again. (default: {WARM_REFRESH_SECONDS})
+        """
+
+        self.__hud_views__ = hud_views
+        self.__refresh_seconds__ = refresh_seconds
+        self.__warm_surface__ = None
+        self.__view_index__ = None
+        self.__last_refresh__ = None
+        self.__traffic_version__ = None
+        # The elements that are waiting to be rendered.
+        self.__pending_elements__ = []
+        # The elements rendered, and the time spent rendering them, since the warmer was made.
+        self.warms = 0
+        self.warm_seconds = 0.0
+
+    def __refresh_pending__(self, view_index):
+        """
+        Queues the elements of the built views next to the view on the screen.
+        Elements that are also on the screen are left out,
+        since they are rendered every frame anyway.
+        """
+
+        shown_view = self.__hud_views__[view_index]
+        shown_elements = shown_view.get_elements() if shown_view.is_built() else []
+        shown_element_ids = set([id(hud_element)
+                                 for hud_element in shown_elements])
+        pending_elements = []
+
+        for adjacent_index in self.__hud_views__.get_adjacent_indices(view_index):
+            adjacent_view = self.__hud_views__[adjacent_index]
+
+            if not adjacent_view.is_built():
+                continue
+
+            for hud_element in adjacent_view.get_elements():
+                if hud_element is not None and id(hud_element) not in shown_element_ids:
+                    shown_element_ids.add(id(hud_element))
+                    pending_elements.append(hud_element)
+
+        self.__pending_elements__ = pending_elements
+        self.__view_index__ = view_index
+        self.__last_refresh__ = timeit.default_timer()
+
+    def __is_refresh_due__(self, view_index, traffic_version, now):
+        if view_index != self.__view_index__:
+            return True
+
+        if len(self.__pending_elements__) > 0:
+            return False
+
+        seconds_since_refresh = now - self.__last_refresh__
+
+        if seconds_since_refresh > self.__refresh_seconds__:
+            return True
+
+        return seconds_since_refresh > WARM_TRAFFIC_REFRESH_SECONDS \
+            and self.__traffic_version__ != traffic_version
+
+    def warm(self, view_index, frame_context, surface, max_seconds):
+        """
+        Renders elements of the views next to the view on the screen
+        until there are none left, or the time runs out.
+        At least one element is rendered when there is any time at all.
+
+        Arguments:
+            view_index {int} -- The index of the view on the screen.
+            frame_context {FrameContext} -- The values worked out for the frame on the screen.
+            surface {Surface} -- The surface the frames are rendered to.
+            max_seconds {float} -- How much time may be spent.
+
+        Returns:
+            int -- The number of elements rendered.
+        """
+
+        if max_seconds <= 0.0:
+            return 0
+
+        start_time = timeit.default_timer()
+
+        traffic_version = frame_context.traffic_snapshot.version
+
+        if self.__is_refresh_due__(view_index, traffic_version, start_time):
+            self.__traffic_version__ = traffic_version
+            self.__refresh_pending__(view_index)
+
+        if len(self.__pending_elements__) == 0:
+            return 0
+
+        if self.__warm_surface__ is None \
+                or self.__warm_surface__.get_size() != surface.get_size():
+            self.__warm_surface__ = surface.copy()
+
+        warmed = 0
+
+        while len(self.__pending_elements__) > 0 \
+                and timeit.default_timer() - start_time < max_seconds:
+            hud_element = self.__pending_elements__.pop()
+
+            try:
+                hud_element.render(self.__warm_surface__, frame_context)
+            except Exception:
+                pass
+
+            warmed += 1
+
+        self.warms += warmed
+        self.warm_seconds += timeit.default_timer() - start_time
+
+        return warmed
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
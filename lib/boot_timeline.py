@@ -0,0 +1,171 @@
+"""
+Records how long each phase of booting the HUD takes,
+and which thread it ran on, so that slow boots can be explained.
+
+Phases may overlap. Network discovery runs in the background
+while the display, fonts, and elements are being built.
+"""
+
+import threading
+import time
+
+
+class BootPhase(object):
+    """
+    A single phase of booting.
+    """
+
+    def __init__(self, name, start_seconds, thread_name):
+        """
+        Starts a new phase.
+
+        Arguments:
+            name {string} -- The name of the phase.
+            start_seconds {float} -- When the phase started, in seconds since the boot started.
+            thread_name {string} -- The thread the phase ran on.
+        """
+
+        self.name = name
+        self.start_seconds = start_seconds
+        self.end_seconds = None
+        self.thread_name = thread_name
+
+    def is_finished(self):
+        """
+        Returns True if the phase has ended.
+        """
+
+        return self.end_seconds is not None
+
+    def get_duration_seconds(self):
+        """
+        Returns how long the phase took, or None if it has not ended.
+        """
+
+        if self.end_seconds is None:
+            return None
+
+        return self.end_seconds - self.start_seconds
+
+    def to_json(self):
+        """
+        Returns the phase as a dictionary that can be serialized to JSON.
+        The times are in milliseconds since the boot started.
+        """
+
+        duration_seconds = self.get_duration_seconds()
+
+        return {'name': self.name,
+                'start_ms': int(self.start_seconds * 1000.0),
+                'end_ms': int(self.end_seconds * 1000.0) if self.end_seconds is not None else None,
+                'duration_ms': int(duration_seconds * 1000.0) if duration_seconds is not None else None,
+                'thread': self.thread_name}
+
+    def to_string(self):
+        """
+        Returns the phase as a line for the logs.
+        """
+
+        if self.end_seconds is None:
+            return "{0:>7.0f}ms {1:>9} {2} ({3})".format(
+                self.start_seconds * 1000.0, "running", self.name, self.thread_name)
+
+        return "{0:>7.0f}ms {1:>7.0f}ms {2} ({3})".format(
+            self.start_seconds * 1000.0,
+            self.get_duration_seconds() * 1000.0,
+            self.name,
+            self.thread_name)
+
+
+class BootTimeline(object):
+    """
+    Holds the phases of booting, in the order that they started.
+    Safe to use from any thread.
+
+    >>> timeline = BootTimeline()
+    >>> timeline.start_phase('fonts')
+    >>> timeline.end_phase('fonts')
+    >>> timeline.start_phase('views')
+    >>> [(phase['name'], phase['end_ms'] is not None) for phase in timeline.to_json()]
+    [('fonts', True), ('views', False)]
+    >>> timeline.end_phase('missing')
+    """
+
+    def __init__(self):
+        self.__start_time__ = time.time()
+        self.__phases__ = []
+        self.__lock__ = threading.Lock()
+
+    def get_elapsed_seconds(self):
+        """
+        Returns the number of seconds since the boot started.
+        """
+
+        return time.time() - self.__start_time__
+
+    def start_phase(self, name):
+        """
+        Marks the start of a phase of booting.
+
+        Arguments:
+            name {string} -- The name of the phase.
+        """
+
+        phase = BootPhase(name,
+                          self.get_elapsed_seconds(),
+                          threading.current_thread().name)
+
+        with self.__lock__:
+            self.__phases__.append(phase)
+
+    def end_phase(self, name):
+        """
+        Marks the end of the most recently started phase with the name.
+        Phases that were never started are ignored.
+
+        Arguments:
+            name {string} -- The name of the phase.
+        """
+
+        end_seconds = self.get_elapsed_seconds()
+
+        with self.__lock__:
+            for phase in reversed(self.__phases__):
+                if phase.name == name and not phase.is_finished():
+                    phase.end_seconds = end_seconds
+                    return
+
+    def to_json(self):
+        """
+        Returns the phases as a list that can be serialized to JSON.
+
+        Returns:
+            list -- A dictionary for each phase, in the order they started.
+        """
+
+        with self.__lock__:
+            return [phase.to_json() for phase in self.__phases__]
+
+    def to_string(self):
+        """
+        Returns the phases as lines for the logs.
+
+        Returns:
+            string -- A line for each phase, in the order they started.
+        """
+
+        with self.__lock__:
+            lines = ["  start  duration phase (thread)"]
+            lines.extend([phase.to_string() for phase in self.__phases__])
+
+        return "\n".join(lines)
+
+
+# Started when the module is first imported, which is as early
+# in the boot as the HUD can record anything.
+BOOT_TIMELINE = BootTimeline()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,83 @@
+"""
+Lets the threads that take in the AHRS and traffic tell the render
+loop that there is something new to draw, so the loop can sleep
+while nothing is changing instead of drawing the same frame again.
+
+The render loop remembers the version it last drew, and waits
+until the version moves on. Waking the loop without a change,
+such as to look for key presses, does not move the version.
+
+>>> signal = ChangeSignal()
+>>> drawn_version = signal.get_version()
+>>> signal.changed()
+>>> signal.wait_for_change(drawn_version) != drawn_version
+True
+"""
+
+import threading
+
+
+class ChangeSignal(object):
+    """
+    A version number, and a way to sleep until it changes.
+    Safe to use from any thread.
+    """
+
+    def __init__(self):
+        self.__condition__ = threading.Condition()
+        self.__version__ = 0
+
+    def get_version(self):
+        """
+        Returns a number that goes up every time something changes.
+        """
+
+        return self.__version__
+
+    def changed(self):
+        """
+        Marks that something that is drawn has changed,
+        and wakes anything waiting for a change.
+        """
+
+        with self.__condition__:
+            self.__version__ += 1
+            self.__condition__.notify_all()
+
+    def wake(self):
+        """
+        Wakes anything waiting for a change, without marking a change.
+        """
+
+        with self.__condition__:
+            self.__condition__.notify_all()
+
+    def wait_for_change(self, version):
+        """
+        Sleeps until the version is no longer the given version,
+        or until woken. Returns right away if it has already changed.
+
+        The wait has no timeout. Timed waits in Python 2 poll, and can
+        oversleep by up to 50ms. Use wake to stop the wait early.
+
+        Arguments:
+            version {int} -- The version that was last drawn.
+
+        Returns:
+            int -- The version now.
+        """
+
+        with self.__condition__:
+            if self.__version__ == version:
+                self.__condition__.wait()
+
+            return self.__version__
+
+
+# Signaled by the AHRS and traffic threads. Waited on by the render loop.
+CHANGE_SIGNAL = ChangeSignal()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -11,6 +11,15 @@ import pygame
 
 import local_debug
 
+# surfarray needs numpy. Without it, mirroring
+# falls back to flipping each rectangle with pygame.transform.
+try:
+    import numpy
+    import pygame.surfarray as surfarray
+    IS_SURFARRAY_AVAILABLE = True
+except ImportError:
+    IS_SURFARRAY_AVAILABLE = False
+
 # The SunFounder 5" TFT
 DEFAULT_SCREEN_SIZE = 800, 480
 
@@ -74,3 +83,101 @@ def display_init():
         screen = pygame.display.set_mode(size, screen_mode)
 
     return screen, size
+
+
+def get_mirrored_rect(rect, surface_size, flip_horizontal, flip_vertical):
+    """
+    Returns where a rectangle ends up after the surface is mirrored.
+
+    Arguments:
+        rect {Rect} -- The rectangle on the un-mirrored surface.
+        surface_size {tuple} -- The width and height of the surface.
+        flip_horizontal {bool} -- Is the surface mirrored left to right?
+        flip_vertical {bool} -- Is the surface mirrored top to bottom?
+
+    Returns:
+        Rect -- The rectangle on the mirrored surface.
+    """
+
+    width, height = surface_size
+    left = (width - rect.right) if flip_horizontal else rect.left
+    top = (height - rect.bottom) if flip_vertical else rect.top
+
+    return pygame.Rect(left, top, rect.width, rect.height)
+
+
+def __mirror_with_surfarray__(source, destination, rects, flip_horizontal, flip_vertical):
+    """
+    Copies the rectangles by reversing slices of views of the pixels.
+    Nothing is allocated besides the views.
+    """
+
+    x_step = -1 if flip_horizontal else 1
+    y_step = -1 if flip_vertical else 1
+    source_pixels = surfarray.pixels2d(source)
+    destination_pixels = surfarray.pixels2d(destination)
+
+    try:
+        for rect, mirrored_rect in rects:
+            destination_pixels[mirrored_rect.left:mirrored_rect.right,
+                               mirrored_rect.top:mirrored_rect.bottom] = \
+                source_pixels[rect.left:rect.right,
+                              rect.top:rect.bottom][::x_step, ::y_step]
+    finally:
+        # The views lock the surfaces until they are released.
+        del source_pixels
+        del destination_pixels
+
+
+def __mirror_with_transform__(source, destination, rects, flip_horizontal, flip_vertical):
+    """
+    Copies the rectangles by flipping a sub-surface of each one.
+    Only the size of the rectangle is allocated.
+    """
+
+    [destination.blit(pygame.transform.flip(source.subsurface(rect), flip_horizontal, flip_vertical),
+                      mirrored_rect)
+     for rect, mirrored_rect in rects]
+
+
+def mirror_rects(source, destination, rects, flip_horizontal, flip_vertical):
+    """
+    Copies the given rectangles from the source to the destination
+    mirroring them on the way. Only the given rectangles are touched,
+    so a full frame copy is never made unless the whole surface is dirty.
+
+    Both surfaces must be the same size and pixel format.
+
+    Arguments:
+        source {Surface} -- The un-mirrored surface that was rendered to.
+        destination {Surface} -- The surface to put the mirrored pixels on.
+        rects {list} -- The rectangles of the source that changed.
+        flip_horizontal {bool} -- Mirror left to right?
+        flip_vertical {bool} -- Mirror top to bottom?
+
+    Returns:
+        list -- The rectangles of the destination that changed.
+    """
+
+    global IS_SURFARRAY_AVAILABLE
+
+    surface_rect = source.get_rect()
+    surface_size = surface_rect.size
+    clipped_rects = [rect.clip(surface_rect) for rect in rects]
+    mirror_pairs = [(rect, get_mirrored_rect(rect, surface_size, flip_horizontal, flip_vertical))
+                    for rect in clipped_rects if rect.width > 0 and rect.height > 0]
+
+    if IS_SURFARRAY_AVAILABLE:
+        try:
+            __mirror_with_surfarray__(
+                source, destination, mirror_pairs, flip_horizontal, flip_vertical)
+
+            return [mirrored_rect for rect, mirrored_rect in mirror_pairs]
+        except ValueError:
+            # 24 bit surfaces can not be viewed as 2D pixel arrays.
+            IS_SURFARRAY_AVAILABLE = False
+
+    __mirror_with_transform__(
+        source, destination, mirror_pairs, flip_horizontal, flip_vertical)
+
+    return [mirrored_rect for rect, mirrored_rect in mirror_pairs]
@@ -0,0 +1,231 @@
+"""
+A list of the drawing an element wants done, kept until the
+list is run against a surface.
+
+Elements that opt in emit their blits and lines into the list
+instead of drawing straight to the framebuffer. The list is then
+run in a single pass. Runs of blits go to the surface in a single
+call to Surface.blits, rather than one call per texture.
+
+Since every draw goes through the list, the list can also count
+the commands, and the calls made to PyGame, and gather the
+screen rectangles that were drawn to.
+
+>>> import pygame
+>>> surface = pygame.Surface((100, 100))
+>>> texture = pygame.Surface((10, 10))
+>>> display_list = DisplayList()
+>>> display_list.blit(texture, (0, 0))
+>>> display_list.blit(texture, (20, 0))
+>>> display_list.lines((0, 255, 0), False, [[0, 50], [99, 50]], 4)
+>>> display_list.blit(texture, (40, 0))
+>>> len(display_list)
+4
+>>> [tuple(rect) for rect in display_list.execute(surface)]
+[(0, 0, 10, 10), (20, 0, 10, 10), (-2, 48, 104, 5), (40, 0, 10, 10)]
+>>> display_list.command_count, display_list.draw_call_count, len(display_list)
+(4, 3, 0)
+
+The commands of a frame can be kept, and drawn again on a later frame.
+
+>>> display_list.blit(texture, (60, 60))
+>>> kept_commands = display_list.get_commands()
+>>> [tuple(rect) for rect in display_list.execute(surface)]
+[(60, 60, 10, 10)]
+>>> display_list.replay(kept_commands)
+>>> [tuple(rect) for rect in display_list.execute(surface)]
+[(60, 60, 10, 10)]
+"""
+
+import pygame
+
+BLIT, LINE, LINES, POLYGON, FILL = range(5)
+
+
+class DisplayList(object):
+    """
+    Holds draw commands until they are run against a surface.
+    Not thread safe. Only used from the render thread.
+    """
+
+    def __init__(self):
+        self.__commands__ = []
+        # Since the counts were last reset.
+        self.command_count = 0
+        self.draw_call_count = 0
+
+    def __len__(self):
+        return len(self.__commands__)
+
+    def blit(self, source, position, area=None):
+        """
+        Draws a texture.
+
+        Arguments:
+            source {Surface} -- The texture to draw.
+            position {tuple} -- Where the top left of the texture goes.
+
+        Keyword Arguments:
+            area {Rect} -- The part of the texture to draw. All of it if None. (default: {None})
+        """
+
+        self.__commands__.append((BLIT,
+                                  (source, position) if area is None else (source, position, area)))
+
+    def line(self, color, start, end, width=1):
+        """
+        Draws a single line.
+        """
+
+        self.__commands__.append((LINE, (color, start, end, width)))
+
+    def lines(self, color, closed, points, width=1):
+        """
+        Draws connected lines through the points.
+        """
+
+        self.__commands__.append((LINES, (color, closed, points, width)))
+
+    def polygon(self, color, points, width=0):
+        """
+        Draws a polygon. Filled if the width is 0.
+        """
+
+        self.__commands__.append((POLYGON, (color, points, width)))
+
+    def fill(self, color, rect=None):
+        """
+        Fills the rectangle with a color. The whole surface if None.
+        """
+
+        self.__commands__.append((FILL, (color, rect)))
+
+    def get_commands(self):
+        """
+        Returns a copy of the commands that have not been run,
+        so they can be replayed on a later frame.
+
+        Returns:
+            list -- The commands, in order.
+        """
+
+        return list(self.__commands__)
+
+    def replay(self, commands):
+        """
+        Adds commands that were taken from an earlier frame.
+
+        Arguments:
+            commands {list} -- The commands from get_commands.
+        """
+
+        self.__commands__.extend(commands)
+
+    def clear(self):
+        """
+        Throws away the commands that have not been run.
+        """
+
+        del self.__commands__[:]
+
+    def reset_counts(self):
+        """
+        Starts counting commands and calls from zero.
+        """
+
+        self.command_count = 0
+        self.draw_call_count = 0
+
+    def execute(self, surface):
+        """
+        Runs the commands, in order, against the surface, then clears the list.
+        Runs of blits are drawn with a single call.
+
+        Arguments:
+            surface {Surface} -- What to draw to.
+
+        Returns:
+            list -- The screen rectangles that were drawn to, in the order of the commands.
+        """
+
+        commands = self.__commands__
+        command_total = len(commands)
+        dirty_rects = []
+        index = 0
+
+        while index < command_total:
+            kind, arguments = commands[index]
+
+            if kind == BLIT:
+                run_end = index + 1
+
+                while run_end < command_total and commands[run_end][0] == BLIT:
+                    run_end += 1
+
+                dirty_rects.extend(surface.blits(
+                    [arguments for kind, arguments in commands[index:run_end]]))
+                index = run_end
+            else:
+                dirty_rects.append(self.__draw__(surface, kind, arguments))
+                index += 1
+
+            self.draw_call_count += 1
+
+        self.command_count += command_total
+        self.clear()
+
+        return dirty_rects
+
+    def __draw__(self, surface, kind, arguments):
+        """
+        Runs a single command that is not a blit.
+
+        Returns:
+            Rect -- The screen rectangle that was drawn to.
+        """
+
+        if kind == LINES:
+            color, closed, points, width = arguments
+
+            # The rectangle from drawing lines does not include the line width.
+            return pygame.draw.lines(surface, color, closed, points, width).inflate(width, width)
+
+        if kind == LINE:
+            color, start, end, width = arguments
+
+            return pygame.draw.line(surface, color, start, end, width).inflate(width, width)
+
+        if kind == POLYGON:
+            color, points, width = arguments
+
+            return pygame.draw.polygon(surface, color, points, width).inflate(width, width)
+
+        color, rect = arguments
+
+        return surface.fill(color, rect)
+
+
+def render_with_display_list(hud_element, framebuffer, frame_context):
+    """
+    Renders an element that draws through a display list
+    straight to a surface. For when the element is used on its
+    own, outside of the HUD's frame loop.
+
+    Arguments:
+        hud_element {object} -- An element with render_display_list.
+        framebuffer {Surface} -- What to draw to.
+        frame_context {FrameContext} -- The values worked out for the frame.
+
+    Returns:
+        list -- The screen rectangles that were drawn to.
+    """
+
+    display_list = DisplayList()
+    hud_element.render_display_list(display_list, frame_context)
+
+    return display_list.execute(framebuffer)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,286 @@
+"""
+Keeps the frames inside their time budget by giving up detail
+when the HUD falls behind, and bringing it back when there is room.
+
+The detail is given up a rung at a time, down a ladder. Each rung
+keeps what the rungs above it gave up, and gives up a little more.
+The horizon, the pitch ladder lines, the altitude, and the other
+flight instruments are never on the ladder. Only what is drawn
+around them, or how often the slow elements are drawn, is.
+
+The frame times are smoothed, so a single slow frame does not give
+up any detail. Detail is given up once the smoothed time is over the
+budget, and is only brought back once it is well under the budget.
+Every rung is also held for a while before moving again, so that the
+detail does not flicker on and off around the edge of the budget.
+
+Something other than the frame times, such as the temperature of
+the SoC, may also lower the budget, and keep the detail at or below
+a rung no matter how fast the frames are.
+
+>>> governor = FrameGovernor(16.7, degrade_frames=3, restore_frames=5)
+>>> [governor.push_frame_ms(25.0) for frame in range(3)]
+[False, False, True]
+>>> governor.detail.name, governor.detail.max_target_bugs
+('Fewer traffic bugs', 12)
+>>> [governor.push_frame_ms(5.0) for frame in range(4)] + [governor.push_frame_ms(25.0)]
+[False, False, False, False, False]
+>>> [governor.push_frame_ms(5.0) for frame in range(3)]
+[False, True, False]
+>>> governor.level, governor.detail.name
+(0, 'Full')
+>>> governor.set_limits(33.3, 3), governor.detail.name
+(True, 'Coarser roll')
+>>> [governor.push_frame_ms(5.0) for frame in range(6)]
+[False, False, False, False, False, False]
+>>> governor.set_limits(33.3, 0), governor.level
+(False, 3)
+
+The ladder can come from the configuration instead.
+
+>>> ladder = get_detail_ladder([{'name': 'Full'},
+...                             {'name': 'Fewer traffic bugs', 'max_target_bugs': 8}])
+>>> ladder[1].name, ladder[1].max_target_bugs, ladder[1].pitch_label_interval
+('Fewer traffic bugs', 8, 1)
+>>> get_detail_ladder(None) is DETAIL_LADDER
+True
+>>> get_detail_ladder([{'name': 'Full', 'max_traffic': 8}])
+Traceback (most recent call last):
+...
+ValueError: Unknown detail setting 'max_traffic'
+>>> get_detail_ladder([{'name': 'No labels', 'pitch_label_interval': 0}])
+Traceback (most recent call last):
+...
+ValueError: Detail setting 'pitch_label_interval' can not be 0
+"""
+
+# How many frames the frame time is smoothed over, and how long
+# a rung is held before more detail may be given up.
+DEGRADE_FRAMES = 30
+
+# How long a rung is held before detail may be brought back.
+RESTORE_FRAMES = 180
+
+# The part of the budget a frame must fit in for the detail to be restored.
+# Well under the budget, so the restored detail still fits.
+RESTORE_BUDGET_FRACTION = 0.6
+
+
+class DetailLevel(object):
+    """
+    How much detail the elements should draw.
+    """
+
+    def __init__(self, name, max_target_bugs=None, pitch_label_interval=1, min_roll_quantum=1, refresh_rate_scale=1.0):
+        """
+        Creates a rung of the ladder.
+
+        Arguments:
+            name {string} -- What the rung gives up, for the logs.
+
+        Keyword Arguments:
+            max_target_bugs {int} -- The most traffic that is drawn. No extra limit if None. (default: {None})
+            pitch_label_interval {int} -- Only every this many lines of the pitch ladder are labeled. (default: {1})
+            min_roll_quantum {int} -- The fewest degrees between each roll of the rotated text. (default: {1})
+            refresh_rate_scale {float} -- Scales the refresh rate of the slow elements. (default: {1.0})
+        """
+
+        self.name = name
+        self.max_target_bugs = max_target_bugs
+        self.pitch_label_interval = pitch_label_interval
+        self.min_roll_quantum = min_roll_quantum
+        self.refresh_rate_scale = refresh_rate_scale
+
+    def __repr__(self):
+        return "DetailLevel({})".format(self.name)
+
+
+FULL_DETAIL = DetailLevel('Full')
+
+# In the order the detail is given up.
+DETAIL_LADDER = [FULL_DETAIL,
+                 DetailLevel('Fewer traffic bugs',
+                             max_target_bugs=12),
+                 DetailLevel('Fewer pitch labels',
+                             max_target_bugs=12,
+                             pitch_label_interval=2),
+                 DetailLevel('Coarser roll',
+                             max_target_bugs=12,
+                             pitch_label_interval=2,
+                             min_roll_quantum=3),
+                 DetailLevel('Slower secondary elements',
+                             max_target_bugs=12,
+                             pitch_label_interval=2,
+                             min_roll_quantum=3,
+                             refresh_rate_scale=0.5),
+                 DetailLevel('Fewest traffic bugs',
+                             max_target_bugs=6,
+                             pitch_label_interval=2,
+                             min_roll_quantum=3,
+                             refresh_rate_scale=0.5)]
+
+
+# The settings a rung of the ladder may have in the configuration.
+DETAIL_LEVEL_SETTINGS = ['max_target_bugs',
+                         'pitch_label_interval',
+                         'min_roll_quantum',
+                         'refresh_rate_scale']
+
+
+def __is_whole_number__(value):
+    return isinstance(value, (int, long)) and not isinstance(value, bool)
+
+
+def __is_valid_detail_setting__(setting, value):
+    """
+    Returns True if the value can be used for the setting of a rung.
+    Every element counts on these, so a bad one has to be caught
+    before the governor ever moves to the rung.
+    """
+
+    if setting == 'max_target_bugs':
+        return value is None or (__is_whole_number__(value) and value >= 1)
+
+    if setting == 'refresh_rate_scale':
+        return isinstance(value, (int, long, float)) and not isinstance(value, bool) and value > 0
+
+    return __is_whole_number__(value) and value >= 1
+
+
+def get_detail_ladder(rung_configs):
+    """
+    Builds a ladder from the rungs in the configuration.
+
+    Arguments:
+        rung_configs {list} -- A dictionary for each rung, with a "name", and any of DETAIL_LEVEL_SETTINGS. None for DETAIL_LADDER.
+
+    Raises:
+        ValueError: If there are no rungs, or a rung has a setting that is not known, or can not be used.
+
+    Returns:
+        list -- The DetailLevel of each rung.
+    """
+
+    if rung_configs is None:
+        return DETAIL_LADDER
+
+    if len(rung_configs) < 1:
+        raise ValueError("The detail ladder needs at least one rung")
+
+    ladder = []
+
+    for rung_config in rung_configs:
+        unknown_settings = [setting for setting in rung_config
+                            if setting != 'name' and setting not in DETAIL_LEVEL_SETTINGS]
+
+        if len(unknown_settings) > 0:
+            raise ValueError("Unknown detail setting '{}'".format(unknown_settings[0]))
+
+        for setting in DETAIL_LEVEL_SETTINGS:
+            if setting in rung_config and not __is_valid_detail_setting__(setting, rung_config[setting]):
+                raise ValueError("Detail setting '{}' can not be {}".format(setting, rung_config[setting]))
+
+        settings = dict([(str(setting), rung_config[setting])
+                         for setting in DETAIL_LEVEL_SETTINGS
+                         if setting in rung_config])
+        ladder.append(DetailLevel(str(rung_config.get('name', 'Rung {}'.format(len(ladder)))),
+                                  **settings))
+
+    return ladder
+
+
+class FrameGovernor(object):
+    """
+    Watches how long the frames take, and picks the rung of
+    the detail ladder that keeps them inside the budget.
+    Only used from the render thread.
+    """
+
+    def __init__(self, budget_ms, ladder=None, degrade_frames=DEGRADE_FRAMES, restore_frames=RESTORE_FRAMES):
+        """
+        Creates a governor that starts with full detail.
+
+        Arguments:
+            budget_ms {float} -- How long a frame may take, in milliseconds.
+
+        Keyword Arguments:
+            ladder {list} -- The DetailLevel of each rung, starting with full detail. DETAIL_LADDER if None. (default: {None})
+            degrade_frames {int} -- The frames to smooth over, and to hold a rung before stepping down. (default: {DEGRADE_FRAMES})
+            restore_frames {int} -- The frames to hold a rung before stepping up. (default: {RESTORE_FRAMES})
+        """
+
+        self.__budget_ms__ = budget_ms
+        self.__ladder__ = ladder if ladder is not None else DETAIL_LADDER
+        self.__degrade_frames__ = degrade_frames
+        self.__restore_frames__ = restore_frames
+        self.__smoothing__ = 2.0 / (degrade_frames + 1)
+        self.__frames_at_level__ = 0
+        self.__min_level__ = 0
+        self.level = 0
+        self.detail = self.__ladder__[0]
+        # The smoothed frame time, in milliseconds.
+        self.frame_ms = None
+
+    def push_frame_ms(self, frame_ms):
+        """
+        Records how long a frame took, and steps the detail up or down when needed.
+
+        Arguments:
+            frame_ms {float} -- How long the frame took, in milliseconds.
+
+        Returns:
+            bool -- True if the detail changed.
+        """
+
+        if self.frame_ms is None:
+            self.frame_ms = frame_ms
+        else:
+            self.frame_ms += self.__smoothing__ * (frame_ms - self.frame_ms)
+
+        self.__frames_at_level__ += 1
+
+        if self.frame_ms > self.__budget_ms__ \
+                and self.__frames_at_level__ >= self.__degrade_frames__ \
+                and self.level < len(self.__ladder__) - 1:
+            return self.__set_level__(self.level + 1)
+
+        if self.frame_ms < self.__budget_ms__ * RESTORE_BUDGET_FRACTION \
+                and self.__frames_at_level__ >= self.__restore_frames__ \
+                and self.level > self.__min_level__:
+            return self.__set_level__(self.level - 1)
+
+        return False
+
+    def set_limits(self, budget_ms, min_level):
+        """
+        Changes the budget, and the least detail that has to be given up.
+        The detail is stepped down to the rung right away if it is above it.
+        Once the rung is lowered again, the detail is brought back as usual.
+
+        Arguments:
+            budget_ms {float} -- How long a frame may take, in milliseconds.
+            min_level {int} -- The rung of the ladder the detail has to be at, or below.
+
+        Returns:
+            bool -- True if the detail changed.
+        """
+
+        self.__budget_ms__ = budget_ms
+        self.__min_level__ = min(min_level, len(self.__ladder__) - 1)
+
+        if self.level < self.__min_level__:
+            return self.__set_level__(self.__min_level__)
+
+        return False
+
+    def __set_level__(self, level):
+        self.level = level
+        self.detail = self.__ladder__[level]
+        self.__frames_at_level__ = 0
+
+        return True
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
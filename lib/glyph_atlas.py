@@ -0,0 +1,261 @@
+"""
+Composes text out of cached glyph cells instead of
+asking the font to rasterize the whole string every frame.
+
+The HUD fonts are monospaced, so any string can be built
+by blitting the glyph cells side by side.
+
+The text comes out the same size as text from the font, even when
+a glyph, such as '%', draws past its advance.
+
+>>> import os
+>>> os.environ.setdefault('SDL_VIDEODRIVER', 'dummy') and None
+>>> pygame.display.init()
+>>> pygame.font.init()
+>>> font = pygame.font.Font('./assets/fonts/LiberationMono-Bold.ttf', 40)
+>>> texts = ['1234', '-12.5', '100%', '99% FT', '%%%']
+>>> [get_text_texture(text, font, (0, 255, 0), (0, 0, 0))[1] == font.render(text, True, (0, 255, 0), (0, 0, 0)).get_size()
+...  for text in texts]
+[True, True, True, True, True]
+>>> [get_text_texture(text, font, (0, 255, 0))[0].get_size() == font.render(text, True, (0, 255, 0)).get_size()
+...  for text in texts]
+[True, True, True, True, True]
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+# Each combination of font and colors gets its own atlas.
+# Colors that are mixed on the fly (temperatures, etc.) could
+# otherwise grow the atlases without limit.
+MAX_ATLASES = 64
+
+# Numbers on the HUD tend to hover around the same few values,
+# so the most recently composed strings are kept around too.
+MAX_COMPOSED_TEXTS = 16
+
+__ATLASES__ = OrderedDict()
+
+
+class GlyphAtlas(object):
+    """
+    Holds the rendered glyphs of a single font and color combination.
+    Glyphs are rendered the first time that they are used.
+    """
+
+    def __init__(self, font, text_color, background_color=None):
+        """
+        Creates a new, empty, atlas.
+
+        Arguments:
+            font {pygame.font} -- The font to render the glyphs with.
+            text_color {tuple} -- The RGB color of the text.
+
+        Keyword Arguments:
+            background_color {tuple} -- The RGB color behind the text. Transparent if None. (default: {None})
+        """
+
+        self.__font__ = font
+        self.__text_color__ = text_color
+        self.__background_color__ = background_color
+        self.__height__ = font.get_height()
+        self.__glyphs__ = {}
+        self.__composed_texts__ = OrderedDict()
+        self.__work_strip__ = None
+
+    def __get_glyph__(self, character):
+        """
+        Returns the cell for a single character, rendering it if needed.
+
+        Arguments:
+            character {string} -- The character to get the cell for.
+
+        Returns:
+            tuple -- The texture of the character and how far it advances the text.
+        """
+
+        if character not in self.__glyphs__:
+            # The glyphs are intentionally kept in the format the font
+            # rendered them in. The small palettized surfaces blit
+            # faster than the converted ones.
+            texture = self.__font__.render(
+                character, True, self.__text_color__, self.__background_color__)
+            # A glyph, such as '%', may draw past its advance. The advance
+            # comes from the metrics so the next glyph starts where it would
+            # in text from the font.
+            metrics = self.__font__.metrics(character)
+            advance = metrics[0][4] if metrics and metrics[0] is not None \
+                else texture.get_width()
+            self.__glyphs__[character] = (texture, advance)
+
+        return self.__glyphs__[character]
+
+    def __get_work_strip__(self, glyph_texture, width):
+        """
+        Returns the surface that text is composed on.
+        It is at least as wide as requested.
+
+        Every glyph of a shaded font shares the same palette, so the
+        text is composed in that palette too. The glyphs are then copied
+        index for index, and the texture blits to the screen exactly
+        like the one from the font would.
+
+        The strip is reused since setting a palette, and matching
+        the palette of a new surface on every blit, is slow.
+
+        Arguments:
+            glyph_texture {Surface} -- A glyph to take the format and palette from.
+            width {int} -- The width that is needed.
+
+        Returns:
+            Surface -- The work strip.
+        """
+
+        if self.__work_strip__ is None or self.__work_strip__.get_width() < width:
+            strip_size = (max(width, self.__font__.size('0' * 32)[0]),
+                          self.__height__)
+
+            if self.__background_color__ is None:
+                self.__work_strip__ = pygame.Surface(
+                    strip_size, pygame.SRCALPHA, 32)
+            else:
+                self.__work_strip__ = pygame.Surface(
+                    strip_size, 0, glyph_texture)
+
+                if glyph_texture.get_bitsize() == 8:
+                    self.__work_strip__.set_palette(
+                        glyph_texture.get_palette())
+
+        return self.__work_strip__
+
+    def get_text_texture(self, text):
+        """
+        Returns a texture for the text. Recently used text is
+        returned as-is, otherwise it is composed from the glyph cells.
+
+        Arguments:
+            text {string} -- The text to get a texture for.
+
+        Returns:
+            tuple -- The texture and the size of the texture
+        """
+
+        if text in self.__composed_texts__:
+            result = self.__composed_texts__.pop(text)
+        else:
+            result = self.__compose_text__(text)
+
+            if len(self.__composed_texts__) >= MAX_COMPOSED_TEXTS:
+                self.__composed_texts__.popitem(last=False)
+
+        self.__composed_texts__[text] = result
+
+        return result
+
+    def __compose_text__(self, text):
+        """
+        Composes a texture for the text out of the glyph cells.
+
+        Arguments:
+            text {string} -- The text to build a texture for.
+
+        Returns:
+            tuple -- The texture and the size of the texture
+        """
+
+        glyphs = [self.__get_glyph__(character) for character in text]
+
+        if len(glyphs) < 1:
+            texture = self.__font__.render(
+                text, True, self.__text_color__, self.__background_color__)
+
+            return texture, texture.get_size()
+
+        # Sized by the font, so the text lines up the same as text from the
+        # font when it is centered, or right aligned. Only the last glyph
+        # may draw past its advance, and the font makes room for that.
+        size = (self.__font__.size(text)[0], self.__height__)
+
+        work_strip = self.__get_work_strip__(glyphs[0][0], size[0])
+        text_rect = pygame.Rect((0, 0), size)
+
+        if self.__background_color__ is not None:
+            work_strip.fill(self.__background_color__, text_rect)
+            blend_flags = 0
+        else:
+            # The cells never overlap, so taking the maximum against
+            # a fully transparent strip copies the cells exactly
+            # instead of blending their alpha twice.
+            work_strip.fill((0, 0, 0, 0), text_rect)
+            blend_flags = pygame.BLEND_RGBA_MAX
+
+        x_position = 0
+        for glyph_texture, advance in glyphs:
+            work_strip.blit(glyph_texture, (x_position, 0),
+                            special_flags=blend_flags)
+            x_position += advance
+
+        texture = work_strip.subsurface(text_rect).copy()
+
+        return texture, size
+
+
+def get_glyph_atlas(font, text_color, background_color=None):
+    """
+    Returns the atlas for the font and colors, creating it if needed.
+
+    Arguments:
+        font {pygame.font} -- The font to render the glyphs with.
+        text_color {tuple} -- The RGB color of the text.
+
+    Keyword Arguments:
+        background_color {tuple} -- The RGB color behind the text. Transparent if None. (default: {None})
+
+    Returns:
+        GlyphAtlas -- The atlas for the combination.
+    """
+
+    atlas_key = (id(font),
+                 font.get_height(),
+                 tuple(text_color),
+                 tuple(background_color) if background_color is not None else None)
+
+    if atlas_key in __ATLASES__:
+        atlas = __ATLASES__.pop(atlas_key)
+    else:
+        atlas = GlyphAtlas(font, text_color, background_color)
+
+        if len(__ATLASES__) >= MAX_ATLASES:
+            __ATLASES__.popitem(last=False)
+
+    __ATLASES__[atlas_key] = atlas
+
+    return atlas
+
+
+def get_text_texture(text, font, text_color, background_color=None):
+    """
+    Retrieves a texture for the text composed from cached glyphs.
+    Has the same contract as HudDataCache.get_cached_text_texture,
+    but does not cache the whole string, so it is suited to text
+    that changes every frame (altitudes, speeds, times).
+
+    Arguments:
+        text {string} -- The text to generate a texture for.
+        font {pygame.font} -- The font to use for the texture.
+        text_color {tuple} -- The RGB color for the text.
+
+    Keyword Arguments:
+        background_color {tuple} -- The RGB color for the background. Transparent if None. (default: {None})
+
+    Returns:
+        tuple -- The texture and the size of the texture
+    """
+
+    return get_glyph_atlas(font, text_color, background_color).get_text_texture(text)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
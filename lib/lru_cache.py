@@ -0,0 +1,263 @@
+"""
+Least-recently-used cache that is bounded by the memory
+its entries use, rather than just by the number of entries.
+"""
+
+import time
+
+# The fields of each link in the list of entries.
+PREVIOUS, NEXT, KEY, VALUE, SIZE_IN_BYTES, LAST_USED = range(6)
+
+
+def get_surface_size_in_bytes(surface):
+    """
+    Returns roughly how much memory the pixels of a surface use.
+
+    Arguments:
+        surface {Surface} -- The surface to measure.
+
+    Returns:
+        int -- The number of bytes used by the pixels.
+    """
+
+    width, height = surface.get_size()
+
+    return width * height * surface.get_bytesize()
+
+
+class LruCache(object):
+    """
+    Holds entries up to a total size. When an entry would push the
+    cache past that size, the least recently used entries are evicted.
+
+    Every operation is O(1), apart from eviction which is O(1) per entry evicted.
+
+    Not thread safe. Callers that share a cache between threads must lock.
+
+    >>> cache = LruCache(10)
+    >>> cache.put('a', 'A', 4)
+    >>> cache.put('b', 'B', 4)
+    >>> cache.get('a')
+    'A'
+    >>> cache.put('c', 'C', 4)
+    >>> cache.get('b') is None
+    True
+    >>> cache.get_size_in_bytes(), len(cache)
+    (8, 2)
+    >>> cache.hits, cache.misses, cache.evictions
+    (1, 1, 1)
+    >>> cache.set_max_size_in_bytes(4)
+    >>> sorted(cache.keys())
+    ['c']
+    """
+
+    def __init__(self, max_size_in_bytes, max_entries=None):
+        """
+        Creates a new, empty, cache.
+
+        Arguments:
+            max_size_in_bytes {int} -- The most memory the entries may use.
+
+        Keyword Arguments:
+            max_entries {int} -- The most entries that may be held. Unlimited if None. (default: {None})
+        """
+
+        self.__max_size_in_bytes__ = max_size_in_bytes
+        self.__max_entries__ = max_entries
+        self.__size_in_bytes__ = 0
+        # The entries are kept in a circular, doubly linked, list ordered
+        # from least recently used to most recently used. Each link is
+        # [previous, next, key, value, size in bytes, last used].
+        # The OrderedDict of Python 2 is pure Python, and moving an entry
+        # to the end of it costs several times more than relinking a list.
+        self.__root__ = []
+        self.__root__[:] = [self.__root__, self.__root__, None, None, 0, 0.0]
+        # Keyed by the cache key. Holds the link for the entry.
+        self.__links__ = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.__links__)
+
+    def __contains__(self, key):
+        return key in self.__links__
+
+    def keys(self):
+        """
+        Returns the keys, from least to most recently used.
+        """
+
+        keys = []
+        link = self.__root__[NEXT]
+
+        while link is not self.__root__:
+            keys.append(link[KEY])
+            link = link[NEXT]
+
+        return keys
+
+    def get_size_in_bytes(self):
+        """
+        Returns the total size of the entries.
+
+        Returns:
+            int -- The number of bytes used by the entries.
+        """
+
+        return self.__size_in_bytes__
+
+    def set_max_size_in_bytes(self, max_size_in_bytes):
+        """
+        Changes the size that the cache is bound to,
+        evicting entries if the cache is now too large.
+
+        Arguments:
+            max_size_in_bytes {int} -- The most memory the entries may use.
+        """
+
+        self.__max_size_in_bytes__ = max_size_in_bytes
+        self.__evict__()
+
+    def set_max_entries(self, max_entries):
+        """
+        Changes the number of entries that the cache is bound to,
+        evicting entries if the cache now has too many.
+
+        Arguments:
+            max_entries {int} -- The most entries that may be held. Unlimited if None.
+        """
+
+        self.__max_entries__ = max_entries
+        self.__evict__()
+
+    def get(self, key):
+        """
+        Returns the value for the key and marks it as recently used.
+
+        Arguments:
+            key {object} -- The key to look up.
+
+        Returns:
+            object -- The value, or None if the key is not in the cache.
+        """
+
+        link = self.__links__.get(key)
+
+        if link is None:
+            self.misses += 1
+
+            return None
+
+        self.hits += 1
+        link[LAST_USED] = time.time()
+
+        # Move the link to the most recently used end.
+        link_previous, link_next = link[PREVIOUS], link[NEXT]
+        link_previous[NEXT] = link_next
+        link_next[PREVIOUS] = link_previous
+        root = self.__root__
+        last = root[PREVIOUS]
+        last[NEXT] = root[PREVIOUS] = link
+        link[PREVIOUS] = last
+        link[NEXT] = root
+
+        return link[VALUE]
+
+    def put(self, key, value, size_in_bytes):
+        """
+        Adds or replaces the value for the key, then evicts the least
+        recently used entries until the cache fits in its bounds.
+
+        Arguments:
+            key {object} -- The key to store the value under.
+            value {object} -- The value to store.
+            size_in_bytes {int} -- How much memory the value uses.
+        """
+
+        self.remove(key)
+
+        root = self.__root__
+        last = root[PREVIOUS]
+        link = [last, root, key, value, size_in_bytes, time.time()]
+        last[NEXT] = root[PREVIOUS] = self.__links__[key] = link
+        self.__size_in_bytes__ += size_in_bytes
+        self.__evict__()
+
+    def remove(self, key):
+        """
+        Removes the key from the cache. This is not counted as an eviction.
+
+        Arguments:
+            key {object} -- The key to remove.
+
+        Returns:
+            bool -- True if the key was in the cache.
+        """
+
+        link = self.__links__.pop(key, None)
+
+        if link is None:
+            return False
+
+        self.__unlink__(link)
+
+        return True
+
+    def purge_unused(self, max_age_seconds):
+        """
+        Evicts the entries that have not been used for a while.
+        Only the stale entries are visited.
+
+        Arguments:
+            max_age_seconds {float} -- How long an entry may go unused.
+
+        Returns:
+            int -- The number of entries evicted.
+        """
+
+        oldest_allowed = time.time() - max_age_seconds
+        purged = 0
+
+        while len(self.__links__) > 0 \
+                and self.__root__[NEXT][LAST_USED] < oldest_allowed:
+            self.__evict_oldest__()
+            purged += 1
+
+        return purged
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+
+        self.__root__[:] = [self.__root__, self.__root__, None, None, 0, 0.0]
+        self.__links__.clear()
+        self.__size_in_bytes__ = 0
+
+    def __unlink__(self, link):
+        link_previous, link_next = link[PREVIOUS], link[NEXT]
+        link_previous[NEXT] = link_next
+        link_next[PREVIOUS] = link_previous
+        self.__size_in_bytes__ -= link[SIZE_IN_BYTES]
+
+    def __is_over_bounds__(self):
+        return self.__size_in_bytes__ > self.__max_size_in_bytes__ \
+            or (self.__max_entries__ is not None and len(self.__links__) > self.__max_entries__)
+
+    def __evict_oldest__(self):
+        link = self.__root__[NEXT]
+        del self.__links__[link[KEY]]
+        self.__unlink__(link)
+        self.evictions += 1
+
+    def __evict__(self):
+        while len(self.__links__) > 0 and self.__is_over_bounds__():
+            self.__evict_oldest__()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
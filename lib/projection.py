@@ -0,0 +1,200 @@
+"""
+Projects targets onto the screen using the full attitude of the aircraft.
+
+The heading, pitch, and roll are turned into a single rotation from
+the world (north, east, down) into the body of the aircraft
+(forward, right, down) once per frame. Every target is then rotated
+into the body frame, and placed on the screen by how far it is
+to the side of, and above, the nose.
+
+Rolling is part of the rotation, so a target keeps its true place
+against the horizon at any bank angle. Flat projections that handle
+the yaw and pitch on their own, then rotate the result, drift
+further from the truth the steeper the bank.
+
+The angles follow the artificial horizon. Positive pitch is nose up,
+and positive roll is right wing down.
+
+>>> def show(angles):
+...     return tuple([round(angle, 4) + 0.0 for angle in angles])
+>>> show(get_view_angles(get_body_rotation(0, 0, 0), 0, 1000, 0))
+(0.0, 0.0)
+
+With the wings level, and the nose on the horizon, the angles
+match the flat projection, including across north.
+
+>>> rotation = get_body_rotation(5, 0, 0)
+>>> show(get_view_angles(rotation, 355, 2000, 500)), show(get_view_angles(rotation, 40, 5000, -300))
+((-10.0, 14.0362), (35.0, -3.4336))
+>>> show((-5 - 5, math.degrees(math.atan2(500, 2000)))), show((40 - 5, math.degrees(math.atan2(-300, 5000))))
+((-10.0, 14.0362), (35.0, -3.4336))
+
+Pitching the nose up lowers a target on the nose by the pitch.
+
+>>> show(get_view_angles(get_body_rotation(0, 10, 0), 0, 1000, 0))
+(0.0, -10.0)
+
+Banked 90 degrees to the right, a target level off the right wing is
+seen straight up from the nose, which is where the horizon is drawn.
+
+>>> show(get_view_angles(get_body_rotation(0, 0, 90), 10, 1000, 0))
+(0.0, 10.0)
+
+A batch gets the same angles.
+
+>>> if IS_NUMPY_AVAILABLE:
+...     azimuths, elevations = get_view_angles_batch(rotation, numpy.array([355.0, 40.0]),
+...                                                  numpy.array([2000.0, 5000.0]),
+...                                                  numpy.array([500.0, -300.0]))
+...     print([show(angles) for angles in zip(azimuths, elevations)])
+... else:
+...     print([(-10.0, 14.0362), (35.0, -3.4336)])
+[(-10.0, 14.0362), (35.0, -3.4336)]
+"""
+
+import math
+
+# The targets are projected in batches with NumPy when it is installed.
+try:
+    import numpy
+    IS_NUMPY_AVAILABLE = True
+except ImportError:
+    IS_NUMPY_AVAILABLE = False
+
+
+def get_body_rotation(heading, pitch, roll):
+    """
+    Returns the rotation from the world (north, east, down)
+    into the body of the aircraft (forward, right, down).
+
+    Arguments:
+        heading {float} -- The heading of the aircraft, in degrees.
+        pitch {float} -- The pitch of the aircraft, in degrees. Nose up is positive.
+        roll {float} -- The roll of the aircraft, in degrees. Right wing down is positive.
+
+    Returns:
+        tuple -- The three rows of the rotation matrix.
+    """
+
+    heading_radians = math.radians(heading)
+    pitch_radians = math.radians(pitch)
+    roll_radians = math.radians(roll)
+
+    cos_heading, sin_heading = math.cos(heading_radians), math.sin(heading_radians)
+    cos_pitch, sin_pitch = math.cos(pitch_radians), math.sin(pitch_radians)
+    cos_roll, sin_roll = math.cos(roll_radians), math.sin(roll_radians)
+
+    # Yaw, then pitch, then roll.
+    return ((cos_pitch * cos_heading,
+             cos_pitch * sin_heading,
+             -sin_pitch),
+            (sin_roll * sin_pitch * cos_heading - cos_roll * sin_heading,
+             sin_roll * sin_pitch * sin_heading + cos_roll * cos_heading,
+             sin_roll * cos_pitch),
+            (cos_roll * sin_pitch * cos_heading + sin_roll * sin_heading,
+             cos_roll * sin_pitch * sin_heading - sin_roll * cos_heading,
+             cos_roll * cos_pitch))
+
+
+def get_view_angles(body_rotation, bearing, distance, altitude_delta):
+    """
+    Returns where a single target is, as seen from the nose.
+
+    Arguments:
+        body_rotation {tuple} -- The rotation from get_body_rotation.
+        bearing {float} -- The bearing to the target, in degrees, using the same north as the heading.
+        distance {float} -- How far away the target is, along the ground.
+        altitude_delta {float} -- How far above the aircraft the target is, in the same units as the distance.
+
+    Returns:
+        tuple -- The degrees to the right of the nose, and the degrees above the nose.
+    """
+
+    bearing_radians = math.radians(bearing)
+    north = distance * math.cos(bearing_radians)
+    east = distance * math.sin(bearing_radians)
+    down = -altitude_delta
+
+    forward_row, right_row, down_row = body_rotation
+    # Adding zero turns a negative zero into a positive one, so a target
+    # right on top of the aircraft is straight ahead, not behind.
+    forward = forward_row[0] * north + forward_row[1] * east + forward_row[2] * down + 0.0
+    right = right_row[0] * north + right_row[1] * east + right_row[2] * down
+    below = down_row[0] * north + down_row[1] * east + down_row[2] * down
+
+    return (math.degrees(math.atan2(right, forward)),
+            math.degrees(math.atan2(-below, math.hypot(forward, right))))
+
+
+def get_view_angles_batch(body_rotation, bearings, distances, altitude_deltas):
+    """
+    Returns where each of the targets is, as seen from the nose.
+    All of the targets are rotated with a single matrix multiply.
+    Needs NumPy.
+
+    Arguments:
+        body_rotation {tuple} -- The rotation from get_body_rotation.
+        bearings {array} -- The bearing to each target, in degrees.
+        distances {array} -- How far away each target is, along the ground.
+        altitude_deltas {array} -- How far above the aircraft each target is.
+
+    Returns:
+        tuple -- An array of the degrees to the right of the nose, and an array of the degrees above the nose.
+    """
+
+    bearings_radians = numpy.radians(bearings)
+    world_vectors = numpy.column_stack((distances * numpy.cos(bearings_radians),
+                                        distances * numpy.sin(bearings_radians),
+                                        -numpy.asarray(altitude_deltas, numpy.float64)))
+    body_vectors = world_vectors.dot(numpy.array(body_rotation).T)
+    forward, right, below = body_vectors[:, 0] + 0.0, body_vectors[:, 1], body_vectors[:, 2]
+
+    return (numpy.degrees(numpy.arctan2(right, forward)),
+            numpy.degrees(numpy.arctan2(-below, numpy.hypot(forward, right))))
+
+
+def __run_benchmark__(target_count=60, repeats=200):
+    """
+    Times projecting a busy sky, for the old flat projection,
+    and for the attitude projection one target at a time and in a batch.
+    """
+
+    import random
+    import timeit
+
+    targets = [(random.uniform(0, 360), random.uniform(100, 50000), random.uniform(-5000, 5000))
+               for _ in range(target_count)]
+    heading, pitch, roll = 90.0, 5.0, 30.0
+
+    def flat():
+        return [(bearing - heading, math.degrees(math.atan2(altitude_delta, distance)) - pitch)
+                for bearing, distance, altitude_delta in targets]
+
+    def scalar():
+        body_rotation = get_body_rotation(heading, pitch, roll)
+
+        return [get_view_angles(body_rotation, bearing, distance, altitude_delta)
+                for bearing, distance, altitude_delta in targets]
+
+    print("{} targets, {} repeats".format(target_count, repeats))
+
+    for name, function in [('flat', flat), ('attitude', scalar)]:
+        print("{0:>16}: {1:.3f}ms".format(
+            name, timeit.timeit(function, number=repeats) * 1000.0 / repeats))
+
+    if IS_NUMPY_AVAILABLE:
+        bearings, distances, altitude_deltas = [numpy.array(values)
+                                                for values in zip(*targets)]
+
+        def batch():
+            return get_view_angles_batch(get_body_rotation(heading, pitch, roll),
+                                         bearings, distances, altitude_deltas)
+
+        print("{0:>16}: {1:.3f}ms".format(
+            'attitude, batch', timeit.timeit(batch, number=repeats) * 1000.0 / repeats))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
+    __run_benchmark__()
@@ -58,7 +58,8 @@ class RecurringTask(object):
     @staticmethod
     def kill_all():
         timeout_sec = 5
-        for task in RecurringTask.__SPAWNED_TASKS__:  # list of your processes
+        # Stopping a task takes it off the list, so go through a copy.
+        for task in list(RecurringTask.__SPAWNED_TASKS__):
             print('Killing task {}'.format(task.__task_name__))
 
             try:
@@ -69,6 +70,17 @@ class RecurringTask(object):
     def stop(self):
         self.__is_alive__ = False
         self.__is_running__ = False
+        self.__stop_event__.set()
+
+        if self.__start_timer__ is not None:
+            self.__start_timer__.cancel()
+
+        # A stopped task can not be started again, so there
+        # is nothing left for kill_all to do with it.
+        try:
+            RecurringTask.__SPAWNED_TASKS__.remove(self)
+        except ValueError:
+            pass
 
     def is_running(self):
         """
@@ -115,8 +127,6 @@ class RecurringTask(object):
             target=self.__run_loop__, name=self.__task_name__)
         self.__last_task__.start()
 
-        RecurringTask.__SPAWNED_TASKS__.append(self)
-
     def __run_loop__(self):
         while self.__is_alive__:
             if self.__is_running__ and self.__task_callback__ is not None:
@@ -134,10 +144,12 @@ class RecurringTask(object):
                 finally:
                     self.__lock__.release()
 
+            # Wait on the event instead of sleeping, so a stopped
+            # task ends right away instead of sleeping out its interval.
             self.__lock__.acquire()
             try:
-                time.sleep(float(self.__task_interval__)
-                           if self.__is_alive__ and self.__is_running__ else 0)
+                self.__stop_event__.wait(float(self.__task_interval__)
+                                         if self.__is_alive__ and self.__is_running__ else 0)
             finally:
                 self.__lock__.release()
 
@@ -154,12 +166,20 @@ class RecurringTask(object):
         self.__is_alive__ = True
         self.__is_running__ = False
         self.__last_task__ = None
+        self.__start_timer__ = None
         self.__lock__ = threading.Lock()
+        self.__stop_event__ = threading.Event()
+
+        # Track the task even before it starts so that
+        # kill_all can cancel the delayed start.
+        RecurringTask.__SPAWNED_TASKS__.append(self)
 
         if start_immediate:
             self.start()
         else:
-            threading.Timer(int(self.__task_interval__), self.start).start()
+            self.__start_timer__ = threading.Timer(
+                int(self.__task_interval__), self.start)
+            self.__start_timer__.start()
 
 
 class TimerTest(object):
@@ -0,0 +1,232 @@
+"""
+Keeps rotated text around so that the text that follows
+the roll of the aircraft does not need to be rotated every frame.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+from lru_cache import LruCache, get_surface_size_in_bytes
+
+# Rotated text is a good deal larger than the upright text.
+DEFAULT_MAX_SIZE_IN_BYTES = 4 * 1024 * 1024
+
+# How many neighboring rolls may be waiting to be warmed.
+MAX_PENDING_WARMS = 32
+
+
+def get_quantized_roll(roll, roll_quantum):
+    """
+    Snaps the roll to the nearest step of the quantum.
+
+    Arguments:
+        roll {float} -- The roll in degrees.
+        roll_quantum {int} -- The number of degrees between each step.
+
+    Returns:
+        int -- The roll, snapped to a step.
+
+    >>> get_quantized_roll(12.6, 1)
+    13
+    >>> get_quantized_roll(12.6, 5)
+    15
+    >>> get_quantized_roll(-12.4, 5)
+    -10
+    """
+
+    return int(round(roll / float(roll_quantum))) * roll_quantum
+
+
+class RotatedTextCache(object):
+    """
+    Holds text rotated to a roll, least recently used first out.
+
+    Nothing is rotated up front. When a roll is asked for that is not
+    in the cache, the rolls to either side of it are queued as well.
+    Since the roll changes smoothly, those are the ones most likely
+    to be asked for next, and they can be warmed when a frame has
+    time left over.
+    """
+
+    def __init__(self, max_size_in_bytes=DEFAULT_MAX_SIZE_IN_BYTES, roll_quantum=1, max_entries=None):
+        """
+        Creates a new, empty, cache.
+
+        Keyword Arguments:
+            max_size_in_bytes {int} -- The most memory the rotated text may use. (default: {DEFAULT_MAX_SIZE_IN_BYTES})
+            roll_quantum {int} -- The number of degrees between each cached roll. (default: {1})
+            max_entries {int} -- The most textures that may be held. Unlimited if None. (default: {None})
+        """
+
+        self.__cache__ = LruCache(max_size_in_bytes, max_entries)
+        self.__roll_quantum__ = roll_quantum
+        # Keyed by the cache key, holds what is needed to render the text.
+        self.__pending_warms__ = OrderedDict()
+        self.warms = 0
+
+    def get_rotated_text(self, text, font, text_color, roll, background_color=None, antialias=True):
+        """
+        Returns the text rotated to the roll, rotating it if needed.
+
+        Arguments:
+            text {string} -- The text.
+            font {pygame.font} -- The font to render the text with.
+            text_color {tuple} -- The RGB color of the text.
+            roll {float} -- The roll, in degrees, to rotate the text by.
+
+        Keyword Arguments:
+            background_color {tuple} -- The RGB color behind the text. Transparent if None. (default: {None})
+            antialias {bool} -- Should the text be antialiased? (default: {True})
+
+        Returns:
+            Surface -- The rotated text.
+        """
+
+        text_key = (text,
+                    id(font),
+                    tuple(text_color),
+                    tuple(background_color) if background_color is not None else None,
+                    antialias)
+        quantized_roll = get_quantized_roll(roll, self.__roll_quantum__)
+        rotated_text = self.__cache__.get((text_key, quantized_roll))
+
+        if rotated_text is None:
+            render_arguments = (text, font, text_color,
+                                background_color, antialias)
+            rotated_text = self.__rotate_text__(
+                text_key, render_arguments, quantized_roll)
+
+            [self.__queue_warm__(text_key, render_arguments, quantized_roll + step)
+             for step in [-self.__roll_quantum__, self.__roll_quantum__]]
+
+        return rotated_text
+
+    def warm_pending(self, max_count):
+        """
+        Rotates the text that is likely to be asked for soon.
+        The most recently queued text is warmed first.
+
+        Arguments:
+            max_count {int} -- The most textures to rotate.
+
+        Returns:
+            int -- The number of textures rotated.
+        """
+
+        warmed = 0
+
+        while warmed < max_count and len(self.__pending_warms__) > 0:
+            (text_key, roll), render_arguments = self.__pending_warms__.popitem()
+
+            if (text_key, roll) not in self.__cache__:
+                self.__rotate_text__(text_key, render_arguments, roll)
+                warmed += 1
+
+        self.warms += warmed
+
+        return warmed
+
+    def set_roll_quantum(self, roll_quantum):
+        """
+        Changes the number of degrees between each cached roll.
+        Clears the cache if the quantum changed.
+
+        Arguments:
+            roll_quantum {int} -- The number of degrees between each cached roll.
+        """
+
+        if roll_quantum == self.__roll_quantum__:
+            return
+
+        self.__roll_quantum__ = roll_quantum
+        self.__cache__.clear()
+        self.__pending_warms__.clear()
+
+    def set_max_entries(self, max_entries):
+        """
+        Changes the most textures that may be held,
+        evicting the least recently used if there are now too many.
+
+        Arguments:
+            max_entries {int} -- The most textures that may be held. Unlimited if None.
+        """
+
+        self.__cache__.set_max_entries(max_entries)
+
+    def get_stats(self):
+        """
+        Returns how the cache is doing.
+
+        Returns:
+            tuple -- The size in bytes, the number of textures, and the total hits, misses, evictions, and warms.
+        """
+
+        return self.__cache__.get_size_in_bytes(), len(self.__cache__), self.__cache__.hits, \
+            self.__cache__.misses, self.__cache__.evictions, self.warms
+
+    def get_stats_string(self):
+        """
+        Returns a summary of how the cache is doing for the logs.
+
+        Returns:
+            string -- The summary.
+        """
+
+        size_in_bytes, texture_count, hits, misses, evictions, warms = self.get_stats()
+        lookups = hits + misses
+        hit_rate = (100.0 * hits / lookups) if lookups > 0 else 0.0
+
+        return "{0:.1f}KB, {1} textures, {2:.1f}% hits, {3} evictions, {4} warms".format(
+            size_in_bytes / 1024.0, texture_count, hit_rate, evictions, warms)
+
+    def __queue_warm__(self, text_key, render_arguments, roll):
+        if (text_key, roll) in self.__cache__:
+            return
+
+        self.__pending_warms__.pop((text_key, roll), None)
+        self.__pending_warms__[(text_key, roll)] = render_arguments
+
+        if len(self.__pending_warms__) > MAX_PENDING_WARMS:
+            self.__pending_warms__.popitem(last=False)
+
+    def __get_upright_text__(self, text_key, render_arguments):
+        """
+        Returns the text without any roll, rendering it if needed.
+        Every roll is rotated from the upright text so
+        the artifacts of rotating do not build up.
+        """
+
+        upright_text = self.__cache__.get((text_key, 0))
+
+        if upright_text is None:
+            text, font, text_color, background_color, antialias = render_arguments
+            upright_text = font.render(
+                text, antialias, text_color, background_color)
+
+            if background_color is not None:
+                upright_text = upright_text.convert()
+
+            self.__cache__.put((text_key, 0),
+                               upright_text,
+                               get_surface_size_in_bytes(upright_text))
+
+        return upright_text
+
+    def __rotate_text__(self, text_key, render_arguments, roll):
+        upright_text = self.__get_upright_text__(text_key, render_arguments)
+
+        if roll == 0:
+            return upright_text
+
+        rotated_text = pygame.transform.rotate(upright_text, roll)
+        self.__cache__.put((text_key, roll),
+                           rotated_text,
+                           get_surface_size_in_bytes(rotated_text))
+
+        return rotated_text
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -1,93 +1,197 @@
-import datetime
+"""
+Keeps rolling statistics of how long tasks take, and of other
+values the HUD tracks every frame.
+
+Values go into a fixed size ring buffer, and into a histogram with
+fixed buckets, so adding a value never allocates or takes a lock.
+Nothing is worked out or formatted until the statistics are read,
+which only the perf log, and the perf overlay, do.
+
+>>> stats = RollingStats('Test', window_size=4)
+>>> [stats.push(value) for value in [1.0, 2.0, 3.0, 4.0, 100.0]]
+[None, None, None, None, None]
+>>> stats.last, stats.average, stats.get_max()
+(100.0, 27.25, 100.0)
+>>> stats.get_percentile(50) >= 3.0, stats.get_percentile(99)
+(True, 100.0)
+>>> stats.to_string()
+'Test, 100.0,  27.2, 100.0, p50 3.0, p95 100.0, p99 100.0'
+>>> stats.reset()
+>>> stats.to_string()
+'Test: NO DATA'
+"""
+
+import array
+import math
 import time
-import Queue
+import timeit
+
+# How many of the most recent values the statistics cover.
+WINDOW_SIZE = 120
+
+# The histogram buckets grow by a fixed ratio, so a single set of
+# buckets covers frame times, frame rates, and cache sizes alike.
+# Each bucket is about 19% wider than the one before it. Values at or
+# under the smallest bucket share it, as do values past the largest.
+HISTOGRAM_MIN_VALUE = 0.01
+HISTOGRAM_BUCKET_RATIO = 2.0 ** 0.25
+HISTOGRAM_BUCKET_COUNT = 128
+
+__INVERSE_LOG_BUCKET_RATIO__ = 1.0 / math.log(HISTOGRAM_BUCKET_RATIO)
+
+
+def __get_bucket_index__(value):
+    """
+    Returns the histogram bucket for a value.
+    """
+
+    if value <= HISTOGRAM_MIN_VALUE:
+        return 0
+
+    return min(HISTOGRAM_BUCKET_COUNT - 1,
+               1 + int(math.log(value / HISTOGRAM_MIN_VALUE) * __INVERSE_LOG_BUCKET_RATIO__))
+
+
+def __get_bucket_top__(bucket_index):
+    """
+    Returns the largest value that goes in a histogram bucket.
+    """
+
+    return HISTOGRAM_MIN_VALUE * (HISTOGRAM_BUCKET_RATIO ** bucket_index)
+
 
 class RollingStats(object):
     """
     Class to keep a rolling means.
+
+    Values are pushed without a lock. Push from a single thread.
+    Reading from another thread may see a push that is half done.
     """
 
-    def __init__(self, name):
+    def __init__(self, name, window_size=WINDOW_SIZE):
         """
         Creates a new mean tracker.
-        
+
         Arguments:
             name {string} -- The name of the task being tracked.
+
+        Keyword Arguments:
+            window_size {int} -- How many of the most recent values to keep. (default: {WINDOW_SIZE})
         """
 
         self.task_name = name
-        self.__max_running_average__ = 120
-        self.__running_average__ = Queue.Queue(self.__max_running_average__)
-        self.__running_sum__ = 0.0
-        self.__running_average_count__ = 0
+        self.__window_size__ = window_size
+        self.__values__ = array.array('d', [0.0] * window_size)
+        self.__histogram__ = array.array('l', [0] * HISTOGRAM_BUCKET_COUNT)
         self.last = None
-        self.average = 0.0
-    
+        self.reset()
+
     def reset(self):
         """
         Resets the rolling mean and maximums.
         """
 
         self.average = 0.0
-        self.__running_average__ = Queue.Queue(self.__max_running_average__)
+        self.last = None
+        # Every value pushed since the reset, not just those in the window.
+        self.push_count = 0
+        self.__next_index__ = 0
+        self.__count__ = 0
         self.__running_sum__ = 0.0
-        self.__running_average_count__ = 0.0
-    
+
+        for index in range(HISTOGRAM_BUCKET_COUNT):
+            self.__histogram__[index] = 0
+
     def push(self, value):
         """
         Adds a new value to be tracked in the mean.
-        
+
         Arguments:
             value {float} -- The new value to be averaged.
         """
 
+        index = self.__next_index__
+
+        if self.__count__ == self.__window_size__:
+            oldest_value = self.__values__[index]
+            self.__running_sum__ -= oldest_value
+            self.__histogram__[__get_bucket_index__(oldest_value)] -= 1
+        else:
+            self.__count__ += 1
+
+        self.__values__[index] = value
+        self.__histogram__[__get_bucket_index__(value)] += 1
+        self.__running_sum__ += value
+        self.__next_index__ = (index + 1) % self.__window_size__
         self.last = value
-        self.__running_average__.put(self.last)
-        self.__running_sum__ += self.last
-        self.__running_average_count__ += 1
+        self.push_count += 1
+        self.average = float(self.__running_sum__ / self.__count__)
 
-        if self.__running_average__.full():
-            self.__running_sum__ -= self.__running_average__.get()
-            self.__running_average_count__ -= 1
+    def get_max(self):
+        """
+        Returns the largest value in the window. None if there are no values.
+        """
+
+        if self.__count__ == 0:
+            return None
+
+        return max(self.__values__[:self.__count__])
+
+    def get_percentile(self, percent):
+        """
+        Returns the value that the given percent of the window is at or under,
+        to the resolution of the histogram. None if there are no values.
+
+        Arguments:
+            percent {float} -- The percentile, from 0 to 100.
+
+        Returns:
+            float -- The top of the histogram bucket the percentile is in, or the max if that is lower.
+        """
+
+        if self.__count__ == 0:
+            return None
+
+        rank = max(1, int(math.ceil(self.__count__ * percent / 100.0)))
+        seen_count = 0
+
+        for bucket_index, bucket_count in enumerate(self.__histogram__):
+            seen_count += bucket_count
+
+            if seen_count >= rank:
+                return min(__get_bucket_top__(bucket_index), self.get_max())
+
+        return self.get_max()
 
-        self.average = float(self.__running_sum__ /
-                             self.__running_average_count__)
-    
     def to_string(self):
         """
         Returns a string representation of the rolling mean data.
-        
+
         Returns:
             string -- A string representing the data.
         """
 
         try:
-            if self.last is None:
+            if self.last is None or self.__count__ == 0:
                 return "{0}: NO DATA".format(self.task_name)
-            
-            slowest = max(self.__running_average__.queue) if not self.__running_average__.empty() else None
-
-            if slowest is not None:
-                slowest_text = "{0:.1f}".format(slowest)
-            else:
-                slowest_text = '---'
 
+            slowest_text = "{0:.1f}".format(self.get_max())
             slowest_length = len(slowest_text)
-
             last_text = "{0:.1f}".format(self.last).rjust(slowest_length)
-
-            if self.average is not None:
-                average_text = "{0:.1f}".format(self.average).rjust(slowest_length)
-            else:
-                average_text = '---'
-
-            return "{0}, {1}, {2}, {3}".format(self.task_name,
-                                                last_text,
-                                                average_text,
-                                                slowest_text)
+            average_text = "{0:.1f}".format(self.average).rjust(slowest_length)
+
+            return "{0}, {1}, {2}, {3}, p50 {4:.1f}, p95 {5:.1f}, p99 {6:.1f}".format(
+                self.task_name,
+                last_text,
+                average_text,
+                slowest_text,
+                self.get_percentile(50),
+                self.get_percentile(95),
+                self.get_percentile(99))
         except:
             return '---'
 
+
 class TaskTimer(object):
     """
     Class to track how long a task takes.
@@ -106,7 +210,7 @@ class TaskTimer(object):
     def start(self):
         self.stop()
 
-        self.__start_time__ = datetime.datetime.utcnow()
+        self.__start_time__ = timeit.default_timer()
         self.is_running = True
 
     def stop(self):
@@ -115,15 +219,32 @@ class TaskTimer(object):
 
         self.is_running = False
 
-        value = (datetime.datetime.utcnow() - self.__start_time__).total_seconds() * 1000.0
+        value = (timeit.default_timer() - self.__start_time__) * 1000.0
         self.__stats__.push(value)
 
+    def get_last_ms(self):
+        """
+        Returns how long the task took the last time, in milliseconds.
+        None if the task has not finished yet.
+        """
+
+        return self.__stats__.last
+
+    def get_sample_count(self):
+        """
+        Returns how many times the task has finished since the timer was reset.
+        """
+
+        return self.__stats__.push_count
 
     def to_string(self):
         return self.__stats__.to_string()
 
 
 if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
+
     timer = TaskTimer("test")
 
     for i in range(1, 11, 1):
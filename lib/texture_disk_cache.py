@@ -0,0 +1,271 @@
+"""
+Keeps the textures that are rendered while the HUD boots
+on disk, so that later boots can load them instead of
+rendering them all over again.
+
+Each set of textures is stored as a small header, then the width,
+the height, and the raw RGB bytes of every texture. Nothing in the
+file is run or unpickled, so a damaged file can only miss the cache.
+
+The file is named by a hash of everything that changes how the
+textures look: the font file, the font size, the screen resolution,
+the colors, and the text. Changing any of those simply misses the
+cache. When the new file is written, the stale files for the same
+set of textures, font, and resolution are removed. Other fonts and
+resolutions keep their own files.
+
+>>> import os, shutil, sys, tempfile
+>>> os.environ.setdefault('SDL_VIDEODRIVER', 'dummy') and None
+>>> pygame.display.init()
+>>> pygame.font.init()
+>>> screen = pygame.display.set_mode((64, 64))
+>>> cache_module = sys.modules[get_text_textures.__module__]
+>>> cache_module.CACHE_DIRECTORY = tempfile.mkdtemp()
+>>> font = load_font('./assets/fonts/LiberationMono-Bold.ttf', 20)
+>>> detail_font = load_font('./assets/fonts/LiberationMono-Bold.ttf', 30)
+>>> rendered = get_text_textures('test', font, ['N', '10%'], (0, 255, 0), (0, 0, 0), (64, 64))
+>>> loaded = get_text_textures('test', font, ['N', '10%'], (0, 255, 0), (0, 0, 0), (64, 64))
+>>> [pygame.image.tostring(texture, 'RGB') for texture in rendered] == [
+...     pygame.image.tostring(texture, 'RGB') for texture in loaded]
+True
+>>> detail = get_text_textures('test', detail_font, ['N'], (0, 255, 0), (0, 0, 0), (64, 64))
+>>> len(os.listdir(cache_module.CACHE_DIRECTORY))
+2
+>>> shutil.rmtree(cache_module.CACHE_DIRECTORY)
+"""
+
+import hashlib
+import os
+import struct
+
+import pygame
+
+# Bump when the layout of the cache files changes.
+CACHE_FORMAT_VERSION = 2
+
+# The start of every cache file: a marker, the format version,
+# and how many textures follow.
+CACHE_FILE_MARKER = b'HUDT'
+CACHE_FILE_HEADER = struct.Struct('<4sHI')
+
+# The start of every texture: the width and the height.
+# The raw RGB bytes of the texture follow.
+TEXTURE_HEADER = struct.Struct('<HH')
+
+CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), 'hud_texture_cache')
+CACHE_FILE_EXTENSION = '.textures'
+
+# Keyed by the id of the font. Holds the hash of the font file and the size.
+__FONT_IDENTITIES__ = {}
+
+
+def get_file_hash(file_path):
+    """
+    Returns the SHA1 of the contents of a file.
+
+    Arguments:
+        file_path {string} -- The file to hash.
+
+    Returns:
+        string -- The hex digest of the file.
+    """
+
+    file_hash = hashlib.sha1()
+
+    with open(file_path, 'rb') as file_to_hash:
+        for chunk in iter(lambda: file_to_hash.read(64 * 1024), b''):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
+def load_font(font_file, font_size):
+    """
+    Loads a font, and remembers which file and size it came from
+    so that textures rendered with it can be cached on disk.
+
+    Arguments:
+        font_file {string} -- The path to the font file.
+        font_size {int} -- The size of the font.
+
+    Returns:
+        pygame.font.Font -- The font.
+    """
+
+    font = pygame.font.Font(font_file, font_size)
+
+    try:
+        __FONT_IDENTITIES__[id(font)] = (get_file_hash(font_file), font_size)
+    except Exception:
+        pass
+
+    return font
+
+
+def __get_cache_file_prefix__(cache_name, font_identity, resolution):
+    """
+    Returns the start of the names of the cache files for a set of
+    textures, rendered with a font, for a screen resolution.
+    """
+
+    font_key = hashlib.sha1(
+        repr((font_identity, tuple(resolution)))).hexdigest()[:12]
+
+    return '{}_{}_'.format(cache_name, font_key)
+
+
+def __get_cache_file_path__(cache_file_prefix, cache_key):
+    return os.path.join(CACHE_DIRECTORY,
+                        '{}{}{}'.format(cache_file_prefix, cache_key, CACHE_FILE_EXTENSION))
+
+
+def __get_cache_key__(font_identity, texts, text_color, background_color, resolution):
+    """
+    Returns the hash of everything that changes how the textures look.
+    """
+
+    key_hash = hashlib.sha1()
+    key_hash.update(repr((CACHE_FORMAT_VERSION,
+                          font_identity,
+                          tuple(resolution),
+                          tuple(text_color),
+                          tuple(background_color),
+                          tuple(texts))))
+
+    return key_hash.hexdigest()
+
+
+def __load_textures__(cache_file_path, texture_count):
+    """
+    Loads the textures from the cache file, converted for the display.
+
+    Returns:
+        list -- The textures, or None if they could not be loaded.
+    """
+
+    if not os.path.isfile(cache_file_path):
+        return None
+
+    with open(cache_file_path, 'rb') as cache_file:
+        cached_bytes = cache_file.read()
+
+    if len(cached_bytes) < CACHE_FILE_HEADER.size:
+        return None
+
+    marker, format_version, cached_count = CACHE_FILE_HEADER.unpack_from(
+        cached_bytes)
+
+    if marker != CACHE_FILE_MARKER \
+            or format_version != CACHE_FORMAT_VERSION \
+            or cached_count != texture_count:
+        return None
+
+    textures = []
+    offset = CACHE_FILE_HEADER.size
+
+    for texture_index in range(cached_count):
+        if offset + TEXTURE_HEADER.size > len(cached_bytes):
+            return None
+
+        size = TEXTURE_HEADER.unpack_from(cached_bytes, offset)
+        offset += TEXTURE_HEADER.size
+        pixels_end = offset + (size[0] * size[1] * 3)
+
+        if pixels_end > len(cached_bytes):
+            return None
+
+        textures.append(pygame.image.frombuffer(
+            cached_bytes[offset:pixels_end], size, 'RGB').convert())
+        offset = pixels_end
+
+    if offset != len(cached_bytes):
+        return None
+
+    return textures
+
+
+def __save_textures__(cache_file_prefix, cache_file_path, textures):
+    """
+    Writes the textures to the cache file, then removes any
+    stale files for the same set of textures, font, and resolution.
+    """
+
+    if not os.path.isdir(CACHE_DIRECTORY):
+        os.makedirs(CACHE_DIRECTORY)
+
+    # Write to the side and then move the file into place
+    # so a power loss never leaves a partial file behind.
+    temporary_file_path = cache_file_path + '.tmp'
+    with open(temporary_file_path, 'wb') as cache_file:
+        cache_file.write(CACHE_FILE_HEADER.pack(
+            CACHE_FILE_MARKER, CACHE_FORMAT_VERSION, len(textures)))
+
+        for texture in textures:
+            cache_file.write(TEXTURE_HEADER.pack(*texture.get_size()))
+            cache_file.write(pygame.image.tostring(texture, 'RGB'))
+    os.rename(temporary_file_path, cache_file_path)
+
+    stale_file_prefix = cache_file_prefix
+    cache_file_name = os.path.basename(cache_file_path)
+
+    [os.remove(os.path.join(CACHE_DIRECTORY, file_name))
+     for file_name in os.listdir(CACHE_DIRECTORY)
+     if file_name.startswith(stale_file_prefix)
+     and file_name.endswith(CACHE_FILE_EXTENSION)
+     and file_name != cache_file_name]
+
+
+def get_text_textures(cache_name, font, texts, text_color, background_color, resolution):
+    """
+    Returns a texture for each of the texts, converted for the display.
+    The textures are loaded from the disk cache when they can be,
+    otherwise they are rendered and then saved to the cache.
+
+    Fonts that were not loaded through load_font are never cached,
+    since there is no way to know which file they came from.
+
+    Arguments:
+        cache_name {string} -- The name of the set of textures.
+        font {pygame.font.Font} -- The font to render the text with.
+        texts {list} -- The text to render.
+        text_color {tuple} -- The RGB color of the text.
+        background_color {tuple} -- The RGB color behind the text.
+        resolution {tuple} -- The size of the screen.
+
+    Returns:
+        list -- The textures, in the same order as the text.
+    """
+
+    font_identity = __FONT_IDENTITIES__.get(id(font))
+    cache_file_path = None
+
+    if font_identity is not None:
+        cache_file_prefix = __get_cache_file_prefix__(
+            cache_name, font_identity, resolution)
+        cache_file_path = __get_cache_file_path__(
+            cache_file_prefix,
+            __get_cache_key__(font_identity, texts, text_color, background_color, resolution))
+
+        try:
+            textures = __load_textures__(cache_file_path, len(texts))
+
+            if textures is not None:
+                return textures
+        except Exception:
+            pass
+
+    textures = [font.render(text, True, text_color, background_color).convert()
+                for text in texts]
+
+    if cache_file_path is not None:
+        try:
+            __save_textures__(cache_file_prefix, cache_file_path, textures)
+        except Exception:
+            pass
+
+    return textures
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
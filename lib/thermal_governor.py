@@ -0,0 +1,203 @@
+"""
+Slows the HUD down before the SoC gets hot enough for the kernel
+to throttle it. A throttled Pi drops its clock all at once, and the
+frame rate collapses with it. Giving up frames and detail a little
+at a time, as the temperature climbs, keeps the HUD smooth instead.
+
+The temperature is read from sysfs in the background. Each thermal
+state caps the frame rate, and sets the least detail that the frame
+governor has to give up. The frame governor still gives up more if
+the frames run long at the lower rate.
+
+A state is left for a cooler one only once the temperature is well
+below where the state started, so the HUD does not flip between
+states while the temperature sits near a threshold.
+
+>>> import os, tempfile
+>>> sysfs_file, sysfs_path = tempfile.mkstemp()
+>>> def set_temperature(celsius):
+...     with open(sysfs_path, 'w') as temperature_file:
+...         temperature_file.write("{}\\n".format(int(celsius * 1000)))
+>>> governor = ThermalGovernor(sysfs_path)
+>>> set_temperature(55.0)
+>>> governor.sample(), governor.state.name, governor.temperature
+(False, 'Normal', 55.0)
+>>> set_temperature(76.5)
+>>> governor.sample(), governor.state.name, governor.state.max_fps
+(True, 'Hot', 30)
+
+Cooling a little is not enough to leave the state.
+
+>>> set_temperature(73.0)
+>>> governor.sample(), governor.state.name
+(False, 'Hot')
+>>> set_temperature(68.0)
+>>> governor.sample(), governor.state.name
+(True, 'Warm')
+
+The HUD keeps going as it is if the temperature can not be read.
+
+>>> os.close(sysfs_file)
+>>> os.remove(sysfs_path)
+>>> governor.sample(), governor.state.name, governor.temperature
+(False, 'Warm', None)
+>>> governor.to_string()
+'Warm ---, 45fps'
+>>> read_cpu_temperature(sysfs_path) is None
+True
+"""
+
+import threading
+
+# Where the Pi reports the temperature of the SoC, in thousandths of a degree C.
+THERMAL_ZONE_PATH = '/sys/class/thermal/thermal_zone0/temp'
+
+# How much cooler than the start of a state the SoC must be to leave it.
+COOLING_HYSTERESIS_CELSIUS = 5.0
+
+
+def read_cpu_temperature(sysfs_path=THERMAL_ZONE_PATH):
+    """
+    Reads the temperature of the SoC.
+
+    Keyword Arguments:
+        sysfs_path {string} -- The file to read, in thousandths of a degree C. (default: {THERMAL_ZONE_PATH})
+
+    Returns:
+        float -- The temperature in degrees C, or None if it could not be read.
+    """
+
+    try:
+        with open(sysfs_path) as temperature_file:
+            return float(temperature_file.read()) / 1000.0
+    except (IOError, OSError, ValueError):
+        return None
+
+
+class ThermalState(object):
+    """
+    What the HUD gives up at a temperature.
+    """
+
+    def __init__(self, name, min_celsius, max_fps, min_detail_level):
+        """
+        Creates a thermal state.
+
+        Arguments:
+            name {string} -- The name of the state, for the logs and Diagnostics.
+            min_celsius {float} -- The temperature the state starts at.
+            max_fps {int} -- The most frames a second to draw. No extra limit if None.
+            min_detail_level {int} -- The rung of the detail ladder the frame governor must be at, or below.
+        """
+
+        self.name = name
+        self.min_celsius = min_celsius
+        self.max_fps = max_fps
+        self.min_detail_level = min_detail_level
+
+    def __repr__(self):
+        return "ThermalState({})".format(self.name)
+
+
+# Coolest first. The Pi starts to throttle at 80C.
+THERMAL_STATES = [ThermalState('Normal', None, None, 0),
+                  ThermalState('Warm', 70.0, 45, 1),
+                  ThermalState('Hot', 75.0, 30, 3),
+                  ThermalState('Critical', 78.0, 20, 5)]
+
+
+class ThermalGovernor(object):
+    """
+    Samples the temperature, and picks the thermal state.
+    Sampled from a background thread. The state is replaced, never
+    changed, so the render thread can read it without a lock.
+    """
+
+    def __init__(self, sysfs_path=THERMAL_ZONE_PATH, states=None):
+        """
+        Creates a governor that starts in the coolest state.
+
+        Keyword Arguments:
+            sysfs_path {string} -- Where to read the temperature from. (default: {THERMAL_ZONE_PATH})
+            states {list} -- The ThermalState of each state, coolest first. THERMAL_STATES if None. (default: {None})
+        """
+
+        self.__sysfs_path__ = sysfs_path
+        self.__states__ = states if states is not None else THERMAL_STATES
+        self.__lock__ = threading.Lock()
+        self.state = self.__states__[0]
+        # The last temperature read, in degrees C. None if it could not be read.
+        self.temperature = None
+
+    def __get_state_index__(self, state):
+        return self.__states__.index(state)
+
+    def __pick_state__(self, temperature):
+        """
+        Returns the state for the temperature, staying in the
+        current state until the SoC has cooled well below it.
+        """
+
+        current_index = self.__get_state_index__(self.state)
+        hottest_index = 0
+
+        for index, state in enumerate(self.__states__):
+            if state.min_celsius is not None and temperature >= state.min_celsius:
+                hottest_index = index
+
+        if hottest_index >= current_index:
+            return self.__states__[hottest_index]
+
+        # Cooling. Only step down out of states that have been left well behind.
+        while current_index > hottest_index \
+                and temperature < self.__states__[current_index].min_celsius - COOLING_HYSTERESIS_CELSIUS:
+            current_index -= 1
+
+        return self.__states__[current_index]
+
+    def sample(self):
+        """
+        Reads the temperature, and moves to a new state if needed.
+
+        Returns:
+            bool -- True if the state changed.
+        """
+
+        with self.__lock__:
+            temperature = read_cpu_temperature(self.__sysfs_path__)
+            self.temperature = temperature
+
+            if temperature is None:
+                return False
+
+            new_state = self.__pick_state__(temperature)
+
+            if new_state is self.state:
+                return False
+
+            self.state = new_state
+
+            return True
+
+    def to_string(self):
+        """
+        Returns the state and temperature, for the logs and Diagnostics.
+        """
+
+        temperature = self.temperature
+        text = "{} {}".format(self.state.name,
+                              "---" if temperature is None else "{:.0f}C".format(temperature))
+
+        if self.state.max_fps is not None:
+            text += ", {}fps".format(self.state.max_fps)
+
+        return text
+
+
+# Sampled by the HUD in the background. Read by the render loop and Diagnostics.
+THERMAL_GOVERNOR = ThermalGovernor()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
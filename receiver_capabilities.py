@@ -69,6 +69,7 @@ class StratuxCapabilities(LoggingObject):
             self.barometric_enabled = True
             self.ahrs_enabled = True
             self.ownship_mode_s = None
+            self.ownship_icao = 0
         else:
             url = "http://{0}/getSettings".format(stratux_address)
 
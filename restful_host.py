@@ -12,6 +12,7 @@ import urllib
 import os
 import re
 from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+import lib.boot_timeline as boot_timeline
 import lib.utilities as utilities
 import configuration
 import lib.local_debug as local_debug
@@ -75,6 +76,14 @@ def set_views(handler):
     return configuration.CONFIGURATION.get_views_list()
 
 
+def get_boot_timeline(handler):
+    """
+    Handler for a REST call to get how long each phase of booting took.
+    """
+
+    return boot_timeline.BOOT_TIMELINE.to_json()
+
+
 def get_current_view_response():
     """
     Create a dictionary that can be serialized
@@ -122,7 +131,8 @@ class RestfulHost(BaseHTTPRequestHandler):
         r'^/view_elements': {'GET': get_elements_list, 'media_type': 'application/json'},
         r'^/views': {'GET': get_views_list, 'PUT': set_views, 'media_type': 'application/json'},
         r'^/view/next': {'GET': get_view_next},
-        r'^/view/previous': {'GET': get_view_previous}
+        r'^/view/previous': {'GET': get_view_previous},
+        r'^/boot_timeline': {'GET': get_boot_timeline, 'media_type': 'application/json'}
     }
 
     def do_HEAD(self):
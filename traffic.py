@@ -2,6 +2,7 @@
 Holds code relevant to collecting and traffic information.
 """
 
+import copy
 import datetime
 import json
 import math
@@ -165,6 +166,21 @@ class Traffic(object):
         r = configuration.EARTH_RADIUS_STATUTE_MILES
         return c * r
 
+    def clone(
+        self
+    ):
+        """
+        Returns a copy of the report that later updates will not change.
+
+        Returns:
+            Traffic -- The copy of the report.
+        """
+
+        traffic_clone = copy.copy(self)
+        traffic_clone.__json__ = dict(self.__json__)
+
+        return traffic_clone
+
     def update(
         self,
         json_report
@@ -338,6 +354,7 @@ class SimulatedTraffic(object):
                 'Speed_valid': True,
                 'Emitter_category': 3,
                 'Tail': self.tail_number,
+                'displayName': self.tail_number,
                 'GnssDiffFromBaroAlt': -300,
                 'Reg': self.tail_number,
                 'Last_seen': str(self.time_decoded),
@@ -1,4 +1,3 @@
-import math
 
 import pygame
 import utils
@@ -14,6 +13,16 @@ from lib.task_timer import TaskTimer
 import lib.colors as colors
 import configuration
 
+# How far apart the lines of text on an info card are,
+# as a proportion of the font height.
+INFO_CARD_LINE_SPACING = 1.2
+INFO_CARD_BORDER_SIZE = 6
+INFO_CARD_PADDING_SIZE = 1
+
+# Info cards fade to black as their reports age.
+# Each step means composing the card again.
+INFO_CARD_FADE_STEPS = 16
+
 
 class AdsbElement(object):
     def uses_ahrs(self):
@@ -26,6 +35,18 @@ class AdsbElement(object):
 
         return True
 
+    def render_static(self, framebuffer):
+        """
+        Renders the parts of the element that never change.
+        These are drawn once into the static layer of the view
+        instead of every frame.
+
+        Arguments:
+            framebuffer {Surface} -- The static layer to draw to.
+        """
+
+        pass
+
     def __init__(self, degrees_of_pitch, pixels_per_degree_y, font, framebuffer_size):
         self.__roll_elements__ = {}
         self.__framebuffer_size__ = framebuffer_size
@@ -39,64 +60,98 @@ class AdsbElement(object):
         self.__pixels_per_degree_x__ = self.__framebuffer_size__[0] / 360.0
         self.__height__ = framebuffer_size[1]
         self.__width__ = framebuffer_size[0]
+        self.__projection_geometry__ = hud_elements.ProjectionGeometry(
+            self.__pixels_per_degree_x__, pixels_per_degree_y, framebuffer_size)
         self.start_fade_threshold = (
             configuration.CONFIGURATION.max_minutes_before_removal * 60) / 2
+        self.__traffic_key__ = None
+        self.__reports_to_show__ = []
+        # Keyed by what the card is for, holds the fingerprint
+        # of the card's content and the composed card.
+        self.__info_cards__ = {}
+        self.__info_cards_used__ = set()
+
+    def __get_reports_to_show__(self, frame_context, select_reports):
+        """
+        Returns what the element shows from the traffic snapshot of the frame.
+        The reports are only selected again when a new snapshot
+        is published, the configuration changes, or the most traffic
+        that may be drawn changes.
+
+        Arguments:
+            frame_context {FrameContext} -- The values worked out for the frame.
+            select_reports {function} -- Takes the tuple of traffic and returns what to show.
+
+        Returns:
+            list -- The result of select_reports.
+        """
+
+        traffic_snapshot = frame_context.traffic_snapshot
+        traffic_key = (traffic_snapshot.version,
+                       configuration.CONFIGURATION.get_revision(),
+                       frame_context.max_target_bugs)
 
-    def __get_speed_string__(self, speed):
+        if traffic_key != self.__traffic_key__:
+            self.__traffic_key__ = traffic_key
+            self.__reports_to_show__ = select_reports(
+                traffic_snapshot.traffic)
+
+        return self.__reports_to_show__
+
+    def __get_speed_string__(self, speed, speed_units):
         """
-        Gets the string to display for the speed. Uses the units configured by the user.
+        Gets the string to display for the speed.
 
         Arguments:
             speed {number} -- The raw speed from the sensor.
+            speed_units {string} -- The units configured by the user.
 
         Returns:
             string -- A string with the speed and the correct units.
         """
 
-        speed_units = configuration.CONFIGURATION.__get_config_value__(
-            Configuration.DISTANCE_UNITS_KEY, units.STATUTE)
-
         return units.get_converted_units_string(speed_units, speed, units.SPEED)
 
-    def __get_distance_string__(self, distance, decimal_places=True):
+    def __get_distance_string__(self, distance, display_units, decimal_places=True):
         """
-        Gets the distance string for display using the units
-        from the configuration.
+        Gets the distance string for display.
 
         Arguments:
             distance {float} -- The distance... straight from the GDL90 which means FEET
+            display_units {string} -- The units configured by the user.
 
         Returns:
             string -- The distance in a handy string for display.
         """
 
-        display_units = configuration.CONFIGURATION.__get_config_value__(
-            Configuration.DISTANCE_UNITS_KEY, units.STATUTE)
-
         return units.get_converted_units_string(display_units, distance, decimal_places=decimal_places)
 
-    def __get_traffic_projection__(self, orientation, traffic):
+    def __get_projection__(self, frame_context, traffic):
+        """
+        Returns the target as projected for the frame.
+        The projection is shared with the other traffic elements.
+
+        Arguments:
+            frame_context {FrameContext} -- The values worked out for the frame.
+            traffic {Traffic} -- The target.
+
+        Returns:
+            TrafficProjection -- Where the target is drawn, and its text.
+        """
+
+        return frame_context.get_traffic_projection(traffic,
+                                                    self.__projection_geometry__)
+
+    def __get_traffic_projection__(self, frame_context, traffic):
         """
         Attempts to figure out where the traffic reticle should be rendered.
         Returns value within screen space
         """
 
         # Assumes traffic.position_valid
-        # TODO - Account for aircraft roll...
-
-        altitude_delta = int(traffic.altitude - orientation.alt)
-        slope = altitude_delta / traffic.distance
-        vertical_degrees_to_target = math.degrees(math.atan(slope))
-        vertical_degrees_to_target -= orientation.pitch
-
-        # TODO - Double check ALL of this math...
-        compass = orientation.get_onscreen_projection_heading()
-        horizontal_degrees_to_target = utils.apply_declination(traffic.bearing) - compass
-
-        screen_y = -vertical_degrees_to_target * self.__pixels_per_degree_y__
-        screen_x = horizontal_degrees_to_target * self.__pixels_per_degree_y__
+        projection = self.__get_projection__(frame_context, traffic)
 
-        return self.__center__[0] + screen_x, self.__center__[1] + screen_y
+        return projection.screen_x, projection.screen_y
 
     def get_above_reticle(self, center_x, scale):
         """Generates the coordinates for a reticle indicating
@@ -154,138 +209,170 @@ class AdsbElement(object):
 
         return on_screen_reticle, size
 
-    def __get_additional_target_text__(self, traffic_report, orientation):
+    def __get_additional_target_text__(self, traffic_report, frame_context):
         """
         Gets the additional text for a traffic report
 
         Arguments:
-            traffic_report {[type]} -- [description]
-            orientation {[type]} -- [description]
+            traffic_report {Traffic} -- The traffic to describe.
+            frame_context {FrameContext} -- The values worked out for the frame.
 
         Returns:
-            [type] -- [description]
+            list -- The bearing, distance, and altitude text.
         """
 
-        altitude_delta = int(
-            (traffic_report.altitude - orientation.alt) / 100.0)
-        distance_text = self.__get_distance_string__(traffic_report.distance)
-        delta_sign = ''
-        if altitude_delta > 0:
-            delta_sign = '+'
-        altitude_text = "{0}{1}".format(delta_sign, altitude_delta)
-        bearing_text = "{0}".format(
-            int(utils.apply_declination(traffic_report.bearing)))
-
-        return [bearing_text, distance_text, altitude_text]
+        return self.__get_projection__(frame_context, traffic_report).get_additional_text()
 
     def __render_info_card__(self,
                              framebuffer,
                              identifier_text,
                              additional_info_text,
                              center_x,
-                             time_since_last_report=0.0):
+                             time_since_last_report=0.0,
+                             card_key=None):
         """
         Renders a targetting reticle on the screen.
         Assumes the X/Y projection has already been performed.
-        """
 
-        card_color = self.__get_card_color__(time_since_last_report)
+        The card is composed into its own surface, and that surface
+        is reused until the text or the fade of the card changes.
 
-        # Render all of the textures and then
-        # find which one is the widest.
-        all_text = [identifier_text] + additional_info_text
-        all_textures_and_sizes = [hud_elements.HudDataCache.get_cached_text_texture(
-            text, self.__font__, BLACK, card_color, False, False) for text in all_text]
-        widest_texture = max(all_textures_and_sizes,
-                             key=lambda x: x[1][0])[1][0]
-        text_height = all_textures_and_sizes[0][1][1]
+        Keyword Arguments:
+            time_since_last_report {float} -- The number of seconds since the last traffic report. (default: {0.0})
+            card_key {object} -- What the card is for, such as the ICAO address. Uses the identifier if None. (default: {None})
 
-        info_spacing = 1.2
-        texture_height = int(
-            (len(all_textures_and_sizes) * info_spacing) * text_height)
-
-        info_position_y = ((self.__height__ >> 1) -
-                           (texture_height >> 1) - text_height)
+        Returns:
+            list -- The screen rectangles that were drawn to.
+        """
 
-        edge_left = (center_x - (widest_texture >> 1))
-        edge_right = (center_x + (widest_texture >> 1))
+        if card_key is None:
+            card_key = identifier_text
 
-        if edge_left < 0:
-            edge_right += math.fabs(edge_left)
-            edge_left = 0
+        fade_step = self.__get_card_fade_step__(time_since_last_report)
+        card_fingerprint = (identifier_text,
+                            tuple(additional_info_text),
+                            fade_step)
+        self.__info_cards_used__.add(card_key)
 
-        if edge_right > self.__framebuffer_size__[0]:
-            diff = edge_right - self.__framebuffer_size__[0]
-            edge_left -= diff
-            edge_right = self.__framebuffer_size__[0]
+        if card_key in self.__info_cards__ and self.__info_cards__[card_key][0] == card_fingerprint:
+            card = self.__info_cards__[card_key][1]
+        else:
+            card = self.__build_info_card__(framebuffer,
+                                            [identifier_text] +
+                                            additional_info_text,
+                                            fade_step)
+            self.__info_cards__[card_key] = (card_fingerprint, card)
+
+        # The text is vertically centered just above the center of the screen.
+        card_width, card_height = card.get_size()
+        inset = INFO_CARD_BORDER_SIZE + INFO_CARD_PADDING_SIZE
+        edge_left = center_x - (card_width >> 1)
+        edge_left = max(0, min(edge_left, self.__width__ - card_width))
+        edge_top = (self.__height__ >> 1) - self.__font__.get_height() - \
+            ((card_height - (inset << 1)) >> 1) - inset
+
+        return [framebuffer.blit(card, (edge_left, edge_top))]
+
+    def __build_info_card__(self, framebuffer, all_text, fade_step):
+        """
+        Composes the surface for a single info card.
 
-        pixel_border_size = 4
-        fill_top_left = [edge_left - pixel_border_size,
-                         info_position_y - pixel_border_size]
-        fill_top_right = [edge_right + pixel_border_size, fill_top_left[1]]
-        fill_bottom_right = [fill_top_right[0], info_position_y + pixel_border_size +
-                             int((len(additional_info_text) + 1) * info_spacing * text_height)]
-        fill_bottom_left = [fill_top_left[0], fill_bottom_right[1]]
+        Arguments:
+            framebuffer {Surface} -- The surface the card will be drawn to. The card matches its format.
+            all_text {string[]} -- The lines of text on the card.
+            fade_step {int} -- How faded the card is.
 
-        pygame.draw.polygon(framebuffer, card_color,
-                            [fill_top_left, fill_top_right, fill_bottom_right, fill_bottom_left])
+        Returns:
+            Surface -- The card, including its border.
+        """
 
-        pygame.draw.lines(framebuffer,
-                          BLACK, True, [fill_top_left, fill_top_right, fill_bottom_right, fill_bottom_left], 6)
+        card_color = self.__get_card_color_from_fade_step__(fade_step)
+        all_textures = [hud_elements.HudDataCache.get_cached_text_texture(
+            text, self.__font__, BLACK, card_color)[0] for text in all_text]
+        widest_texture = max([texture.get_width()
+                              for texture in all_textures])
+        text_height = self.__font__.get_height()
+        line_height = int(text_height * INFO_CARD_LINE_SPACING)
+        text_area_height = int(
+            len(all_text) * INFO_CARD_LINE_SPACING * text_height)
+
+        # The card has a padding of card color around the text,
+        # then a border of black around that.
+        inset = INFO_CARD_BORDER_SIZE + INFO_CARD_PADDING_SIZE
+        card = pygame.Surface((widest_texture + (inset << 1),
+                               text_area_height + (inset << 1))).convert(framebuffer)
+        card.fill(BLACK)
+        card.fill(card_color, card.get_rect().inflate(-INFO_CARD_BORDER_SIZE << 1,
+                                                      -INFO_CARD_BORDER_SIZE << 1))
+
+        line_y = inset
+        for texture in all_textures:
+            card.blit(texture,
+                      (inset + ((widest_texture - texture.get_width()) >> 1), line_y))
+            line_y += line_height
+
+        return card
+
+    def __prune_info_cards__(self):
+        """
+        Forgets the info cards that were not rendered since the last prune.
+        Call once per frame, after all of the cards are rendered.
+        """
 
-        self.__render_info_text__(
-            all_textures_and_sizes, center_x, framebuffer, info_position_y, info_spacing)
+        [self.__info_cards__.pop(card_key)
+         for card_key in list(self.__info_cards__.keys())
+         if card_key not in self.__info_cards_used__]
+        self.__info_cards_used__.clear()
 
-    def __get_card_color__(self, time_since_last_report):
+    def __get_card_fade_step__(self, time_since_last_report):
         """
-        Gets the color the card should be based on how long it has been
-        since the traffic has had a report.
+        Gets how far the card has faded, based on how long it has been
+        since the traffic has had a report. The fade happens in steps
+        so the card only needs to be composed again a few times.
 
         Arguments:
             time_since_last_report {float} -- The number of seconds since the last traffic report.
 
         Returns:
-            float[] -- The RGB tuple/array of the color the target card should be.
+            int -- From 0 (not faded) to INFO_CARD_FADE_STEPS (completely faded).
         """
 
         try:
-            card_color = YELLOW
-
-            if time_since_last_report > self.start_fade_threshold:
-                max_distance = (
-                    configuration.CONFIGURATION.max_minutes_before_removal * 60.0) - self.start_fade_threshold
-                proportion = (time_since_last_report -
-                              self.start_fade_threshold) / max_distance
+            if time_since_last_report <= self.start_fade_threshold:
+                return 0
 
-                card_color = colors.get_color_mix(YELLOW, BLACK, proportion)
+            max_distance = (
+                configuration.CONFIGURATION.max_minutes_before_removal * 60.0) - self.start_fade_threshold
+            proportion = (time_since_last_report -
+                          self.start_fade_threshold) / max_distance
 
-            return card_color
+            return int(colors.clamp(0.0, proportion, 1.0) * INFO_CARD_FADE_STEPS)
         except:
-            return YELLOW
+            return 0
 
-    def __render_info_text__(self, additional_info_textures, center_x, framebuffer, info_position_y, info_spacing):
-        for info_texture, size in additional_info_textures:
-            width_x, width_y = size
-            half_width = width_x >> 1
-            x_pos = center_x - half_width
+    def __get_card_color_from_fade_step__(self, fade_step):
+        """
+        Gets the color the card should be for how far it has faded.
 
-            if center_x <= half_width:  # half_width:
-                x_pos = 0  # half_width
+        Arguments:
+            fade_step {int} -- How far the card has faded.
 
-            if (center_x + half_width) >= self.__width__:
-                x_pos = self.__width__ - width_x
+        Returns:
+            float[] -- The RGB tuple/array of the color the target card should be.
+        """
 
-            try:
-                framebuffer.blit(info_texture, [x_pos, info_position_y])
-            except:
-                pass
+        if fade_step <= 0:
+            return YELLOW
 
-            info_position_y += int(width_y * info_spacing)
+        return colors.get_color_mix(YELLOW, BLACK, float(fade_step) / INFO_CARD_FADE_STEPS)
 
     def __render_target_reticle__(self, framebuffer, identifier, center_x, center_y, reticle_lines, roll):
         """
         Renders a targetting reticle on the screen.
         Assumes the X/Y projection has already been performed.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
         """
 
         border_space = int(self.__font__.get_height() * 3.0)
@@ -296,8 +383,8 @@ class AdsbElement(object):
         if center_y > (self.__height__ - border_space):
             center_y = int(self.__height__ - border_space)
 
-        pygame.draw.lines(framebuffer,
-                          RED, True, reticle_lines, 4)
+        reticle_rect = pygame.draw.lines(framebuffer,
+                                         RED, True, reticle_lines, 4).inflate(4, 4)
 
         # Move the identifer text away from the reticle
         if center_y < self.__center__[1]:
@@ -305,27 +392,22 @@ class AdsbElement(object):
         else:
             text_y = center_y - border_space
 
-        rendered_text = self.__font__.render(
-            str(identifier), True, YELLOW)
-        text_width, text_height = rendered_text.get_size()
-
-        text = pygame.transform.rotate(rendered_text, roll)
+        return [reticle_rect,
+                self.__render_texture__(framebuffer, (center_x, text_y), str(identifier), roll)]
 
-        framebuffer.blit(
-            text, (center_x - (text_width >> 1), text_y - (text_height >> 1)))
-
-    def __render_texture__(self, framebuffer, position, texture, texture_size, roll):
+    def __render_texture__(self, framebuffer, position, text, roll):
         """
-        Renders the text with the results centered on the given
-        position.
+        Renders the text rotated by the roll, with the
+        results centered on the given position.
+
+        Returns:
+            Rect -- The screen rectangle that was drawn to.
         """
 
         position_x, position_y = position
-        text_width, text_height = texture_size
-
-        text = pygame.transform.rotate(texture, roll)
-
-        framebuffer.blit(
-            text, (position_x - (text_width >> 1), position_y - (text_height >> 1)))
+        rotated_text = hud_elements.HudDataCache.ROTATED_TEXT_CACHE.get_rotated_text(
+            text, self.__font__, YELLOW, roll)
+        text_width, text_height = rotated_text.get_size()
 
-        return text_width, text_height
+        return framebuffer.blit(
+            rotated_text, (position_x - (text_width >> 1), position_y - (text_height >> 1)))
@@ -23,59 +23,68 @@ class AdsbOnScreenReticles(AdsbElement):
         self.__top_border__ = int(self.__height__ * 0.1)
         self.__bottom_border__ = self.__height__ - self.__top_border__
 
-    def __render_on_screen_reticle__(self,  framebuffer, orientation, traffic):
+    def __render_on_screen_reticle__(self,  framebuffer, frame_context, traffic):
         """
         Draws a single reticle on the screen.
 
         Arguments:
             framebuffer {Surface} -- Render target
-            orientation {Orientation} -- The orientation of the plane.
+            frame_context {FrameContext} -- The orientation of the plane, and the values worked out for the frame.
             traffic {Traffic} -- The traffic to draw the reticle for.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
         """
 
-        identifier = traffic.get_display_name()
+        projection = self.__get_projection__(frame_context, traffic)
+
+        if not projection.is_on_screen:
+            return []
+
+        identifier = projection.identifier
 
         # Find where to draw the reticle....
-        reticle_x, reticle_y = self.__get_traffic_projection__(
-            orientation, traffic)
+        # The projection already accounts for the roll.
+        reticle_x, reticle_y = projection.screen_x, projection.screen_y
 
         # Render using the Above us bug
-        on_screen_reticle_scale = get_reticle_size(traffic.distance)
+        on_screen_reticle_scale = projection.reticle_scale
         reticle, reticle_size_px = self.get_onscreen_reticle(
             reticle_x, reticle_y, on_screen_reticle_scale)
 
-        reticle_x, reticle_y = self.__rotate_reticle__([[reticle_x, reticle_y]],
-                                                       orientation.roll)[0]
-
-        self.__render_target_reticle__(framebuffer,
-                                       identifier,
-                                       (reticle_x, reticle_y),
-                                       reticle,
-                                       orientation.roll,
-                                       reticle_size_px)
+        return self.__render_target_reticle__(framebuffer,
+                                              identifier,
+                                              (reticle_x, reticle_y),
+                                              reticle,
+                                              frame_context.roll,
+                                              reticle_size_px)
 
-    def render(self, framebuffer, orientation):
+    def render(self, framebuffer, frame_context):
         """
         Renders all of the on-screen reticles  for nearby traffic.
 
         Arguments:
             framebuffer {Surface} -- The render target.
-            orientation {Orientation} -- The orientation of the plane the HUD is in.
+            frame_context {FrameContext} -- The orientation of the plane the HUD is in, and the values worked out for the frame.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
         """
 
         self.task_timer.start()
-        # Get the traffic, and bail out of we have none
-        traffic_reports = HudDataCache.get_reliable_traffic()
-
-        traffic_reports = filter(lambda x: not x.is_on_ground(),
-                                 traffic_reports)
-        traffic_reports = traffic_reports[:max_target_bugs]
+        traffic_reports = self.__get_reports_to_show__(
+            frame_context,
+            lambda traffic_reports: filter(lambda x: not x.is_on_ground(),
+                                           traffic_reports)[:frame_context.max_target_bugs])
 
-        [self.__render_on_screen_reticle__(framebuffer, orientation, traffic)
+        dirty_rects = []
+        [dirty_rects.extend(self.__render_on_screen_reticle__(framebuffer, frame_context, traffic))
          for traffic in traffic_reports]
 
         self.task_timer.stop()
 
+        return dirty_rects
+
     def __render_target_reticle__(self, framebuffer, identifier, pos, reticle_lines, roll, reticle_size_px):
         """
         Renders a targetting reticle on the screen.
@@ -89,45 +98,13 @@ class AdsbOnScreenReticles(AdsbElement):
         center_y = int(self.__height__ - border_space) \
             if center_y > (self.__height__ - border_space) else center_y
 
-        pygame.draw.lines(framebuffer,
-                          BLACK, True, reticle_lines, 20)
+        # The rectangle from drawing lines does not include the line width.
+        reticle_rect = pygame.draw.lines(framebuffer,
+                                         BLACK, True, reticle_lines, 20).inflate(20, 20)
         pygame.draw.lines(framebuffer,
                           RED, True, reticle_lines, 10)
 
-    def __rotate_reticle__(self, reticle, roll):
-        """
-        Takes a series of line segments and rotates them (roll) about
-        the screen's center
-
-        Arguments:
-            reticle {list of tuples} -- The line segments
-            roll {float} -- The amount to rotate about the center by.
-
-        Returns:
-            list of lists -- The new list of line segments
-        """
-
-        # Takes the roll in degrees
-        # Example input..
-        # [
-        #     [center_x, center_y - size],
-        #     [center_x + size, center_y],
-        #     [center_x, center_y + size],
-        #     [center_x - size, center_y]
-        # ]
-
-        translated_points = []
-
-        int_roll = int(-roll)
-        cos_roll = COS_RADIANS_BY_DEGREES[int_roll]
-        sin_roll = SIN_RADIANS_BY_DEGREES[int_roll]
-        ox, oy = self.__center__
-
-        translated_points = [[(ox + cos_roll * (x_y[0] - ox) - sin_roll * (x_y[1] - oy)),
-                              (oy + sin_roll * (x_y[0] - ox) + cos_roll * (x_y[1] - oy))]
-                             for x_y in reticle]
-
-        return translated_points
+        return [reticle_rect]
 
 
 if __name__ == '__main__':
@@ -3,9 +3,8 @@ import math
 import pygame
 
 from adsb_element import AdsbElement
-from hud_elements import get_reticle_size, get_heading_bug_x, HudDataCache, imperial_occlude, max_target_bugs
+from hud_elements import HudDataCache, imperial_occlude
 
-import utils
 import testing
 testing.load_imports()
 
@@ -23,57 +22,53 @@ class AdsbTargetBugs(AdsbElement):
         self.__top_border__ = int(self.__height__ * 0.2)
         self.__bottom_border__ = self.__height__ - int(self.__height__ * 0.1)
 
-    def __render_traffic_heading_bug__(self, traffic_report, heading, orientation, framebuffer):
+    def __render_traffic_heading_bug__(self, traffic_report, frame_context, framebuffer):
         """
         Render a single heading bug to the framebuffer.
 
         Arguments:
             traffic_report {Traffic} -- The traffic we want to render a bug for.
-            heading {int} -- Our current heading.
-            orientation {Orientation} -- Our plane's current orientation.
+            frame_context {FrameContext} -- Our heading and orientation for the frame.
             framebuffer {Framebuffer} -- What we are going to draw to.
-        """
 
-        heading_bug_x = get_heading_bug_x(
-            heading, utils.apply_declination(traffic_report.bearing), self.__pixels_per_degree_x__)
+        Returns:
+            list -- The screen rectangles that were drawn to.
+        """
 
-        additional_info_text = self.__get_additional_target_text__(
-            traffic_report, orientation)
+        projection = self.__get_projection__(frame_context, traffic_report)
 
         try:
-            self.__render_info_card__(framebuffer,
-                                      str(traffic_report.get_display_name()),
-                                      additional_info_text,
-                                      heading_bug_x,
-                                      traffic_report.get_age())
+            return self.__render_info_card__(framebuffer,
+                                             str(projection.identifier),
+                                             projection.get_additional_text(),
+                                             projection.bug_x,
+                                             traffic_report.get_age(),
+                                             traffic_report.icao_address)
         except Exception as ex:
             print("EX:{}".format(ex))
-            pass
 
-    def render(self, framebuffer, orientation):
+        return []
+
+    def render(self, framebuffer, frame_context):
         # Render a heading strip along the top
 
         self.task_timer.start()
-        heading = orientation.get_onscreen_projection_heading()
-
-        # Get the traffic, and bail out of we have none
-        traffic_reports = HudDataCache.get_reliable_traffic()
-
-        if traffic_reports is None:
-            self.task_timer.stop()
-            return
-
-        traffic_reports = traffic_reports[:max_target_bugs]
 
         # Draw the heading bugs in reverse order so the traffic closest to
         # us will be the most visible
-        traffic_reports.reverse()
+        traffic_reports = self.__get_reports_to_show__(
+            frame_context,
+            lambda traffic_reports: list(reversed(traffic_reports[:frame_context.max_target_bugs])))
 
-        [self.__render_traffic_heading_bug__(
-            traffic_report, heading, orientation, framebuffer) for traffic_report in traffic_reports]
+        dirty_rects = []
+        [dirty_rects.extend(self.__render_traffic_heading_bug__(
+            traffic_report, frame_context, framebuffer)) for traffic_report in traffic_reports]
+        self.__prune_info_cards__()
 
         self.task_timer.stop()
 
+        return dirty_rects
+
 
 if __name__ == '__main__':
     import hud_elements
@@ -3,9 +3,8 @@ import math
 import pygame
 
 from adsb_element import AdsbElement
-from hud_elements import get_reticle_size, get_heading_bug_x, HudDataCache, max_target_bugs
+from hud_elements import HudDataCache
 
-import utils
 import testing
 import lib.display as display
 testing.load_imports()
@@ -24,55 +23,52 @@ class AdsbTargetBugsOnly(AdsbElement):
         self.__top_border__ = 0
         self.__bottom_border__ = self.__height__ - int(self.__height__ * 0.1)
 
-    def __render_traffic_heading_bug__(self, traffic_report, heading, orientation, framebuffer):
+    def __render_traffic_heading_bug__(self, traffic_report, frame_context, framebuffer):
         """
         Render a single heading bug to the framebuffer.
 
         Arguments:
             traffic_report {Traffic} -- The traffic we want to render a bug for.
-            heading {int} -- Our current heading.
-            orientation {Orientation} -- Our plane's current orientation.
+            frame_context {FrameContext} -- Our heading and orientation for the frame.
             framebuffer {Framebuffer} -- What we are going to draw to.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
         """
 
         # Render using the Above us bug
         # target_bug_scale = 0.04
-        target_bug_scale = get_reticle_size(traffic_report.distance)
-
-        heading_bug_x = get_heading_bug_x(
-            heading, utils.apply_declination(traffic_report.bearing), self.__pixels_per_degree_x__)
+        projection = self.__get_projection__(frame_context, traffic_report)
+        target_bug_scale = projection.reticle_scale
+        heading_bug_x = projection.bug_x
 
         try:
-            is_below = (orientation.alt - 100) > traffic_report.altitude
             reticle, reticle_edge_positon_y = self.get_below_reticle(
-                heading_bug_x, target_bug_scale) if is_below else self.get_above_reticle(heading_bug_x, target_bug_scale)
+                heading_bug_x, target_bug_scale) if projection.is_below else self.get_above_reticle(heading_bug_x, target_bug_scale)
 
             bug_color = display.BLUE if traffic_report.is_on_ground() == True else display.RED
 
-            pygame.draw.polygon(framebuffer, bug_color, reticle)
+            return [pygame.draw.polygon(framebuffer, bug_color, reticle)]
         except:
-            pass
+            return []
 
-    def render(self, framebuffer, orientation):
+    def render(self, framebuffer, frame_context):
         # Render a heading strip along the top
 
         self.task_timer.start()
-        heading = orientation.get_onscreen_projection_heading()
-
-        # Get the traffic, and bail out of we have none
-        traffic_reports = HudDataCache.get_reliable_traffic()
 
-        if traffic_reports is None:
-            self.task_timer.stop()
-            return
+        reports_to_show = self.__get_reports_to_show__(
+            frame_context,
+            lambda traffic_reports: traffic_reports[:frame_context.max_target_bugs])
 
-        reports_to_show = traffic_reports[:max_target_bugs]
-
-        [self.__render_traffic_heading_bug__(
-            traffic_report, heading, orientation, framebuffer) for traffic_report in reports_to_show]
+        dirty_rects = []
+        [dirty_rects.extend(self.__render_traffic_heading_bug__(
+            traffic_report, frame_context, framebuffer)) for traffic_report in reports_to_show]
 
         self.task_timer.stop()
 
+        return dirty_rects
+
 
 if __name__ == '__main__':
     import hud_elements
@@ -1,9 +1,9 @@
 from lib.task_timer import TaskTimer
+import lib.display_list as display_list
 import pygame
 
 from adsb_element import *
 from hud_elements import *
-import utils
 import testing
 testing.load_imports()
 
@@ -44,11 +44,12 @@ class AdsbTrafficListing(AdsbElement):
     def __get_listing__(
         self,
         report,
-        max_string_lengths
+        max_string_lengths,
+        frame_context
     ):
         identifier = report[0]
         try:
-            bearing = str(utils.apply_declination(float(report[1])))
+            bearing = str(frame_context.apply_declination(float(report[1])))
         except:
             bearing = str(report[1])
         distance_text = report[2]
@@ -66,35 +67,40 @@ class AdsbTrafficListing(AdsbElement):
 
     def __get_padded_traffic_reports__(
         self,
-        traffic_reports
+        traffic_reports,
+        frame_context
     ):
         pre_padded_text, max_string_lengths = self.__get_pre_padded_text_reports__(
-            traffic_reports)
+            traffic_reports, frame_context)
 
         out_padded_reports = [self.__get_listing__(report,
-                                                   max_string_lengths) for report in pre_padded_text]
+                                                   max_string_lengths,
+                                                   frame_context) for report in pre_padded_text]
 
         return out_padded_reports
 
     def __get_report_text__(
         self,
-        traffic
+        traffic,
+        frame_context
     ):
         identifier = str(traffic.get_display_name())
         altitude_delta = int(traffic.altitude / 100.0)
-        distance_text = self.__get_distance_string__(traffic.distance, True)
+        distance_text = self.__get_distance_string__(
+            traffic.distance, frame_context.distance_units, True)
         delta_sign = ''
         if altitude_delta > 0:
             delta_sign = '+'
         altitude_text = "{0}{1}".format(delta_sign, altitude_delta)
         bearing_text = "{0:.0f}".format(
-            utils.apply_declination(traffic.bearing))
+            frame_context.apply_declination(traffic.bearing))
 
         return [identifier, bearing_text, distance_text, altitude_text, traffic.icao_address]
 
     def __get_pre_padded_text_reports__(
         self,
-        traffic_reports
+        traffic_reports,
+        frame_context
     ):
         # We do not want to show traffic on the ground.
         reports_to_show = filter(
@@ -105,7 +111,7 @@ class AdsbTrafficListing(AdsbElement):
         reports_to_show = reports_to_show[:self.__max_reports__]
 
         pre_padded_text = [['IDENT', 'BEAR', 'DIST', 'ALT', None]] + \
-            [self.__get_report_text__(traffic) for traffic in reports_to_show]
+            [self.__get_report_text__(traffic, frame_context) for traffic in reports_to_show]
         # An ICAO code is the worst case display length,
         # but add a little buffer so the columns do
         # not shift around.
@@ -124,37 +130,38 @@ class AdsbTrafficListing(AdsbElement):
     def render(
         self,
         framebuffer,
-        orientation
+        frame_context
+    ):
+        return display_list.render_with_display_list(self, framebuffer, frame_context)
+
+    def render_display_list(
+        self,
+        draw_list,
+        frame_context
     ):
         # Render a heading strip along the top
 
         self.task_timer.start()
 
-        # Get the traffic, and bail out of we have none
-        traffic_reports = HudDataCache.get_reliable_traffic()
-
-        if traffic_reports is None:
-            self.task_timer.stop()
-            return
-
         # Render a list of traffic that we have positions
         # for, along with the tail number
 
         y_pos = self.__listing_text_start_y__
         x_pos = self.__listing_text_start_x__
 
-        padded_traffic_reports = self.__get_padded_traffic_reports__(
-            traffic_reports)
+        padded_traffic_reports = self.__get_reports_to_show__(
+            frame_context,
+            lambda traffic_reports: self.__get_padded_traffic_reports__(traffic_reports, frame_context))
 
         if len(padded_traffic_reports) == 0:
-            framebuffer.blit(HudDataCache.get_cached_text_texture("NO TRAFFIC", self.__font__)[0],
-                             (x_pos, y_pos))
+            draw_list.blit(HudDataCache.get_cached_text_texture("NO TRAFFIC", self.__font__)[0],
+                           (x_pos, y_pos))
 
         for identifier, traffic_report in padded_traffic_reports:
             traffic_text_texture = HudDataCache.get_cached_text_texture(traffic_report,
                                                                         self.__font__)[0]
 
-            framebuffer.blit(traffic_text_texture, (x_pos, y_pos))
+            draw_list.blit(traffic_text_texture, (x_pos, y_pos))
 
             y_pos += self.__next_line_distance__
         self.task_timer.stop()
@@ -16,3 +16,15 @@ class AhrsElement(object):
         """
 
         return True
+
+    def render_static(self, framebuffer):
+        """
+        Renders the parts of the element that never change.
+        These are drawn once into the static layer of the view
+        instead of every frame.
+
+        Arguments:
+            framebuffer {Surface} -- The static layer to draw to.
+        """
+
+        pass
@@ -19,19 +19,28 @@ class AhrsNotAvailable(object):
         self.__na_color__ = RED
         self.__na_line_width__ = 20
 
-    def render(self, framebuffer, orientation):
+    def render_static(self, framebuffer):
         """
         Render an "X" over the screen to indicate the AHRS is not
-        available.
+        available. The "X" never changes, so it belongs to the static layer.
+        """
+
+        [pygame.draw.line(framebuffer,
+                          self.__na_color__,
+                          line[0],
+                          line[1],
+                          self.__na_line_width__)
+         for line in self.__not_available_lines__]
+
+    def render(self, framebuffer, orientation):
         """
+        The "X" is entirely static, so nothing is drawn per frame.
 
-        self.task_timer.start()
-        pygame.draw.line(framebuffer, self.__na_color__, self.__not_available_lines__[
-                         0][0], self.__not_available_lines__[0][1], self.__na_line_width__)
-        pygame.draw.line(framebuffer, self.__na_color__, self.__not_available_lines__[
-                         1][0], self.__not_available_lines__[1][1], self.__na_line_width__)
-        self.task_timer.stop()
+        Returns:
+            list -- The screen rectangles that were drawn to.
+        """
 
+        return []
 
 if __name__ == '__main__':
     import hud_elements
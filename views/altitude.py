@@ -2,6 +2,8 @@ from ahrs_element import AhrsElement
 from lib.task_timer import TaskTimer
 from numbers import Number
 import lib.display as display
+import lib.glyph_atlas as glyph_atlas
+import lib.display_list as display_list
 import pygame
 
 import testing
@@ -17,20 +19,36 @@ class Altitude(AhrsElement):
         self.__text_y_pos__ = center_y - text_half_height
         self.__rhs__ = int(framebuffer_size[0])  # was 0.9
 
-    def render(self, framebuffer, orientation):
-        self.task_timer.start()
+    def __get_altitude_text_and_color__(self, orientation):
         is_altitude_valid = orientation.alt is not None and isinstance(orientation.alt, Number)
         altitude_text = str(int(orientation.alt)) + \
             "' MSL" if is_altitude_valid else AhrsElement.INOPERATIVE_TEXT
         color = display.WHITE if is_altitude_valid else display.RED
-        alt_texture = self.__font__.render(
+
+        return altitude_text, color
+
+    def get_render_fingerprint(self, orientation):
+        """
+        The altitude is shown to the foot, so the element only
+        needs to be drawn again when the text changes.
+        """
+
+        return self.__get_altitude_text_and_color__(orientation)
+
+    def render(self, framebuffer, orientation):
+        return display_list.render_with_display_list(self, framebuffer, orientation)
+
+    def render_display_list(self, draw_list, orientation):
+        self.task_timer.start()
+        altitude_text, color = self.__get_altitude_text_and_color__(orientation)
+        alt_texture, alt_size = glyph_atlas.get_text_texture(
             altitude_text,
-            True,
+            self.__font__,
             color,
             display.BLACK)
-        text_width, text_height = alt_texture.get_size()
+        text_width, text_height = alt_size
 
-        framebuffer.blit(
+        draw_list.blit(
             alt_texture, (self.__rhs__ - text_width, self.__text_y_pos__))
         self.task_timer.stop()
 
@@ -3,7 +3,7 @@ import pygame
 import testing
 testing.load_imports()
 
-from hud_elements import COS_RADIANS_BY_DEGREES, SIN_RADIANS_BY_DEGREES, run_ahrs_hud_element
+from hud_elements import COS_RADIANS_BY_DEGREES, SIN_RADIANS_BY_DEGREES, HudDataCache, run_ahrs_hud_element
 from lib.display import WHITE, BLACK, GREEN
 from lib.task_timer import TaskTimer
 from ahrs_element import AhrsElement
@@ -11,49 +11,6 @@ from ahrs_element import AhrsElement
 
 class ArtificialHorizon(AhrsElement):
 
-    def __generate_reference_angle__(self, reference_angle):
-        """
-        Renders the text for the reference angle.
-
-        Arguments:
-            reference_angle {int} -- The angle that we are going to produce text for.
-
-        Returns:
-            (Surface, (int, int)) -- Tuple of the texture and the half size x & y.
-        """
-
-        text = self.__font__.render(str(reference_angle),
-                                    False,
-                                    WHITE,
-                                    BLACK).convert()
-        size_x, size_y = text.get_size()
-
-        return (text, (size_x >> 1, size_y >> 1))
-    
-    def __generate_rotated_reference_angle__(self, reference_angle):
-        """
-        Returns the text for the reference angle rotated.
-
-        Arguments:
-            reference_angle {int} -- The angle marking to generate the textures for.
-
-        Returns:
-            ({int, Surface}, (int, int)) -- A map of the textures keyed by roll angle and the half size of the texture.
-        """
-
-        rotate = pygame.transform.rotate
-        reference_angle, half_size = self.__generate_reference_angle__(
-            reference_angle)
-        rotated_angles = {roll: rotate(reference_angle, roll)
-                          for roll in range(-45, 46, 1)}
-        
-        # Make sure that the un-rolled version is the original
-        # so as to not have any artifacts for later rotations
-        # that get added.
-        rotated_angles[0] = reference_angle
-
-        return rotated_angles, half_size
-
     def __init__(self, degrees_of_pitch, pixels_per_degree_y, font, framebuffer_size):
         self.task_timer = TaskTimer('ArtificialHorizon')
         self.__framebuffer_size__ = framebuffer_size
@@ -65,10 +22,16 @@ class ArtificialHorizon(AhrsElement):
         self.__font__ = font
 
         self.__reference_angles__ = range(-degrees_of_pitch, degrees_of_pitch + 1, 10)
-        self.__pitch_elements__ = {reference_angle: self.__generate_rotated_reference_angle__(reference_angle)
-                                   for reference_angle in self.__reference_angles__}
-
-    def __render_reference_line__(self, framebuffer, line_info, draw_line, roll):
+        # The reference angles are rotated as they are
+        # needed, and kept in the shared rotated text cache.
+        self.__reference_angle_text__ = {reference_angle: str(reference_angle)
+                                         for reference_angle in self.__reference_angles__}
+        # How many lines out from the horizon each line is,
+        # so that labels can be dropped evenly on both sides.
+        self.__reference_line_index__ = {reference_angle: abs(reference_angle) // 10
+                                         for reference_angle in self.__reference_angles__}
+
+    def __render_reference_line__(self, framebuffer, line_info, draw_line, roll, pitch_label_interval):
         """
         Renders a single line of the AH ladder.
 
@@ -78,27 +41,34 @@ class ArtificialHorizon(AhrsElement):
             draw_line {function} -- The function to draw the line.
             rot_text {function} -- The function to rotate the text.
             roll {float} -- How much the plane is rolled.
+            pitch_label_interval {int} -- Only every this many lines are labeled.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
         """
 
         line_coords, line_center, reference_angle = line_info
-        draw_line(framebuffer, GREEN, False, line_coords, 4)
-
-        text, half_size = self.__pitch_elements__[reference_angle]
-        roll = int(roll)
-        # Since we will start with a limited number of pre-cached
-        # pre-rotated textures (to improve boot time),
-        # add any missing rotated textures using the upright
-        # as the base.
-        if roll not in text:
-            rotated_surface = pygame.transform.rotate(text[0], roll)
-            self.__pitch_elements__[reference_angle][0][roll] = rotated_surface
-            text[roll] = rotated_surface
-
-        text = text[roll]
-        half_x, half_y = half_size
+        # The rectangle from drawing lines does not include the line width.
+        line_rect = draw_line(framebuffer, GREEN, False,
+                              line_coords, 4).inflate(4, 4)
+
+        # The lines are always drawn. Only the labels are given up for detail.
+        if self.__reference_line_index__[reference_angle] % pitch_label_interval != 0:
+            return [line_rect]
+
+        text = HudDataCache.ROTATED_TEXT_CACHE.get_rotated_text(
+            self.__reference_angle_text__[reference_angle],
+            self.__font__,
+            WHITE,
+            roll,
+            BLACK,
+            False)
+        text_width, text_height = text.get_size()
+        half_x, half_y = text_width >> 1, text_height >> 1
         center_x, center_y = line_center
 
-        framebuffer.blit(text, (center_x - half_x, center_y - half_y))
+        return [line_rect,
+                framebuffer.blit(text, (center_x - half_x, center_y - half_y))]
 
     def render(self, framebuffer, orientation):
         """
@@ -107,6 +77,9 @@ class ArtificialHorizon(AhrsElement):
         Arguments:
             framebuffer {Surface} -- Target framebuffer to draw to.
             orientation {orientation} -- The airplane's orientation (roll & pitch)
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
         """
 
         self.task_timer.start()
@@ -115,6 +88,7 @@ class ArtificialHorizon(AhrsElement):
         draw_line = pygame.draw.lines
         pitch = orientation.pitch
         roll = orientation.roll
+        pitch_label_interval = orientation.detail.pitch_label_interval
 
         # Calculating the coordinates ahead of time...
         lines_centers_and_angles = [self.__get_line_coords__(
@@ -126,11 +100,14 @@ class ArtificialHorizon(AhrsElement):
             lambda center:
             center[1][1] >= 0 and center[1][1] <= self.__height__, lines_centers_and_angles)
 
-        [self.__render_reference_line__(framebuffer, line_info, draw_line, roll)
+        dirty_rects = []
+        [dirty_rects.extend(self.__render_reference_line__(framebuffer, line_info, draw_line, roll, pitch_label_interval))
             for line_info in lines_centers_and_angles]
 
         self.task_timer.stop()
 
+        return dirty_rects
+
     def __get_line_coords__(self, pitch, roll, reference_angle):
         """
         Get the coordinate for the lines for a given pitch and roll.
@@ -47,22 +47,25 @@ class CompassAndHeadingBottomElement(CompassAndHeadingTopElement):
              self._heading_box_y_ + border_vertical_size + vertical_alignment_offset]]
 
     def __render_heading_mark__(self, framebuffer, x_pos, heading):
-        pygame.draw.line(
+        mark_rect = pygame.draw.line(
             framebuffer,
             GREEN,
             [x_pos, self.__line_top__],
             [x_pos, self.__line_bottom__],
-            self.__border_width__)
+            self.__border_width__).inflate(self.__border_width__, self.__border_width__)
 
-        self.__render_heading_text__(
+        return [mark_rect] + self.__render_heading_text__(
             framebuffer,
             heading,
             x_pos,
             self.compass_text_y)
 
-    def render(self, framebuffer, orientation):
+    def render(self, framebuffer, frame_context):
         """
         Renders the current heading to the HUD.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
         """
 
         self.task_timer.start()
@@ -70,7 +73,8 @@ class CompassAndHeadingBottomElement(CompassAndHeadingTopElement):
         # Render a crude compass
         # Render a heading strip along the top
 
-        heading = orientation.get_onscreen_projection_heading()
+        heading = frame_context.heading
+        dirty_rects = []
 
         if isinstance(heading, Number):
             if heading < 0:
@@ -79,15 +83,17 @@ class CompassAndHeadingBottomElement(CompassAndHeadingTopElement):
             if heading > 360:
                 heading -= 360
 
-            [self.__render_heading_mark__(framebuffer, heading_mark_to_render[0], heading_mark_to_render[1])
+            [dirty_rects.extend(self.__render_heading_mark__(framebuffer, heading_mark_to_render[0], heading_mark_to_render[1]))
              for heading_mark_to_render in self.__heading_strip__[heading]]
 
-        self._render_hallow_heading_box_(
-            orientation,
+        dirty_rects.extend(self._render_hallow_heading_box_(
+            frame_context,
             framebuffer,
-            self._heading_box_y_)
+            self._heading_box_y_))
         self.task_timer.stop()
 
+        return dirty_rects
+
 
 if __name__ == '__main__':
     import hud_elements
@@ -3,11 +3,17 @@ from ahrs_element import AhrsElement
 from lib.task_timer import TaskTimer
 import hud_elements
 import lib.display as display
+import lib.glyph_atlas as glyph_atlas
+import lib.texture_disk_cache as texture_disk_cache
 import pygame
-import utils
 import testing
 testing.load_imports()
 
+# The heading strips only depend on the screen size, so the
+# top and bottom compass share them instead of each building 361.
+# Keyed by the screen size.
+__HEADING_STRIPS__ = {}
+
 
 class CompassAndHeadingTopElement(AhrsElement):
     def __init__(self, degrees_of_pitch, pixels_per_degree_y, font, framebuffer_size):
@@ -27,10 +33,16 @@ class CompassAndHeadingTopElement(AhrsElement):
             framebuffer_size[1] * cardinal_direction_line_proportion)
         self.__font__ = font
 
+        headings = range(-1, 361)
+        heading_textures = texture_disk_cache.get_text_textures('heading_text',
+                                                                self.__font__,
+                                                                [str(heading)
+                                                                 for heading in headings],
+                                                                display.BLACK,
+                                                                display.YELLOW,
+                                                                framebuffer_size)
         self.__heading_text__ = {}
-        for heading in range(-1, 361):
-            texture = self.__font__.render(
-                str(heading), True, display.BLACK, display.YELLOW).convert()
+        for heading, texture in zip(headings, heading_textures):
             width, height = texture.get_size()
             self.__heading_text__[heading] = texture, (width >> 1, height >> 1)
 
@@ -55,11 +67,13 @@ class CompassAndHeadingTopElement(AhrsElement):
             self.__heading_strip_offset__[heading] = int(
                 self.pixels_per_degree_x * heading)
 
-        self.__heading_strip__ = {}
+        strips_key = tuple(framebuffer_size)
+
+        if strips_key not in __HEADING_STRIPS__:
+            __HEADING_STRIPS__[strips_key] = {heading: self.__generate_heading_strip__(heading)
+                                              for heading in range(0, 361)}
 
-        for heading in range(0, 361):
-            self.__heading_strip__[
-                heading] = self.__generate_heading_strip__(heading)
+        self.__heading_strip__ = __HEADING_STRIPS__[strips_key]
 
         self.__render_heading_mark_timer__ = TaskTimer("HeadingRender")
 
@@ -92,19 +106,23 @@ class CompassAndHeadingTopElement(AhrsElement):
 
         return things_to_render
 
-    def __render_heading_mark__(self, framebuffer, x_pos, heading):
-        pygame.draw.line(framebuffer, display.GREEN,
-                         [x_pos, self.line_height], [x_pos, 0], 4)
+    def __render_heading_mark__(self, framebuffer, frame_context, x_pos, heading):
+        # The rectangle from drawing lines does not include the line width.
+        mark_rect = pygame.draw.line(framebuffer, display.GREEN,
+                                     [x_pos, self.line_height], [x_pos, 0], 4).inflate(4, 4)
 
-        self.__render_heading_text__(
+        return [mark_rect] + self.__render_heading_text__(
             framebuffer,
-            utils.apply_declination(heading),
+            frame_context.apply_declination(heading),
             x_pos,
             self.compass_text_y)
 
-    def render(self, framebuffer, orientation):
+    def render(self, framebuffer, frame_context):
         """
         Renders the current heading to the HUD.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
         """
 
         self.task_timer.start()
@@ -112,46 +130,62 @@ class CompassAndHeadingTopElement(AhrsElement):
         # Render a crude compass
         # Render a heading strip along the top
 
-        heading = orientation.get_onscreen_projection_heading()
+        heading = frame_context.heading
+        dirty_rects = []
 
-        [self.__render_heading_mark__(framebuffer, heading_mark_to_render[0], heading_mark_to_render[1])
+        [dirty_rects.extend(self.__render_heading_mark__(framebuffer, frame_context, heading_mark_to_render[0], heading_mark_to_render[1]))
          for heading_mark_to_render in self.__heading_strip__[heading]]
 
         # Render the text that is showing our AHRS and GPS headings
         heading_y_pos = self.__font__.get_height() << 1
-        self._render_hallow_heading_box_(orientation,
-                                         framebuffer,
-                                         heading_y_pos)
+        dirty_rects.extend(self._render_hallow_heading_box_(frame_context,
+                                                            framebuffer,
+                                                            heading_y_pos))
         self.task_timer.stop()
 
-    def _render_hallow_heading_box_(self, orientation, framebuffer, heading_y_pos):
+        return dirty_rects
+
+    def render_static(self, framebuffer):
+        """
+        Renders the outline of the heading box.
+        The outline never moves, so it belongs to the static layer.
+        """
+
+        pygame.draw.lines(framebuffer, display.GREEN, True,
+                          self.__heading_text_box_lines__, 2)
+
+    def _render_hallow_heading_box_(self, frame_context, framebuffer, heading_y_pos):
         heading_text = "{0} | {1}".format(
-            str(utils.apply_declination(
-                orientation.get_onscreen_projection_display_heading())).rjust(3),
-            str(utils.apply_declination(
-                orientation.get_onscreen_gps_heading())).rjust(3))
+            str(frame_context.apply_declination(
+                frame_context.get_onscreen_projection_display_heading())).rjust(3),
+            str(frame_context.apply_declination(
+                frame_context.get_onscreen_gps_heading())).rjust(3))
 
-        rendered_text = self.__font__.render(
-            heading_text, True, display.GREEN)
-        text_width, text_height = rendered_text.get_size()
+        rendered_text, text_size = glyph_atlas.get_text_texture(
+            heading_text, self.__font__, display.GREEN)
+        text_width, text_height = text_size
 
-        framebuffer.blit(
+        text_rect = framebuffer.blit(
             rendered_text, (self.__center_x__ - (text_width >> 1), heading_y_pos))
 
-        pygame.draw.lines(framebuffer, display.GREEN, True,
-                          self.__heading_text_box_lines__, 2)
+        return [text_rect]
 
     def __render_heading_text__(self, framebuffer, heading, position_x, position_y):
         """
         Renders the text with the results centered on the given
         position.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
         """
         if isinstance(heading, Number):
             heading = int(heading)
             rendered_text, half_size = self.__heading_text__[heading]
 
-            framebuffer.blit(
-                rendered_text, (position_x - half_size[0], position_y - half_size[1]))
+            return [framebuffer.blit(
+                rendered_text, (position_x - half_size[0], position_y - half_size[1]))]
+
+        return []
 
 
 if __name__ == '__main__':
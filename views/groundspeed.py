@@ -1,8 +1,9 @@
-import configuration
 from ahrs_element import AhrsElement
 import units
 from lib.task_timer import TaskTimer
 import lib.display as display
+import lib.glyph_atlas as glyph_atlas
+import lib.display_list as display_list
 from numbers import Number
 import pygame
 
@@ -28,32 +29,29 @@ class Groundspeed(AhrsElement):
 
         self.__left_x__ = 0  # WAS int(framebuffer_size[0] * 0.01)
 
-    def render(
-        self,
-        framebuffer,
-        orientation
-    ):
-        self.task_timer.start()
+    def __get_speed_texts_and_colors__(self, frame_context):
+        """
+        Returns the groundspeed text and color, then the airspeed
+        text and color. The airspeed text is None when there is no airspeed.
+        """
 
-        speed_units = configuration.CONFIGURATION.__get_config_value__(
-            configuration.Configuration.DISTANCE_UNITS_KEY,
-            units.STATUTE)
+        speed_units = frame_context.distance_units
         
         airspeed_text = None
-        is_valid_airspeed = orientation.is_avionics_source and isinstance(orientation.airspeed, Number)
-        is_valid_groundspeed = orientation.groundspeed is not None and isinstance(orientation.groundspeed, Number)
+        is_valid_airspeed = frame_context.is_avionics_source and isinstance(frame_context.airspeed, Number)
+        is_valid_groundspeed = frame_context.groundspeed is not None and isinstance(frame_context.groundspeed, Number)
         
         airspeed_text = units.get_converted_units_string(
             speed_units,
-            orientation.airspeed * units.feet_to_nm,
+            frame_context.airspeed * units.feet_to_nm,
             unit_type=units.SPEED,
             decimal_places=False) if is_valid_airspeed else None
 
         groundspeed_text = units.get_converted_units_string(
             speed_units,
-            (orientation.groundspeed * units.yards_to_nm),
+            (frame_context.groundspeed * units.yards_to_nm),
             unit_type=units.SPEED,
-            decimal_places=False) if is_valid_groundspeed else orientation.groundspeed
+            decimal_places=False) if is_valid_groundspeed else frame_context.groundspeed
         
         groundspeed_text += " GND"
         
@@ -65,31 +63,58 @@ class Groundspeed(AhrsElement):
             airspeed_text = airspeed_text.rjust(max_len)
             groundspeed_text = groundspeed_text.rjust(max_len)
 
-        gs_display_color = display.WHITE if is_valid_groundspeed and orientation.gps_online else display.RED
+        gs_display_color = display.WHITE if is_valid_groundspeed and frame_context.gps_online else display.RED
         airspeed_color = display.WHITE if is_valid_airspeed else display.RED
 
-        ias_texture = self.__font__.render(
+        return groundspeed_text, gs_display_color, airspeed_text, airspeed_color
+
+    def get_render_fingerprint(self, frame_context):
+        """
+        The speeds are shown to the whole unit, so the element only
+        needs to be drawn again when the text or colors change.
+        """
+
+        return self.__get_speed_texts_and_colors__(frame_context)
+
+    def render(
+        self,
+        framebuffer,
+        frame_context
+    ):
+        return display_list.render_with_display_list(self, framebuffer, frame_context)
+
+    def render_display_list(
+        self,
+        draw_list,
+        frame_context
+    ):
+        self.task_timer.start()
+
+        groundspeed_text, gs_display_color, airspeed_text, airspeed_color = \
+            self.__get_speed_texts_and_colors__(frame_context)
+
+        ias_texture = glyph_atlas.get_text_texture(
             airspeed_text,
-            True,
+            self.__font__,
             airspeed_color,
-            display.BLACK) if airspeed_text is not None else None
+            display.BLACK)[0] if airspeed_text is not None else None
 
-        gs_texture = self.__font__.render(
+        gs_texture = glyph_atlas.get_text_texture(
             groundspeed_text,
-            True,
+            self.__font__,
             gs_display_color,
-            display.BLACK)
+            display.BLACK)[0]
 
         gs_position_adj = self.__font_height__ if ias_texture is not None else 0
 
-        framebuffer.blit(
+        draw_list.blit(
             gs_texture,
             (self.__left_x__, self.__text_y_pos__ + gs_position_adj))
         
         if ias_texture is not None:
-            framebuffer.blit(
-            ias_texture,
-            (self.__left_x__, self.__text_y_pos__))
+            draw_list.blit(
+                ias_texture,
+                (self.__left_x__, self.__text_y_pos__))
 
         self.task_timer.stop()
 
@@ -14,7 +14,6 @@ from adsb_element import AdsbElement
 from hud_elements import HudDataCache, get_reticle_size, get_heading_bug_x
 from adsb_target_bugs import AdsbTargetBugs
 import hud_elements
-import utils
 import testing
 
 testing.load_imports()
@@ -46,10 +45,13 @@ class HeadingTargetBugs(AdsbTargetBugs):
         self.__top_border__ = int(self.__height__ * 0.2)
         self.__bottom_border__ = self.__height__ - int(self.__height__ * 0.1)
 
-    def __get_additional_target_text__(self, time_until_drop=0.0, altitude=None, distance=0.0):
+    def __get_additional_target_text__(self, display_units, time_until_drop=0.0, altitude=None, distance=0.0):
         """
         Returns a tuple of text to be rendered with the target card.
 
+        Arguments:
+            display_units {string} -- The units configured by the user.
+
         Keyword Arguments:
             time_until_drop {float} -- The number of seconds until the flour bomb should be dropped. (default: {0.0})
             altitude_delta {float} -- The number of feet above the target. (default: {0.0})
@@ -59,7 +61,7 @@ class HeadingTargetBugs(AdsbTargetBugs):
             string[] -- Tuple of strings.
         """
 
-        distance_text = self.__get_distance_string__(distance)
+        distance_text = self.__get_distance_string__(distance, display_units)
         altitude_text = "{0:.1f}AGL".format(altitude)
 
         if time_until_drop < 60:
@@ -69,21 +71,24 @@ class HeadingTargetBugs(AdsbTargetBugs):
 
         return [altitude_text, distance_text, time_until_drop]
 
-    def render(self, framebuffer, orientation):
+    def render(self, framebuffer, frame_context):
         # Render a heading strip along the top
 
         self.task_timer.start()
-        heading = orientation.get_onscreen_projection_heading()
+        heading = frame_context.heading
 
         # Get the traffic, and bail out of we have none
         if targets.TARGET_MANAGER is None or targets.TARGET_MANAGER.targets is None:
-            return
+            self.task_timer.stop()
+            return []
+
+        dirty_rects = []
 
         for target_position in targets.TARGET_MANAGER.targets:
             ground_speed_ms = units.get_meters_per_second_from_mph(
-                orientation.groundspeed)
+                frame_context.groundspeed)
             distance_miles = norden.get_distance(
-                orientation.position,
+                frame_context.position,
                 target_position)
             distance_meters = units.get_meters_from_statute_miles(
                 distance_miles)
@@ -93,14 +98,14 @@ class HeadingTargetBugs(AdsbTargetBugs):
             # Remember that the altitude off the AHRS is
             # in terms of MSL. That means that we need to
             # subtract out the altitude of the target.
-            delta_altitude = orientation.alt - target_position[2]
+            delta_altitude = frame_context.alt - target_position[2]
             time_to_impact = norden.get_time_to_impact(
                 units.get_meters_from_feet(delta_altitude))
             time_until_drop = time_to_target - time_to_impact
             # target_altitude_for_drop = units.get_feet_from_meters(
             #     norden.get_altitude(time_to_target))
             bearing_to_target = norden.get_bearing(
-                target_position, orientation.position)
+                target_position, frame_context.position)
             # time_to_impact_from_ideal_current_altitude = norden.get_time_to_impact(
             #    target_altitude_for_drop)
 
@@ -112,14 +117,17 @@ class HeadingTargetBugs(AdsbTargetBugs):
                 heading, bearing_to_target, self.__pixels_per_degree_x__)
 
             additional_info_text = self.__get_additional_target_text__(
-                time_until_drop, delta_altitude, units.get_yards_from_miles(distance_miles))
-
-            self.__render_info_card__(framebuffer,
-                                      "{0:.1f}".format(
-                                          utils.apply_declination(bearing_to_target)),
-                                      additional_info_text,
-                                      heading_bug_x,
-                                      False)
+                frame_context.distance_units,
+                time_until_drop,
+                delta_altitude,
+                units.get_yards_from_miles(distance_miles))
+
+            dirty_rects.extend(self.__render_info_card__(framebuffer,
+                                                         "{0:.1f}".format(
+                                                             frame_context.apply_declination(bearing_to_target)),
+                                                         additional_info_text,
+                                                         heading_bug_x,
+                                                         False))
 
             as_traffic = HeadingAsTrafficObject(target_position[2],
                                                 units.get_yards_from_miles(
@@ -129,15 +137,18 @@ class HeadingTargetBugs(AdsbTargetBugs):
             target_bug_scale = get_reticle_size(as_traffic.distance)
 
             heading_bug_x = get_heading_bug_x(
-                heading, utils.apply_declination(as_traffic.bearing), self.__pixels_per_degree_x__)
+                heading, frame_context.apply_declination(as_traffic.bearing), self.__pixels_per_degree_x__)
 
             reticle, reticle_edge_positon_y = self.get_below_reticle(
                 heading_bug_x, target_bug_scale)
 
-            pygame.draw.polygon(framebuffer, BLUE, reticle)
+            dirty_rects.append(pygame.draw.polygon(framebuffer, BLUE, reticle))
 
+        self.__prune_info_cards__()
         self.task_timer.stop()
 
+        return dirty_rects
+
 
 if __name__ == '__main__':
     import hud_elements
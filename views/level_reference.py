@@ -28,15 +28,24 @@ class LevelReference(AhrsElement):
         self.level_reference_lines.append(left_hash)
         self.level_reference_lines.append(right_hash)
 
-    def render(self, framebuffer, orientation):
+    def render_static(self, framebuffer):
         """
-        Renders a "straight and level" line to the HUD.
+        Renders a "straight and level" line to the static layer of the HUD.
         """
 
-        self.task_timer.start()
         [pygame.draw.lines(framebuffer, WHITE, False, line, 6)
          for line in self.level_reference_lines]
-        self.task_timer.stop()
+
+    def render(self, framebuffer, orientation):
+        """
+        The level reference is entirely static, so
+        nothing is drawn per frame.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
+        """
+
+        return []
 
 
 if __name__ == '__main__':
@@ -1,6 +1,7 @@
 from ahrs_element import AhrsElement
 from lib.task_timer import TaskTimer
 import lib.display as display
+import lib.glyph_atlas as glyph_atlas
 import math
 
 import pygame
@@ -15,20 +16,12 @@ TWO_PI = 2.0 * math.pi
 class RollIndicatorText(AhrsElement):
     def __init__(self, degrees_of_pitch, pixels_per_degree_y, font, framebuffer_size):
         self.task_timer = TaskTimer('RollIndicatorText')
-        self.__roll_elements__ = {}
         self.__framebuffer_size__ = framebuffer_size
         self.__center__ = (framebuffer_size[0] >> 1, framebuffer_size[1] >> 1)
         half_texture_height = int(font.get_height()) >> 1
         self.__font__ = font
         self.__text_y_pos__ = self.__center__[1] - half_texture_height
 
-        for reference_angle in range(-180, 181):
-            text = font.render(
-                "{0:3}".format(int(math.fabs(reference_angle))), True, display.WHITE, display.BLACK)
-            size_x, size_y = text.get_size()
-            self.__roll_elements__[reference_angle] = (
-                text, (size_x >> 1, size_y >> 1))
-
     def render(self, framebuffer, orientation):
         self.task_timer.start()
         roll = int(orientation.roll)
@@ -38,15 +31,16 @@ class RollIndicatorText(AhrsElement):
             pitch_direction = '+'
         attitude_text = "{0}{1:3} | {2:3}".format(pitch_direction, pitch, roll)
 
-        roll_texture = self.__font__.render(
-            attitude_text, True, display.BLACK, display.WHITE)
-        texture_size = roll_texture.get_size()
+        roll_texture, texture_size = glyph_atlas.get_text_texture(
+            attitude_text, self.__font__, display.BLACK, display.WHITE)
         text_half_width, text_half_height = texture_size
         text_half_width = int(text_half_width / 2)
-        framebuffer.blit(
+        dirty_rect = framebuffer.blit(
             roll_texture, (self.__center__[0] - text_half_width, self.__text_y_pos__))
         self.task_timer.stop()
 
+        return [dirty_rect]
+
 
 def wrap_angle(angle):
     """
@@ -102,10 +96,11 @@ class RollIndicator(AhrsElement):
             self.reference_line_size/2), self.arc_box[2], self.arc_box[3] - (self.reference_line_size/2)]
         self.half_pi = math.pi / 2.0
 
-    def render(self, framebuffer, orientation):
-        self.task_timer.start()
-
-        roll_in_radians = math.radians(orientation.roll)
+    def render_static(self, framebuffer):
+        """
+        Renders the reference arc and the reference angles.
+        These never move, so they belong to the static layer.
+        """
 
         # Draws the reference arc
         pygame.draw.arc(framebuffer,
@@ -135,16 +130,29 @@ class RollIndicator(AhrsElement):
                             reference_roll_in_radians + self.roll_indicator_arc_radians,
                             self.reference_line_size)
 
+    def render(self, framebuffer, orientation):
+        """
+        Renders the current roll onto the reference arc.
+
+        Returns:
+            list -- The screen rectangles that were drawn to.
+        """
+
+        self.task_timer.start()
+
+        roll_in_radians = math.radians(orientation.roll)
+
         # Draws the current roll
-        pygame.draw.arc(framebuffer,
-                        display.YELLOW,
-                        self.arc_box,
-                        self.half_pi - roll_in_radians - self.roll_indicator_arc_radians,
-                        self.half_pi - roll_in_radians + self.roll_indicator_arc_radians,
-                        self.reference_line_size * 2)
+        dirty_rects = [pygame.draw.arc(framebuffer,
+                                       display.YELLOW,
+                                       self.arc_box,
+                                       self.half_pi - roll_in_radians - self.roll_indicator_arc_radians,
+                                       self.half_pi - roll_in_radians + self.roll_indicator_arc_radians,
+                                       self.reference_line_size * 2)]
 
         self.task_timer.stop()
 
+        return dirty_rects
 
 if __name__ == '__main__':
     import hud_elements
@@ -30,11 +30,13 @@ class SkidAndGs(AhrsElement):
             display.BLACK)
         text_width, text_height = texture.get_size()
 
-        framebuffer.blit(
+        dirty_rect = framebuffer.blit(
             texture,
             (self.__rhs__ - text_width, self.__text_y_pos__))
         self.task_timer.stop()
 
+        return [dirty_rect]
+
 
 if __name__ == '__main__':
     import hud_elements
@@ -6,11 +6,16 @@ import units
 import lib.local_debug as local_debug
 import lib.colors as colors
 from lib.task_timer import TaskTimer
+import lib.glyph_atlas as glyph_atlas
+import lib.display_list as display_list
+import lib.thermal_governor as thermal_governor
 from lib.display import *
 import pygame
 import socket
 import datetime
 import math
+import os
+import timeit
 from aithre import AithreClient
 
 import struct
@@ -32,6 +37,11 @@ OFFLINE_TEXT= "Offline"
 DISCONNECTED_TEXT = "DISCONNECTED"
 DISABLED_TEXT = "DISABLED"
 
+# How often the slow lookups are repeated. Counted in time, not in
+# renders, since the element is not rendered every frame.
+IP_ADDRESS_UPDATE_SECONDS = 2.0
+CPU_TEMP_UPDATE_SECONDS = 1.0
+
 
 def get_ip_address():
     """
@@ -75,23 +85,58 @@ def get_cpu_temp():
         string -- The CPU temp to display
     """
 
-    color = GREEN
-
-    try:
-        if local_debug.IS_LINUX:
-            linux_cpu_temp = open('/sys/class/thermal/thermal_zone0/temp')
-            temp = float(linux_cpu_temp.read())
-            temp = temp/1000
+    if local_debug.IS_LINUX:
+        temp = thermal_governor.read_cpu_temperature()
 
+        if temp is not None:
             color = get_cpu_temp_text_color(temp)
 
             return ("{0}C".format(int(math.floor(temp))), color)
-    except:
-        return ('---', GRAY)
 
     return ('---', GRAY)
 
 
+def get_thermal_state():
+    """
+    Gets what the thermal governor is giving up to keep the SoC cool.
+
+    Returns:
+        tuple -- The thermal state to display, and its color.
+    """
+
+    governor = thermal_governor.THERMAL_GOVERNOR
+
+    if governor.state is thermal_governor.THERMAL_STATES[0]:
+        return (governor.to_string(), GREEN)
+
+    if governor.temperature is None:
+        return (governor.to_string(), YELLOW)
+
+    return (governor.to_string(), get_cpu_temp_text_color(governor.temperature))
+
+
+def get_cpu_use(last_sample):
+    """
+    Gets how much of a core the HUD has used since the last sample.
+
+    Arguments:
+        last_sample {tuple} -- The wall clock and CPU seconds from the last call. None if there was no last call.
+
+    Returns:
+        tuple -- The CPU use to display, and the sample to pass to the next call.
+    """
+
+    process_times = os.times()
+    sample = (timeit.default_timer(), process_times[0] + process_times[1])
+
+    if last_sample is None or sample[0] <= last_sample[0]:
+        return ('---', GRAY), sample
+
+    cpu_percent = 100.0 * (sample[1] - last_sample[1]) / (sample[0] - last_sample[0])
+
+    return ("{0}%".format(int(round(cpu_percent))), BLUE), sample
+
+
 def get_illyrian_spo2_color(spo2_level):
     """
     Gets the color for the SPO2 level
@@ -171,10 +216,12 @@ class SystemInfo(AhrsElement):
 
         self.__left_x__ = int(framebuffer_size[0] * 0.01)
         self.__center_x__ = framebuffer_size[0] >> 1
-        self.__update_ip_timer__ = 0
-        self.__update_temp_timer__ = 0
+        self.__next_ip_update__ = 0.0
+        self.__next_temp_update__ = 0.0
         self.__ip_address__ = get_ip_address()
         self.__cpu_temp__ = None
+        self.__cpu_use__ = ('---', GRAY)
+        self.__last_cpu_sample__ = None
         self.__framebuffer_size__ = framebuffer_size
         self.__line_spacing__ = 1.01
 
@@ -220,17 +267,22 @@ class SystemInfo(AhrsElement):
         return ('{} {}'.format(co_text, battery_text), color)
 
     def render(self, framebuffer, orientation):
+        return display_list.render_with_display_list(self, framebuffer, orientation)
+
+    def render_display_list(self, draw_list, orientation):
         self.task_timer.start()
 
-        self.__update_ip_timer__ -= 1
-        if self.__update_ip_timer__ <= 0:
+        now = timeit.default_timer()
+
+        if now >= self.__next_ip_update__:
             self.__ip_address__ = get_ip_address()
-            self.__update_ip_timer__ = 120
+            self.__next_ip_update__ = now + IP_ADDRESS_UPDATE_SECONDS
 
-        self.__update_temp_timer__ -= 1
-        if self.__update_temp_timer__ <= 0:
+        if now >= self.__next_temp_update__:
             self.__cpu_temp__ = get_cpu_temp()
-            self.__update_temp_timer__ = 60
+            self.__cpu_use__, self.__last_cpu_sample__ = get_cpu_use(
+                self.__last_cpu_sample__)
+            self.__next_temp_update__ = now + CPU_TEMP_UPDATE_SECONDS
 
         info_lines = [["VERSION     : ", [configuration.VERSION, YELLOW]],
                       ["DECLINATION : ", [
@@ -248,7 +300,9 @@ class SystemInfo(AhrsElement):
         # Status lines are pushed in as a stack.
         # First line in the array is at the bottom.
         # Last line in the array is towards the top.
+        info_lines.append(["HUD CPU USE : ", self.__cpu_use__])
         info_lines.append(["HUD CPU     : ", self.__cpu_temp__])
+        info_lines.append(["THERMAL     : ", get_thermal_state()])
         info_lines.append(["DISPLAY RES : ", ["{} x {}".format(
             self.__framebuffer_size__[0], self.__framebuffer_size__[1]), BLUE]])
 
@@ -256,14 +310,14 @@ class SystemInfo(AhrsElement):
 
         for line in info_lines:
             # Draw the label in a standard color.
-            texture_lhs = self.__font__.render(line[0], True, BLUE, BLACK)
-            framebuffer.blit(texture_lhs, (0, render_y))
-            size = texture_lhs.get_size()
+            texture_lhs, size = glyph_atlas.get_text_texture(
+                line[0], self.__font__, BLUE, BLACK)
+            draw_list.blit(texture_lhs, (0, render_y))
 
             # Draw the value in the encoded colors.
-            texture_rhs = self.__font__.render(
-                line[1][0], True, line[1][1], BLACK)
-            framebuffer.blit(texture_rhs, (size[0], render_y))
+            texture_rhs, size_rhs = glyph_atlas.get_text_texture(
+                line[1][0], self.__font__, line[1][1], BLACK)
+            draw_list.blit(texture_rhs, (size[0], render_y))
 
             render_y = render_y - (self.font_height * self.__line_spacing__)
 
@@ -289,27 +343,47 @@ class Aithre(AhrsElement):
         self.__text_y_pos__ = center_y + (10 * text_half_height)
         self.__lhs__ = 0
 
+    def __get_co_text_and_color__(self):
+        """
+        Returns the CO text and color, or None if there is nothing to show.
+        """
+
+        if AithreClient.INSTANCE is None or not configuration.CONFIGURATION.aithre_enabled:
+            return None
+
+        co_level = AithreClient.INSTANCE.get_co_report()
+
+        if (co_level.co is None and co_level.has_been_connected) or isinstance(co_level, basestring):
+            return "OFFLINE", RED
+
+        if not co_level.has_been_connected:
+            return None
+
+        units_text = "PPM" if co_level.is_connected else ""
+
+        return "{}{}".format(co_level.co, units_text), get_aithre_co_color(co_level.co)
+
+    def get_render_fingerprint(self, orientation):
+        """
+        The element only needs to be drawn again when the reading changes.
+        """
+
+        return (self.__get_co_text_and_color__(),)
+
     def render(self, framebuffer, orientation):
-        self.task_timer.start()
+        return display_list.render_with_display_list(self, framebuffer, orientation)
 
-        if AithreClient.INSTANCE is not None and configuration.CONFIGURATION.aithre_enabled:
-            co_level = AithreClient.INSTANCE.get_co_report()
+    def render_display_list(self, draw_list, orientation):
+        self.task_timer.start()
 
-            if (co_level.co is None and co_level.has_been_connected) or isinstance(co_level, basestring):
-                co_color = RED
-                co_ppm_text = "OFFLINE"
-            elif not co_level.has_been_connected:
-                self.task_timer.stop()
-                return
-            else:
-                co_color = get_aithre_co_color(co_level.co)
-                units_text = "PPM" if co_level.is_connected else ""
-                co_ppm_text = "{}{}".format(co_level.co, units_text)
+        co_text_and_color = self.__get_co_text_and_color__()
 
-            co_ppm_texture = self.__font__.render(
-                co_ppm_text, True, co_color, BLACK)
+        if co_text_and_color is not None:
+            co_ppm_text, co_color = co_text_and_color
+            co_ppm_texture, co_ppm_size = glyph_atlas.get_text_texture(
+                co_ppm_text, self.__font__, co_color, BLACK)
 
-            framebuffer.blit(
+            draw_list.blit(
                 co_ppm_texture, (self.__lhs__, self.__text_y_pos__))
         self.task_timer.stop()
 
@@ -339,37 +413,57 @@ class Illyrian(AhrsElement):
         self.__lhs__ = 0
         self.__has_been_connected__ = False
 
+    def __get_spo2_and_heartbeat__(self):
+        """
+        Returns the SPO2 text and color, and the heartbeat text,
+        or None if there is nothing to show.
+        """
+
+        if AithreClient.INSTANCE is None or not configuration.CONFIGURATION.aithre_enabled:
+            return None
+
+        report = AithreClient.INSTANCE.get_spo2_report()
+        spo2_level = report.spo2
+        heartbeat_text = "{}BPM".format(report.heartrate)
+
+        if spo2_level is None or isinstance(spo2_level, basestring):
+            if not self.__has_been_connected__:
+                return None
+
+            return "OFFLINE", RED, heartbeat_text
+
+        self.__has_been_connected__ = True
+
+        return str(int(spo2_level)) + "% SPO", get_illyrian_spo2_color(spo2_level), heartbeat_text
+
+    def get_render_fingerprint(self, orientation):
+        """
+        The element only needs to be drawn again when the readings change.
+        """
+
+        return (self.__get_spo2_and_heartbeat__(),)
+
     def render(self, framebuffer, orientation):
+        return display_list.render_with_display_list(self, framebuffer, orientation)
+
+    def render_display_list(self, draw_list, orientation):
         self.task_timer.start()
 
-        if AithreClient.INSTANCE is not None and configuration.CONFIGURATION.aithre_enabled:
-            report = AithreClient.INSTANCE.get_spo2_report()
-            spo2_level = report.spo2
-            heartbeat = report.heartrate
-            heartbeat_text = "{}BPM".format(heartbeat)
-
-            if spo2_level is None or isinstance(spo2_level, basestring):
-                if self.__has_been_connected__:
-                    spo2_color = RED
-                    spo2_text = "OFFLINE"
-                else:
-                    self.task_timer.stop()
-                    return
-            else:
-                spo2_color = get_illyrian_spo2_color(spo2_level)
-                spo2_text = str(int(spo2_level)) + "% SPO"
-                self.__has_been_connected__ = True
-
-            spo2_ppm_texture = self.__font__.render(
-                spo2_text, True, spo2_color, BLACK)
-
-            heartbeat_texture = self.__font__.render(
-                heartbeat_text, True, GREEN, BLACK)
-
-            framebuffer.blit(
+        spo2_and_heartbeat = self.__get_spo2_and_heartbeat__()
+
+        if spo2_and_heartbeat is not None:
+            spo2_text, spo2_color, heartbeat_text = spo2_and_heartbeat
+
+            spo2_ppm_texture, spo2_size = glyph_atlas.get_text_texture(
+                spo2_text, self.__font__, spo2_color, BLACK)
+
+            heartbeat_texture, heartbeat_size = glyph_atlas.get_text_texture(
+                heartbeat_text, self.__font__, GREEN, BLACK)
+
+            draw_list.blit(
                 spo2_ppm_texture, (self.__lhs__, self.__text_y_pos__))
 
-            framebuffer.blit(
+            draw_list.blit(
                 heartbeat_texture, (self.__lhs__, self.__pulse_y_pos__))
 
         self.task_timer.stop()
@@ -5,6 +5,7 @@ testing.load_imports()
 
 from lib.display import *
 from lib.task_timer import TaskTimer
+import lib.display_list as display_list
 import units
 import hud_elements
 from ahrs_element import AhrsElement
@@ -33,10 +34,7 @@ class TargetCount(AhrsElement):
 
         self.__left_x__ = 0 # WAS int(framebuffer_size[0] * 0.01)
 
-    def render(self, framebuffer, orientation):
-        self.task_timer.start()
-        # Get the traffic, and bail out of we have none
-
+    def __get_target_count_text__(self):
         text = "NO TARGETS"
 
         try:
@@ -47,9 +45,26 @@ class TargetCount(AhrsElement):
         except Exception as e:
             text = "ERROR" + str(e)
 
-        texture = self.__font__.render(text, True, WHITE, BLACK)
+        return text
+
+    def get_render_fingerprint(self, orientation):
+        """
+        The text only changes when the number of targets changes.
+        """
+
+        return self.__get_target_count_text__()
+
+    def render(self, framebuffer, orientation):
+        return display_list.render_with_display_list(self, framebuffer, orientation)
+
+    def render_display_list(self, draw_list, orientation):
+        self.task_timer.start()
+
+        text = self.__get_target_count_text__()
+        texture = HudDataCache.get_cached_text_texture(
+            text, self.__font__, WHITE, BLACK)[0]
 
-        framebuffer.blit(
+        draw_list.blit(
             texture, (self.__left_x__, self.__text_y_pos__))
         self.task_timer.stop()
 
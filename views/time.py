@@ -5,6 +5,8 @@ testing.load_imports()
 
 from lib.display import *
 from lib.task_timer import TaskTimer
+import lib.glyph_atlas as glyph_atlas
+import lib.display_list as display_list
 import units
 from ahrs_element import AhrsElement
 
@@ -27,18 +29,38 @@ class Time(AhrsElement):
         self.__left_x__ = int(framebuffer_size[0] * 0.01)
         self.__center_x__ = framebuffer_size[0] >> 1
 
+    def __get_time_text__(self, orientation):
+        return str(orientation.utc_time).split('.')[0] + "UTC" if orientation.utc_time is not None else AhrsElement.GPS_UNAVAILABLE_TEXT
+
+    def get_render_fingerprint(self, orientation):
+        """
+        The time is shown to the second, so the element only
+        needs to be drawn again when the second changes.
+        """
+
+        return self.__get_time_text__(orientation)
+
     def render(
         self,
         framebuffer,
         orientation
+    ):
+        return display_list.render_with_display_list(self, framebuffer, orientation)
+
+    def render_display_list(
+        self,
+        draw_list,
+        orientation
     ):
         self.task_timer.start()
 
-        time_text = str(orientation.utc_time).split('.')[0] + "UTC" if orientation.utc_time is not None else AhrsElement.GPS_UNAVAILABLE_TEXT
-        texture = self.__font__.render(time_text, True, YELLOW, BLACK)
-        width = texture.get_size()[0]
+        time_text = self.__get_time_text__(orientation)
+        texture, size = glyph_atlas.get_text_texture(
+            time_text, self.__font__, YELLOW, BLACK)
+        width = size[0]
 
-        framebuffer.blit(texture, (self.__center_x__ - (width >> 1), self.__text_y_pos__))
+        draw_list.blit(
+            texture, (self.__center_x__ - (width >> 1), self.__text_y_pos__))
         self.task_timer.stop()
 
 
@@ -5,6 +5,7 @@ testing.load_imports()
 
 from lib.display import *
 from lib.task_timer import TaskTimer
+import lib.display_list as display_list
 import units
 from ahrs_element import AhrsElement
 from hud_elements import HudDataCache
@@ -30,11 +31,18 @@ class TrafficNotAvailable(AhrsElement):
     def render(
         self,
         framebuffer,
-        orientation
+        frame_context
+    ):
+        return display_list.render_with_display_list(self, framebuffer, frame_context)
+
+    def render_display_list(
+        self,
+        draw_list,
+        frame_context
     ):
         self.task_timer.start()
 
-        if not HudDataCache.IS_TRAFFIC_AVAILABLE:
+        if not frame_context.traffic_snapshot.is_available:
             (texture, size) = HudDataCache.get_cached_text_texture(
                 "TRAFFIC UNAVAILABLE",
                 self.__font__,
@@ -43,7 +51,7 @@ class TrafficNotAvailable(AhrsElement):
                 use_alpha=True)
             width = size[0]
 
-            framebuffer.blit(
+            draw_list.blit(
                 texture,
                 (self.__center_x__ - (width >> 1), self.__text_y_pos__))
         self.task_timer.stop()
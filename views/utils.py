@@ -15,8 +15,23 @@ def apply_declination(heading):
         float -- The MAGNETIC heading.
     """
 
+    return get_magnetic_heading(heading, configuration.CONFIGURATION.get_declination())
+
+
+def get_magnetic_heading(heading, declination):
+    """
+    Returns a heading to display with the given declination adjust to convert from true to magnetic.
+
+    Arguments:
+        heading {float} -- The TRUE heading.
+        declination {float} -- The magnetic variance, in degrees.
+
+    Returns:
+        float -- The MAGNETIC heading.
+    """
+
     try:
-        new_heading = int(heading - configuration.CONFIGURATION.get_declination())
+        new_heading = int(heading - declination)
     except:
         # If the heading is the unknown '---' then the math wil fail.
         return heading